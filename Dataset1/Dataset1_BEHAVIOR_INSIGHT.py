@@ -14,7 +14,14 @@
 # =========================================
 
 import pandas as pd
+import numpy as np
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import read_table
+from dataset1_incremental import pending_rescore, clear_rescore
+from dataset1_behavior import aggregate_behavior
 
 # ===============================
 # CONFIGURATION
@@ -27,11 +34,33 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "behavior_insight.csv")
 
+SCORING_MODE = "full"  # "full" = all users, "incremental" = only users with client-months pending in RESCORE_FILE
+RESCORE_FILE = "/Users/anandhytapratamaputrisutisna/FYP2/data/dataset1_rescore.csv"
+
+# None = Model 2 labels; e.g. 0.05 = anomaly when anomaly_score > 0.05 (stricter, no refit)
+ANOMALY_SCORE_THRESHOLD = None
+
+# ===============================
+# USERS TO RESCORE
+# ===============================
+affected_clients = None  # None = every user
+if SCORING_MODE == "incremental" and os.path.exists(OUTPUT_FILE):
+    pending = pending_rescore(RESCORE_FILE)
+    if pending is None:
+        print("No users pending rescoring.")
+        sys.exit(0)
+    affected_clients = sorted(pending["client_id"].unique())
+    print(f"Rescoring {len(affected_clients)} users with refreshed months")
+where = None if affected_clients is None else {"client_id": affected_clients}
+
 # ===============================
 # LOAD MODEL OUTPUTS
 # ===============================
-kmeans_df = pd.read_csv(MODEL1_FILE)
-iso_df = pd.read_csv(MODEL2_FILE)
+# Only the keys and labels are needed from each model output
+kmeans_df = read_table(MODEL1_FILE, columns=["client_id", "time_window", "cluster_label"], where=where)
+iso_df = read_table(MODEL2_FILE, columns=["client_id", "time_window", "anomaly_label", "anomaly_score"], where=where)
+if ANOMALY_SCORE_THRESHOLD is not None:
+    iso_df["anomaly_label"] = np.where(iso_df["anomaly_score"] > ANOMALY_SCORE_THRESHOLD, "Anomaly", "Normal")
 
 # ===============================
 # SELECT RELEVANT COLUMNS
@@ -41,7 +70,7 @@ kmeans_sel = kmeans_df[
 ].rename(columns={"cluster_label": "spending_intensity"})
 
 iso_sel = iso_df[
-    ["client_id", "time_window", "anomaly_label"]
+    ["client_id", "time_window", "anomaly_label", "anomaly_score"]
 ]
 
 # ===============================
@@ -57,64 +86,23 @@ merged = pd.merge(
 # ===============================
 # AGGREGATE AT USER LEVEL
 # ===============================
-user_agg = merged.groupby("client_id").agg(
-    dominant_spending_intensity=(
-        "spending_intensity",
-        lambda x: x.value_counts().idxmax()
-    ),
-    anomaly_ratio=(
-        "anomaly_label",
-        lambda x: (x == "Anomaly").mean()
-    )
-).reset_index()
-
-# ===============================
-# DERIVED FLAGS
-# ===============================
-# Anomalies are rare; presence is more meaningful than frequency
-user_agg["has_anomaly"] = user_agg["anomaly_ratio"] > 0
-
-# ===============================
-# FINAL BEHAVIOR CLASSIFICATION
-# ===============================
-def derive_behavior(row):
-    """
-    Behavioral interpretation logic:
-    - Any detected anomaly → Inconsistent behavior
-    - High dominant spending → Impulsive behavior
-    - Otherwise → Stable behavior
-    """
-    if row["has_anomaly"]:
-        return "Inconsistent"
-    elif row["dominant_spending_intensity"] == "High":
-        return "Impulsive"
-    else:
-        return "Stable"
-
-user_agg["behavior_type"] = user_agg.apply(derive_behavior, axis=1)
-
-# ===============================
-# BEHAVIOR RISK LEVEL
-# ===============================
-risk_mapping = {
-    "Stable": "Low",
-    "Impulsive": "Medium",
-    "Inconsistent": "High"
-}
-user_agg["behavior_risk_level"] = user_agg["behavior_type"].map(risk_mapping)
-
-# ===============================
-# JUSTIFICATION (FOR UI & EXPLAINABILITY)
-# ===============================
-user_agg["behavior_justification"] = (
-    "Dominant intensity=" + user_agg["dominant_spending_intensity"]
-    + ", anomaly_ratio=" + user_agg["anomaly_ratio"].round(2).astype(str)
-)
+# Dominant intensity, anomaly ratio, behavior type, risk level and
+# justification per user, vectorized (dataset1_behavior)
+user_agg = aggregate_behavior(merged)
 
 # ===============================
 # SAVE FINAL INSIGHT
 # ===============================
+if affected_clients is not None:
+    # Keep the insight of untouched users, replace the rescored ones
+    previous = pd.read_csv(OUTPUT_FILE)
+    user_agg = pd.concat(
+        [previous[~previous["client_id"].isin(affected_clients)], user_agg],
+        ignore_index=True
+    ).sort_values("client_id", ignore_index=True)
+
 user_agg.to_csv(OUTPUT_FILE, index=False)
+clear_rescore(RESCORE_FILE)
 
 print(f"Behavior insight saved to: {OUTPUT_FILE}")
 print(user_agg.head())
@@ -1,151 +1,127 @@
 import pandas as pd
 import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_schema import DATASET1_RAW_SCHEMA, read_csv_with_schema, iter_csv_with_schema
+from dataset1_eda import eda_report, StreamingEDA
 
 # ===============================
 # CONFIG
 # ===============================
-FILE_PATH = "Dataset1/Dataset1.csv"  
+FILE_PATH = "/Users/anandhytapratamaputrisutisna/FYP2/Data/Dataset 1.csv"
 SAMPLE_SIZE = 500_000
+EDA_MODE = 'memory'        # 'memory' = load full CSV, 'streaming' = one pass over chunks, fixed memory
+CHUNK_SIZE = 200_000       # rows per chunk in streaming mode
+QUANTILE_METHOD = 'sketch' # streaming mode: 'sketch' (fixed memory, approximate) or 'exact' (amount frequencies)
 
 pd.set_option('display.float_format', lambda x: f'{x:,.4f}')
 
 # ===============================
-# LOAD DATA
+# LOAD DATA + STATISTICS
 # ===============================
 print("===== DATA LOADED =====")
-df = pd.read_csv("/Users/anandhytapratamaputrisutisna/FYP2/Data/Dataset 1.csv")
+# amount ('$'-prefixed text) and date are parsed by the schema
+if EDA_MODE == 'streaming':
+    eda = StreamingEDA(SAMPLE_SIZE, quantile_method=QUANTILE_METHOD)
+    for chunk in iter_csv_with_schema(FILE_PATH, DATASET1_RAW_SCHEMA, CHUNK_SIZE):
+        eda.update(chunk)
+    report = eda.report()
+else:
+    df = read_csv_with_schema(FILE_PATH, DATASET1_RAW_SCHEMA)
+    report = eda_report(df, SAMPLE_SIZE)
 
 # ===============================
 # EDA PART 1 — STRUCTURAL CHECK
 # ===============================
 print("\n[EDA 1] Shape (rows, columns):")
-print(df.shape)
+print(report['shape'])
 
 # Missing values
-missing = pd.DataFrame({
-    'missing_count': df.isna().sum(),
-    'missing_percentage': df.isna().mean() * 100
-}).sort_values('missing_percentage', ascending=False)
-
 print("\n[EDA 1] Missing Values:")
-print(missing)
+print(report['missing'])
 
 # Unique users
 print("\n[EDA 1] Unique Users:")
-print("Number of unique users:", df['client_id'].nunique())
+print("Number of unique users:", report['n_users'])
 
 # ===============================
 # CLEANING — AMOUNT
 # ===============================
 print("\n[CLEANING] Cleaning amount column...")
-df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-
-print("Amount dtype after cleaning:", df['amount'].dtype)
-print("NaN amount count:", df['amount'].isna().sum())
-print(df['amount'].describe())
+print("Amount dtype after cleaning:", report['amount_describe'].dtype)
+print("NaN amount count:", report['missing'].loc['amount', 'missing_count'])
+print(report['amount_describe'])
+print("Quantiles:", report['quantile_note'])
 
 # ===============================
 # TIME COLUMN
 # ===============================
-df['date'] = pd.to_datetime(df['date'], errors='coerce')
-
 print("\n[EDA 1] Time Range:")
-print("Start date:", df['date'].min())
-print("End date:", df['date'].max())
+print("Start date:", report['date_range'][0])
+print("End date:", report['date_range'][1])
 
 # ===============================
 # EDA PART 2 — SAMPLING
 # ===============================
 print("\n===== EDA PART 2 =====")
-sample_df = df.sample(SAMPLE_SIZE, random_state=42)
+sample_df = report['sample']
 print("\n[EDA 2.1] Sample shape:", sample_df.shape)
 
 # ===============================
 # EDA PART 3 — USER LEVEL BEHAVIOR
 # ===============================
-user_stats = df.groupby('client_id').agg(
-    total_transactions=('id', 'count'),
-    total_amount=('amount', 'sum'),
-    avg_amount=('amount', 'mean')
-)
-
 print("\n[EDA 2.3] User Statistics Summary:")
-print(user_stats.describe())
+print(report['user_describe'])
 
 # ===============================
 # EDA PART 4 — SPENDING VS REFUND
 # ===============================
-spending = df[df['amount'] > 0]
-refunds = df[df['amount'] < 0]
-
 print("\n[EDA 3.1] Spending vs Refund Counts:")
-print({
-    'spending_tx': len(spending),
-    'refund_tx': len(refunds)
-})
+print(report['spending_vs_refund'])
 
 print("\n[EDA 3.2] Spending Amount Summary:")
-print(spending['amount'].describe())
+print(report['spending_describe'])
 
 print("\n[EDA 3.3] Refund Amount Summary:")
-print(refunds['amount'].describe())
+print(report['refund_describe'])
 
 # ===============================
 # EDA PART 5 — MCC ANALYSIS
 # ===============================
 print("\n[EDA 2.5] Top 10 MCC Codes:")
-print(df['mcc'].value_counts().head(10))
+print(report['top_mcc_counts'])
 
-mcc_value = df.groupby('mcc')['amount'].sum().sort_values(ascending=False)
 print("\n[EDA 4.1] Top 10 MCC by Total Value:")
-print(mcc_value.head(10))
+print(report['top_mcc_value'])
 
 # ===============================
 # EDA PART 6 — ERROR SIGNAL
 # ===============================
-df['has_error'] = df['errors'].notna()
-
 print("\n[EDA 2.6] Error Signal Proportion:")
-print(df['has_error'].value_counts(normalize=True))
+print(report['error_proportion'])
 
 # ===============================
 # EDA PART 7 — TEMPORAL BEHAVIOR
 # ===============================
-df['year'] = df['date'].dt.year
-df['month'] = df['date'].dt.month
-
-yearly_tx = df.groupby('year').size()
-yearly_amount = df.groupby('year')['amount'].sum()
-
 print("\n[EDA 5.1] Transactions per Year:")
-print(yearly_tx)
+print(report['yearly_tx'])
 
 print("\n[EDA 5.2] Total Amount per Year:")
-print(yearly_amount)
+print(report['yearly_amount'])
 
 # ===============================
 # EDA PART 8 — USER SEGMENTATION
 # ===============================
-user_stats['segment'] = pd.qcut(
-    user_stats['total_transactions'],
-    q=[0, 0.33, 0.66, 1.0],
-    labels=['Low', 'Medium', 'Power']
-)
-
 print("\n[EDA 6.1] User Segmentation Counts:")
-print(user_stats['segment'].value_counts())
+print(report['segment_counts'])
 
 # ===============================
 # EDA PART 9 — OUTLIER CHECK
 # ===============================
-q1 = df['amount'].quantile(0.25)
-q3 = df['amount'].quantile(0.75)
-iqr = q3 - q1
-
-outliers = df[(df['amount'] < q1 - 3 * iqr) | (df['amount'] > q3 + 3 * iqr)]
-
 print("\n[EDA 7.1] Extreme Outliers Count:")
-print(len(outliers))
+print(report['extreme_outliers'])
 
 # ===============================
 # FINAL SUMMARY
@@ -1,19 +1,28 @@
 import os
-import pandas as pd
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
-from sklearn.ensemble import IsolationForest
-from sklearn.metrics import silhouette_score, davies_bouldin_score
-from sklearn.decomposition import PCA
-import plotly.express as px
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import read_table
+from pipeline_registry import ModelRegistry
+from pipeline_feature_cache import scaled_features, feature_cache_dir
+from pipeline_projection import project
+from pipeline_anomaly import make_isolation_forest, anomaly_scores
+from pipeline_evaluation import sampled_silhouette, timed_davies_bouldin, write_report
+from dataset1_interactive import cluster_anomaly_figure
 
 # =====================
 # FOLDER STRUCTURE
 # =====================
 evaluation_folder = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset1_evaluation"
 os.makedirs(evaluation_folder, exist_ok=True)
+model_registry_dir = "/Users/anandhytapratamaputrisutisna/FYP2/Data/model_registry"
+registry = ModelRegistry(model_registry_dir)
+INTERACTIVE_MAX_POINTS = 50_000  # points in the interactive HTML (None = every client-month)
+SILHOUETTE_SAMPLE_SIZE = 20_000  # rows per stratified silhouette sample (exact below this; None = always exact)
+SILHOUETTE_SAMPLES = 5           # samples for the mean and 95% confidence interval
 
 # =====================
 # LOAD DATA
@@ -21,47 +30,74 @@ os.makedirs(evaluation_folder, exist_ok=True)
 summary_file = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset1_summary.csv"
 transactions_file = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset1_transactions.csv"
 
-df_summary = pd.read_csv(summary_file)
-df_trans = pd.read_csv(transactions_file)
+numerical_cols = ['total_spending', 'transaction_count', 'avg_transaction_value',
+                  'spending_variance', 'max_amount', 'min_amount', 'weekend_spending_ratio']
+df_summary = read_table(summary_file, columns=['client_id', 'time_window'] + numerical_cols,
+                        order_by=['client_id', 'time_window'])
 
 # =====================
 # FEATURES & SCALING
 # =====================
-numerical_cols = ['total_spending', 'transaction_count', 'avg_transaction_value',
-                  'spending_variance', 'max_amount', 'min_amount', 'weekend_spending_ratio']
+# Scaled matrix shared with the model stages (memory-mapped, float32)
 X = df_summary[numerical_cols]
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+X_scaled, scaler, _ = scaled_features(summary_file, numerical_cols, fill_value=None, dtype='float32',
+                                      order_by=['client_id', 'time_window'], frame=df_summary)
 
 # =====================
 # MODEL 1: Expense Structure Clustering (KMeans)
 # =====================
+# Fitted models come from the registry when the summary is unchanged
 k = 3
-kmeans = KMeans(n_clusters=k, random_state=42)
-df_summary['cluster'] = kmeans.fit_predict(X_scaled)
+def fit_kmeans():
+    return {'scaler': scaler, 'kmeans': KMeans(n_clusters=k, random_state=42).fit(X_scaled)}, {}
 
-silhouette = silhouette_score(X_scaled, df_summary['cluster'])
-db_index = davies_bouldin_score(X_scaled, df_summary['cluster'])
+saved, kmeans_meta, kmeans_reused = registry.fit_or_load(
+    "dataset1_evaluation_kmeans", fit_kmeans, X, numerical_cols,
+    params={'k': k, 'random_state': 42, 'feature_dtype': str(X_scaled.dtype)})
+kmeans = saved['kmeans']
+df_summary['cluster'] = kmeans.predict(X_scaled)
+
+# Sampled silhouette with chunked distances (bounded memory), timed
+silhouette_report = sampled_silhouette(X_scaled, df_summary['cluster'], sample_size=SILHOUETTE_SAMPLE_SIZE,
+                                       n_samples=SILHOUETTE_SAMPLES)
+db_report = timed_davies_bouldin(X_scaled, df_summary['cluster'])
+silhouette = silhouette_report['silhouette']
+db_index = db_report['davies_bouldin']
 cluster_counts = df_summary['cluster'].value_counts().sort_index()
+if not kmeans_reused:
+    registry.add_metrics("dataset1_evaluation_kmeans", kmeans_meta['version'],
+                         {'silhouette': silhouette, 'davies_bouldin': db_index})
 
 # =====================
 # MODEL 2: Overspending / Anomaly Detection (Isolation Forest)
 # =====================
-iso = IsolationForest(contamination='auto', random_state=42)
-df_summary['anomaly'] = iso.fit_predict(X_scaled)  # -1 = anomaly
+def fit_isolation_forest():
+    return {'iso': make_isolation_forest('auto', 42).fit(X_scaled)}, {}
+
+saved, iso_meta, iso_reused = registry.fit_or_load(
+    "dataset1_evaluation_isolation_forest", fit_isolation_forest, X, numerical_cols,
+    params={'contamination': 'auto', 'random_state': 42, 'feature_dtype': str(X_scaled.dtype)})
+iso = saved['iso']
+scores, labels = anomaly_scores(iso, X_scaled)
+df_summary['anomaly'] = labels  # -1 = anomaly
+df_summary['anomaly_score'] = scores  # > 0 = anomaly, higher = more anomalous
 num_anomalies = (df_summary['anomaly'] == -1).sum()
 percent_anomalies = num_anomalies / len(df_summary) * 100
 sample_anomaly_ids = df_summary[df_summary['anomaly']==-1]['client_id'].tolist()[:5]
+if not iso_reused:
+    registry.add_metrics("dataset1_evaluation_isolation_forest", iso_meta['version'],
+                         {'n_anomalies': int(num_anomalies), 'anomaly_rate': percent_anomalies / 100})
 
-df_anomaly_trans = df_trans[df_trans['client_id'].isin(sample_anomaly_ids)]
+# Load only the sampled clients' transactions instead of the full log
+df_anomaly_trans = read_table(transactions_file, where={'client_id': sample_anomaly_ids})
 anomaly_trans_file = os.path.join(evaluation_folder, 'Sample_Anomalous_Transactions.csv')
 df_anomaly_trans.to_csv(anomaly_trans_file, index=False)
 
 # =====================
 # PCA VISUALIZATION
 # =====================
-pca = PCA(n_components=2)
-X_pca = pca.fit_transform(X_scaled)
+# fitted once per scaled matrix and kept in its feature cache folder
+X_pca, _ = project(X_scaled, cache_dir=feature_cache_dir(summary_file))
 df_summary['PCA1'] = X_pca[:,0]
 df_summary['PCA2'] = X_pca[:,1]
 
@@ -85,25 +121,13 @@ static_plot_file = os.path.join(evaluation_folder, 'KMeans_IsolationForest_PCA_S
 plt.savefig(static_plot_file)
 plt.close()
 
-# Interactive plot
+# Interactive plot: WebGL, at most INTERACTIVE_MAX_POINTS points (every
+# anomaly kept, dense normal regions thinned), hover text built column-wise
 df_summary['anomaly_label'] = df_summary['anomaly'].map({1:'Normal', -1:'Anomaly'})
-df_summary['hover_text'] = df_summary.apply(
-    lambda row: f"Client ID: {row['client_id']}<br>"
-                f"Cluster: {row['cluster']}<br>"
-                f"Anomaly: {row['anomaly_label']}<br>"
-                f"Total Spending: {row['total_spending']:.2f}",
-    axis=1
-)
-import plotly.express as px
-fig = px.scatter(
+fig, n_drawn = cluster_anomaly_figure(
     df_summary,
-    x='PCA1',
-    y='PCA2',
-    color='cluster',
-    symbol='anomaly_label',
-    size=df_summary['anomaly'].map({1:5, -1:10}),
-    hover_name='hover_text',
-    title=f'KMeans (k={k}) Clusters with Isolation Forest Anomalies'
+    title=f'KMeans (k={k}) Clusters with Isolation Forest Anomalies',
+    max_points=INTERACTIVE_MAX_POINTS
 )
 fig.update_layout(legend_title_text='Cluster / Anomaly', width=900, height=700)
 interactive_file = os.path.join(evaluation_folder, 'KMeans_IsolationForest_PCA_Interactive.html')
@@ -120,6 +144,10 @@ with open(summary_txt, 'w') as f:
     f.write("Cluster Counts:\n")
     f.write(cluster_counts.to_string())
     f.write(f"\nSilhouette Score: {silhouette:.4f}\n")
+    if not silhouette_report['exact']:
+        f.write(f"  (mean of {silhouette_report['n_samples']} stratified samples of "
+                f"{silhouette_report['sample_size']} rows, 95% CI "
+                f"{silhouette_report['ci_low']:.4f} - {silhouette_report['ci_high']:.4f})\n")
     f.write(f"Davies-Bouldin Index: {db_index:.4f}\n")
     f.write(f"Interpretability: {k} clusters\n\n")
     
@@ -130,7 +158,26 @@ with open(summary_txt, 'w') as f:
     
     f.write(f"Sample anomalous transactions saved to: {anomaly_trans_file}\n")
     f.write(f"Static PCA plot saved to: {static_plot_file}\n")
-    f.write(f"Interactive PCA plot saved to: {interactive_file}\n")
+    f.write(f"Interactive PCA plot saved to: {interactive_file} ({n_drawn} of {len(df_summary)} points)\n")
+    f.write(f"Models: {kmeans_meta['name']} v{kmeans_meta['version']}, "
+            f"{iso_meta['name']} v{iso_meta['version']} (registry: {model_registry_dir})\n")
 
 print(f"Evaluation summary saved to: {summary_txt}")
+
+# Machine-readable metrics and their computation times
+write_report(os.path.join(evaluation_folder, 'Dataset1_Evaluation_Report.json'), {
+    'n_rows': len(df_summary),
+    'kmeans': {
+        'model': f"{kmeans_meta['name']} v{kmeans_meta['version']}",
+        'k': k,
+        'cluster_counts': {str(c): int(n) for c, n in cluster_counts.items()},
+        'silhouette': silhouette_report,
+        'davies_bouldin': db_report
+    },
+    'isolation_forest': {
+        'model': f"{iso_meta['name']} v{iso_meta['version']}",
+        'n_anomalies': int(num_anomalies),
+        'anomaly_rate': percent_anomalies / 100
+    }
+})
 print("Evaluation complete. Output saved to Dataset1_Evaluation_Summary.txt")
@@ -1,12 +1,19 @@
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
-from sklearn.decomposition import PCA
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import read_table, write_table, replace_partitions, SUMMARY_PARTITION
+from pipeline_plots import PlotJobs
+from pipeline_registry import ModelRegistry
+from pipeline_feature_cache import scaled_features, feature_cache_dir
+from pipeline_projection import project
+from dataset1_incremental import pending_rescore, IMPUTE_COLS
+from dataset1_rollup import read_rollup
+from dataset1_clustering import make_kmeans, sweep_k, print_sweep_report
+from pipeline_minibatch import scan_table, fit_minibatch_kmeans, cluster_stats, write_clusters
 
 # ===============================
 # CONFIG
@@ -24,36 +31,244 @@ FEATURES = [
     'weekend_spending_ratio'
 ]
 K_RANGE = range(2, 4)
+K_SELECTION = 'silhouette'     # 'silhouette' (highest score) or 'elbow' (knee of the inertia curve, no pairwise distances)
+SILHOUETTE_SAMPLE_SIZE = None  # None = silhouette on all rows (O(n^2)); e.g. 20_000 = sampled silhouette
+SILHOUETTE_SEED = RANDOM_STATE
+CLUSTER_ALGORITHM = 'kmeans'   # 'kmeans', 'minibatch' or 'auto' (MiniBatchKMeans for large n)
+SWEEP_WORKERS = 1              # processes for the K sweep, one k per task (os.cpu_count() for all cores)
+
+SCORING_MODE = 'full'  # 'full' = refit on the whole summary, 'incremental' = score pending months with saved models
+RESCORE_FILE = "/Users/anandhytapratamaputrisutisna/FYP2/data/dataset1_rescore.csv"
+MODEL_REGISTRY_DIR = "/Users/anandhytapratamaputrisutisna/FYP2/Data/model_registry"
+MODEL_NAME_PREFIX = "dataset1_kmeans_"  # one registered model per run folder
+
+GRANULARITY = None  # full fits: None = INPUT_FILE (TIME_WINDOW of preprocessing), 'D'/'W'/'M'/'Q' = that level of the rollup cube
+ROLLUP_FILE = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset1_rollup.csv"  # written with ROLLUP_CUBE = True
+FEATURE_CACHE_DTYPE = 'float32'  # scaled matrix shared with the other stages (memory-mapped .npy); None = scale in memory
+PROJECTION_METHOD = 'auto'       # PCA for the plots: 'auto', 'full', 'randomized' or 'incremental' (pipeline_projection)
+
+OUT_OF_CORE = False               # True = stream INPUT_FILE from disk (MiniBatchKMeans partial_fit) for summaries larger than memory
+OUT_OF_CORE_CHUNK_ROWS = 250_000  # rows read at a time
+OUT_OF_CORE_SAMPLE_ROWS = 50_000  # uniform sample kept in memory for k selection, plots and medians
+
+# ===============================
+# CLUSTER LABELS & PLOTS
+# ===============================
+def cluster_label_map(cluster_means, k):
+    """
+    Cluster id -> label, ordered by mean total_spending (Low/Medium/High for k=3).
+    """
+    order = cluster_means.sort_values().index
+    names = ['Low', 'Medium', 'High'] if k == 3 else list(range(k))
+    return {old: names[new] for new, old in enumerate(order)}
+
+
+def add_cluster_plots(temp_df, run_dir, k):
+    # PCA scatter and one boxplot per feature, rendered later with the other runs
+    plots.add(
+        os.path.join(run_dir, "pca.png"), 'scatterplot',
+        temp_df[['pca1', 'pca2', 'cluster_label']],
+        figsize=(8, 6),
+        x='pca1',
+        y='pca2',
+        hue='cluster_label',
+        palette='Set2',
+        alpha=0.7,
+        title=f"K-Means PCA Visualization (k={k})",
+        grid=True
+    )
+
+    for feature in FEATURES:
+        plots.add(
+            os.path.join(run_dir, f"{feature}.png"), 'boxplot',
+            temp_df[['cluster_label', feature]],
+            figsize=(8, 5),
+            x='cluster_label',
+            y=feature,
+            hue='cluster_label',
+            legend=False,
+            palette='Set2',
+            title=f"{feature} by Cluster (k={k})",
+            grid=True
+        )
+
+# ===============================
+# INCREMENTAL RESCORING
+# ===============================
+def rescore_kmeans_run(model_name, months):
+    """
+    Assign the refreshed months to the clusters of a registered run and
+    replace those months in its dataset1_kmeans table (plots and cluster
+    summary still describe the last full fit).
+    """
+    saved, meta = registry.load(model_name)
+    run_dir = meta['tags']['run_dir']
+    temp_df = read_table(INPUT_FILE, where={'time_window': months}, order_by=['client_id', 'time_window'])
+
+    X_new = saved['scaler'].transform(temp_df[FEATURES].fillna(0))
+    temp_df['cluster'] = saved['kmeans'].predict(X_new)
+    temp_df['cluster_label'] = temp_df['cluster'].map(saved['cluster_labels'])
+    X_pca = saved['pca'].transform(X_new)
+    temp_df['pca1'] = X_pca[:, 0]
+    temp_df['pca2'] = X_pca[:, 1]
+
+    replace_partitions(temp_df, os.path.join(run_dir, "dataset1_kmeans.csv"), SUMMARY_PARTITION, months,
+                       order_by=['client_id', 'time_window'])
+    print(f"Rescored {len(temp_df)} client-months in {run_dir}")
+
+
+registry = ModelRegistry(MODEL_REGISTRY_DIR)
+saved_runs = registry.names(MODEL_NAME_PREFIX)
+if SCORING_MODE == 'incremental':
+    pending = pending_rescore(RESCORE_FILE)
+    if pending is None:
+        print("No client-months pending rescoring.")
+        sys.exit(0)
+    if saved_runs:
+        months = sorted(pending['time_window'].unique())
+        for model_name in saved_runs:
+            rescore_kmeans_run(model_name, months)
+        print("\nK-Means Model 1 incremental rescoring completed successfully.")
+        sys.exit(0)
+    print("No saved K-Means models yet, running a full fit.")
+
+# ===============================
+# OUT-OF-CORE FIT (SUMMARY LARGER THAN MEMORY)
+# ===============================
+def run_kmeans_out_of_core(k, folder_name):
+    """
+    run_kmeans_pipeline for a summary streamed from disk: MiniBatchKMeans
+    fitted over chunks, labels written chunk by chunk. Means, std and
+    counts cover every row; plots and medians come from the sample.
+    """
+    print(f"\nRunning out-of-core MiniBatchKMeans with k={k}")
+    RUN_DIR = os.path.join(OUTPUT_DIR, folder_name)
+    os.makedirs(RUN_DIR, exist_ok=True)
+
+    km = fit_minibatch_kmeans(INPUT_FILE, FEATURES, k, ooc_scaler, ooc_sample, random_state=RANDOM_STATE,
+                              chunk_rows=OUT_OF_CORE_CHUNK_ROWS)
+    stats, inertia = cluster_stats(INPUT_FILE, FEATURES, ooc_scaler, km, chunk_rows=OUT_OF_CORE_CHUNK_ROWS)
+    mapping = cluster_label_map(stats[('total_spending', 'mean')], k)
+    write_clusters(INPUT_FILE, os.path.join(RUN_DIR, "dataset1_kmeans.csv"), FEATURES, ooc_scaler, km,
+                   label_map=mapping, pca=pca, partition_by=SUMMARY_PARTITION, chunk_rows=OUT_OF_CORE_CHUNK_ROWS)
+
+    temp_df = ooc_sample.copy()
+    temp_df['cluster'] = km.predict(X_sample_scaled)
+    temp_df['cluster_label'] = temp_df['cluster'].map(mapping)
+    temp_df['pca1'] = X_pca[:, 0]
+    temp_df['pca2'] = X_pca[:, 1]
+    add_cluster_plots(temp_df, RUN_DIR, k)
+
+    # Cluster summary table (median of the sample: medians do not stream)
+    by_label = stats.rename(index=mapping).sort_index()
+    medians = temp_df.groupby('cluster_label')[FEATURES].median()
+    summary = pd.concat({
+        (feature, stat): medians[feature] if stat == 'median' else by_label[(feature, stat)]
+        for feature in FEATURES for stat in ('mean', 'median', 'std')
+    }, axis=1).round(2)
+    summary.index.name = 'cluster_label'
+    summary.to_csv(os.path.join(RUN_DIR, "cluster_summary.csv"))
+
+    # Registered like the in-memory runs; the data hash covers the sample
+    model_name = MODEL_NAME_PREFIX + folder_name
+    params = {'k': k, 'algorithm': 'out_of_core', 'random_state': RANDOM_STATE,
+              'sample_rows': OUT_OF_CORE_SAMPLE_ROWS, 'projection': PROJECTION_METHOD}
+    if registry.find(model_name, ooc_sample[FEATURES], params, FEATURES) is None:
+        registry.register(
+            model_name,
+            {'scaler': ooc_scaler, 'kmeans': km, 'pca': pca, 'cluster_labels': mapping},
+            FEATURES, ooc_sample[FEATURES],
+            metrics={'inertia': inertia},
+            params=params,
+            tags={'run_dir': RUN_DIR, 'n_rows': n_rows}
+        )
+
+    print(f"Results for k={k} ({n_rows:,} rows, inertia={inertia:,.1f}) saved in {RUN_DIR}.\n")
+    return summary
+
+
+if OUT_OF_CORE:
+    ooc_scaler, ooc_sample, n_rows = scan_table(INPUT_FILE, FEATURES, sample_rows=OUT_OF_CORE_SAMPLE_ROWS,
+                                                random_state=RANDOM_STATE, chunk_rows=OUT_OF_CORE_CHUNK_ROWS)
+    print(f"Streamed {n_rows:,} client-months; {len(ooc_sample):,}-row sample in memory")
+    X_sample_scaled = ooc_scaler.transform(ooc_sample[FEATURES].fillna(0).to_numpy(dtype=np.float64))
+    X_pca, pca = project(X_sample_scaled, method=PROJECTION_METHOD, random_state=RANDOM_STATE)
+
+    # k chosen on the sample, then each run streams the full table
+    best_k, k_report, _ = sweep_k(
+        X_sample_scaled, K_RANGE,
+        method=K_SELECTION,
+        algorithm=CLUSTER_ALGORITHM,
+        random_state=RANDOM_STATE,
+        sample_size=SILHOUETTE_SAMPLE_SIZE,
+        sample_seed=SILHOUETTE_SEED,
+        n_workers=SWEEP_WORKERS
+    )
+    print_sweep_report(k_report, K_SELECTION, SILHOUETTE_SAMPLE_SIZE, len(X_sample_scaled))
+    k_report.to_csv(os.path.join(OUTPUT_DIR, "k_selection_report.csv"), index=False)
+
+    plots = PlotJobs()
+    summary_best = run_kmeans_out_of_core(best_k, f"k{best_k}_best")
+    summary_k3 = run_kmeans_out_of_core(3, "k3_interpretability")
+    plots.render()
+
+    print("===== SUMMARY (BEST K) =====")
+    print(summary_best)
+    print("\n===== SUMMARY (K=3 INTERPRETABILITY) =====")
+    print(summary_k3)
+    print("\nK-Means Model 1 out-of-core pipeline completed successfully.")
+    sys.exit(0)
 
 # ===============================
 # LOAD DATA
 # ===============================
-df = pd.read_csv(INPUT_FILE)
+if GRANULARITY is None:
+    df = read_table(INPUT_FILE, order_by=['client_id', 'time_window'])
+else:
+    df = read_rollup(ROLLUP_FILE, GRANULARITY, impute_cols=IMPUTE_COLS)
 print("Data shape:", df.shape)
 
 # ===============================
 # SCALE FEATURES
 # ===============================
 X = df[FEATURES].fillna(0)
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+if FEATURE_CACHE_DTYPE is not None and GRANULARITY is None:
+    X_scaled, scaler, _ = scaled_features(INPUT_FILE, FEATURES, fill_value=0, dtype=FEATURE_CACHE_DTYPE,
+                                          order_by=['client_id', 'time_window'], frame=df)
+else:
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
 
 # ===============================
-# SILHOUETTE BASED K SELECTION
+# PCA PROJECTION (ONCE, SHARED BY BOTH RUNS AND MODEL 2)
 # ===============================
-best_score = -1
-best_k = None
+X_pca, pca = project(
+    X_scaled,
+    method=PROJECTION_METHOD,
+    random_state=RANDOM_STATE,
+    cache_dir=feature_cache_dir(INPUT_FILE) if FEATURE_CACHE_DTYPE is not None and GRANULARITY is None else None
+)
 
-for k in K_RANGE:
-    km = KMeans(n_clusters=k, random_state=RANDOM_STATE)
-    labels = km.fit_predict(X_scaled)
-    score = silhouette_score(X_scaled, labels)
-    print(f"k={k}, silhouette score={score:.4f}")
-    if score > best_score:
-        best_score = score
-        best_k = k
+# ===============================
+# K SELECTION (SILHOUETTE OR ELBOW)
+# ===============================
+best_k, k_report, k_models = sweep_k(
+    X_scaled, K_RANGE,
+    method=K_SELECTION,
+    algorithm=CLUSTER_ALGORITHM,
+    random_state=RANDOM_STATE,
+    sample_size=SILHOUETTE_SAMPLE_SIZE,
+    sample_seed=SILHOUETTE_SEED,
+    n_workers=SWEEP_WORKERS
+)
+print_sweep_report(k_report, K_SELECTION, SILHOUETTE_SAMPLE_SIZE, len(X_scaled))
+k_report.to_csv(os.path.join(OUTPUT_DIR, "k_selection_report.csv"), index=False)
 
-print(f"\nBest k based on silhouette score: {best_k} (score={best_score:.4f})")
+chosen = k_report.loc[k_report['chosen']].iloc[0]
+if K_SELECTION == 'elbow':
+    print(f"\nBest k based on {K_SELECTION}: {best_k} (knee of the inertia curve, inertia={chosen['inertia']:,.1f})")
+else:
+    print(f"\nBest k based on {K_SELECTION}: {best_k} (silhouette score={chosen['silhouette']:.4f})")
 
 # ===============================
 # FUNCTION TO RUN K-MEANS PIPELINE
@@ -65,67 +280,53 @@ def run_kmeans_pipeline(k, folder_name):
     RUN_DIR = os.path.join(OUTPUT_DIR, folder_name)
     os.makedirs(RUN_DIR, exist_ok=True)
 
-    # Run K-Means
-    km = KMeans(n_clusters=k, random_state=RANDOM_STATE)
-    labels = km.fit_predict(X_scaled)
+    # Run K-Means (reuses the fit from the K sweep when k was in K_RANGE)
+    km = k_models[k] if k in k_models else make_kmeans(k, len(X_scaled), CLUSTER_ALGORITHM, RANDOM_STATE).fit(X_scaled)
+    labels = km.labels_
 
     temp_df = df.copy()
     temp_df['cluster'] = labels
 
     # Order clusters by total spending
-    cluster_means = temp_df.groupby('cluster')['total_spending'].mean().sort_values()
-    mapping = {old: new for new, old in enumerate(cluster_means.index)}
+    mapping = cluster_label_map(temp_df.groupby('cluster')['total_spending'].mean(), k)
     temp_df['cluster_label'] = temp_df['cluster'].map(mapping)
 
-    if k == 3:
-        temp_df['cluster_label'] = temp_df['cluster_label'].map({
-            0: 'Low',
-            1: 'Medium',
-            2: 'High'
-        })
-
-    # PCA
-    pca = PCA(n_components=2, random_state=RANDOM_STATE)
-    X_pca = pca.fit_transform(X_scaled)
+    # PCA (same projection for every k)
     temp_df['pca1'] = X_pca[:, 0]
     temp_df['pca2'] = X_pca[:, 1]
 
-    plt.figure(figsize=(8, 6))
-    sns.scatterplot(
-        data=temp_df,
-        x='pca1',
-        y='pca2',
-        hue='cluster_label',
-        palette='Set2',
-        alpha=0.7
-    )
-    plt.title(f"K-Means PCA Visualization (k={k})")
-    plt.grid(True)
-    plt.savefig(os.path.join(RUN_DIR, "pca.png"))
-    plt.close()
-
-    # Feature boxplots
-    for feature in FEATURES:
-        plt.figure(figsize=(8, 5))
-        sns.boxplot(
-            x='cluster_label',
-            y=feature,
-            hue='cluster_label',
-            data=temp_df,
-            legend=False,
-            palette='Set2'
-        )
-        plt.title(f"{feature} by Cluster (k={k})")
-        plt.grid(True)
-        plt.savefig(os.path.join(RUN_DIR, f"{feature}.png"))
-        plt.close()
+    # PCA scatter and feature boxplots
+    add_cluster_plots(temp_df, RUN_DIR, k)
 
     # Cluster summary table
     summary = temp_df.groupby('cluster_label')[FEATURES].agg(['mean', 'median', 'std']).round(2)
     summary.to_csv(os.path.join(RUN_DIR, "cluster_summary.csv"))
 
     # Save clustered data
-    temp_df.to_csv(os.path.join(RUN_DIR, "dataset1_kmeans.csv"), index=False)
+    write_table(temp_df, os.path.join(RUN_DIR, "dataset1_kmeans.csv"), partition_by=SUMMARY_PARTITION)
+
+    # Register the fitted models for incremental rescoring and evaluation
+    # (once per summary and settings: an identical version is not saved again)
+    model_name = MODEL_NAME_PREFIX + folder_name
+    params = {'k': k, 'algorithm': CLUSTER_ALGORITHM, 'random_state': RANDOM_STATE, 'granularity': GRANULARITY,
+              'feature_dtype': str(X_scaled.dtype), 'projection': PROJECTION_METHOD}
+    sweep_row = k_report[k_report['k'] == k]
+    if registry.find(model_name, X, params, FEATURES) is None:
+        registry.register(
+            model_name,
+            {
+                'scaler': scaler,
+                'kmeans': km,
+                'pca': pca,
+                'cluster_labels': temp_df.groupby('cluster')['cluster_label'].first().to_dict()
+            },
+            FEATURES, X,
+            metrics={'inertia': float(km.inertia_),
+                     **({'silhouette': float(sweep_row['silhouette'].iloc[0])} if len(sweep_row) else {})},
+            params=params,
+            fit_seconds=float(sweep_row['fit_seconds'].iloc[0]) if len(sweep_row) else None,
+            tags={'run_dir': RUN_DIR}
+        )
 
     print(f"Results for k={k} saved in {RUN_DIR}.\n")
     return summary
@@ -133,8 +334,10 @@ def run_kmeans_pipeline(k, folder_name):
 # ===============================
 # RUN BEST K & K=3 AUTOMATICALLY
 # ===============================
+plots = PlotJobs()  # figures of both runs are rendered together
 summary_best = run_kmeans_pipeline(best_k, f"k{best_k}_best")
 summary_k3 = run_kmeans_pipeline(3, "k3_interpretability")
+plots.render()
 
 print("===== SUMMARY (BEST K) =====")
 print(summary_best)
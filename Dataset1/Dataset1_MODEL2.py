@@ -1,11 +1,18 @@
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import IsolationForest
-from sklearn.decomposition import PCA
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import read_table, write_table, replace_partitions, SUMMARY_PARTITION
+from pipeline_plots import PlotJobs
+from pipeline_registry import ModelRegistry
+from pipeline_feature_cache import scaled_features, feature_cache_dir
+from pipeline_projection import project
+from pipeline_anomaly import make_isolation_forest, anomaly_scores
+from dataset1_incremental import pending_rescore, IMPUTE_COLS
+from dataset1_rollup import read_rollup
 
 # ===============================
 # CONFIG
@@ -18,18 +25,79 @@ os.makedirs(os.path.join(OUTPUT_DIR, SUBFOLDER), exist_ok=True)
 RANDOM_STATE = 42
 FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value', 'spending_variance', 'weekend_spending_ratio']
 
+SCORING_MODE = 'full'  # 'full' = refit on the whole summary, 'incremental' = score pending months with the saved model
+RESCORE_FILE = "/Users/anandhytapratamaputrisutisna/FYP2/data/dataset1_rescore.csv"
+MODEL_REGISTRY_DIR = "/Users/anandhytapratamaputrisutisna/FYP2/Data/model_registry"
+MODEL_NAME = "dataset1_isolation_forest"
+
+GRANULARITY = None  # full fits: None = INPUT_FILE (TIME_WINDOW of preprocessing), 'D'/'W'/'M'/'Q' = that level of the rollup cube
+ROLLUP_FILE = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset1_rollup.csv"  # written with ROLLUP_CUBE = True
+FEATURE_CACHE_DTYPE = 'float32'  # scaled matrix shared with the other stages (memory-mapped .npy); None = scale in memory
+PROJECTION_METHOD = 'auto'       # PCA for the plots: 'auto', 'full', 'randomized' or 'incremental' (pipeline_projection)
+
+MAX_SAMPLES = 'auto'  # rows drawn per tree ('auto' = 256, an int, or a fraction of the rows)
+N_JOBS = None         # processes for fitting the trees (-1 = all cores)
+SCORE_WORKERS = 1     # processes for chunked scoring (os.cpu_count() for all cores)
+
+# ===============================
+# INCREMENTAL RESCORING
+# ===============================
+registry = ModelRegistry(MODEL_REGISTRY_DIR)
+if SCORING_MODE == 'incremental':
+    pending = pending_rescore(RESCORE_FILE)
+    if pending is None:
+        print("No client-months pending rescoring.")
+        sys.exit(0)
+    if MODEL_NAME in registry.names(MODEL_NAME):
+        # Score the refreshed months with the saved forest and its fitted threshold
+        # (plots and summaries still describe the last full fit)
+        months = sorted(pending['time_window'].unique())
+        saved, _ = registry.load(MODEL_NAME)
+        temp_df = read_table(INPUT_FILE, where={'time_window': months}, order_by=['client_id', 'time_window'])
+
+        X_new = saved['scaler'].transform(temp_df[FEATURES].fillna(0))
+        scores, labels = anomaly_scores(saved['iso'], X_new, n_workers=SCORE_WORKERS)
+        temp_df['anomaly'] = labels
+        temp_df['anomaly_score'] = scores
+        temp_df['anomaly_label'] = temp_df['anomaly'].map({1:'Normal', -1:'Anomaly'})
+        X_pca = saved['pca'].transform(X_new)
+        temp_df['pca1'] = X_pca[:,0]
+        temp_df['pca2'] = X_pca[:,1]
+
+        replace_partitions(temp_df, os.path.join(OUTPUT_DIR, SUBFOLDER, "dataset1_isolation_forest.csv"),
+                           SUMMARY_PARTITION, months, order_by=['client_id', 'time_window'])
+        print(f"Rescored {len(temp_df)} client-months ({(temp_df['anomaly'] == -1).sum()} anomalies)")
+        print("\nIsolation Forest Model 2 incremental rescoring completed successfully.")
+        sys.exit(0)
+    print("No saved Isolation Forest model yet, running a full fit.")
+
 # ===============================
 # LOAD DATA
 # ===============================
-df = pd.read_csv(INPUT_FILE)
+if GRANULARITY is None:
+    df = read_table(INPUT_FILE, order_by=['client_id', 'time_window'])
+else:
+    df = read_rollup(ROLLUP_FILE, GRANULARITY, impute_cols=IMPUTE_COLS)
 print("Data shape:", df.shape)
 
 # ===============================
 # SCALE FEATURES
 # ===============================
 X = df[FEATURES].fillna(0)
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+if FEATURE_CACHE_DTYPE is not None and GRANULARITY is None:
+    X_scaled, scaler, _ = scaled_features(INPUT_FILE, FEATURES, fill_value=0, dtype=FEATURE_CACHE_DTYPE,
+                                          order_by=['client_id', 'time_window'], frame=df)
+else:
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+# PCA projection: loaded from the feature cache when Model 1 already fitted it on this matrix
+X_pca, pca = project(
+    X_scaled,
+    method=PROJECTION_METHOD,
+    random_state=RANDOM_STATE,
+    cache_dir=feature_cache_dir(INPUT_FILE) if FEATURE_CACHE_DTYPE is not None and GRANULARITY is None else None
+)
 
 # ===============================
 # AUTOMATIC CONTAMINATION BASED ON SPENDING
@@ -46,11 +114,29 @@ print(f"Automatic contamination based on spending distribution: {contamination:.
 def run_isolation_forest(X_scaled, contamination, output_folder):
     print(f"\nRunning Isolation Forest ({output_folder}) contamination")
     
-    iso = IsolationForest(contamination=contamination, random_state=RANDOM_STATE)
-    labels = iso.fit_predict(X_scaled)
+    # Reuse the registered forest when the summary and settings are unchanged
+    def fit():
+        iso = make_isolation_forest(contamination, RANDOM_STATE, max_samples=MAX_SAMPLES, n_jobs=N_JOBS).fit(X_scaled)
+        return {'scaler': scaler, 'iso': iso, 'pca': pca}, {}
+
+    saved, meta, reused = registry.fit_or_load(
+        MODEL_NAME, fit, X, FEATURES,
+        params={'contamination': float(contamination), 'random_state': RANDOM_STATE, 'granularity': GRANULARITY,
+                'feature_dtype': str(X_scaled.dtype), 'projection': PROJECTION_METHOD, 'max_samples': MAX_SAMPLES},
+        tags={'output_dir': os.path.join(OUTPUT_DIR, output_folder)}
+    )
+    iso = saved['iso']
+    # continuous score (> 0 = anomaly) saved next to the label for ranking downstream
+    scores, labels = anomaly_scores(iso, X_scaled, n_workers=SCORE_WORKERS)
+    if not reused:
+        registry.add_metrics(MODEL_NAME, meta['version'], {
+            'n_anomalies': int((labels == -1).sum()),
+            'anomaly_rate': float((labels == -1).mean())
+        })
     
     temp_df = df.copy()
     temp_df['anomaly'] = labels
+    temp_df['anomaly_score'] = scores
     temp_df['anomaly_label'] = temp_df['anomaly'].map({1:'Normal', -1:'Anomaly'})
     
     folder_path = os.path.join(OUTPUT_DIR, output_folder)
@@ -59,61 +145,56 @@ def run_isolation_forest(X_scaled, contamination, output_folder):
     # ===============================
     # SCATTER PLOT 2D
     # ===============================
-    plt.figure(figsize=(8,5))
-    sns.scatterplot(
+    plots.add(
+        os.path.join(folder_path, "anomalies_scatter.png"), 'scatterplot',
+        temp_df[['transaction_count', 'total_spending', 'anomaly_label']],
+        figsize=(8,5),
         x='transaction_count',
         y='total_spending',
         hue='anomaly_label',
-        data=temp_df,
         palette=['green','red'],
-        alpha=0.6
+        alpha=0.6,
+        title="Isolation Forest Anomalies",
+        xlabel="Transaction Count",
+        ylabel="Total Spending",
+        grid=True
     )
-    plt.title("Isolation Forest Anomalies")
-    plt.xlabel("Transaction Count")
-    plt.ylabel("Total Spending")
-    plt.grid(True)
-    plt.savefig(os.path.join(folder_path, "anomalies_scatter.png"))
-    plt.close()
     
     # ===============================
     # PCA 2D VISUALIZATION
     # ===============================
-    pca = PCA(n_components=2, random_state=RANDOM_STATE)
-    X_pca = pca.fit_transform(X_scaled)
     temp_df['pca1'] = X_pca[:,0]
     temp_df['pca2'] = X_pca[:,1]
     
-    plt.figure(figsize=(8,6))
-    sns.scatterplot(
+    plots.add(
+        os.path.join(folder_path, "anomalies_pca2d.png"), 'scatterplot',
+        temp_df[['pca1', 'pca2', 'anomaly_label']],
+        figsize=(8,6),
         x='pca1', y='pca2',
         hue='anomaly_label',
-        data=temp_df,
         palette=['green','red'],
-        alpha=0.6
+        alpha=0.6,
+        title="PCA 2D Visualization of Anomalies",
+        xlabel="PCA Component 1",
+        ylabel="PCA Component 2",
+        grid=True
     )
-    plt.title("PCA 2D Visualization of Anomalies")
-    plt.xlabel("PCA Component 1")
-    plt.ylabel("PCA Component 2")
-    plt.grid(True)
-    plt.savefig(os.path.join(folder_path, "anomalies_pca2d.png"))
-    plt.close()
     
     # ===============================
     # BOXPLOTS PER FEATURE
     # ===============================
     for feature in FEATURES:
-        plt.figure(figsize=(8,5))
-        sns.boxplot(
+        plots.add(
+            os.path.join(folder_path, f"{feature}_by_anomaly.png"), 'boxplot',
+            temp_df[['anomaly_label', feature]],
+            figsize=(8,5),
             x='anomaly_label',
             y=feature,
             hue='anomaly_label',
-            data=temp_df,
-            palette=['green','red']
+            palette=['green','red'],
+            title=f"{feature} by Anomaly Label",
+            grid=True
         )
-        plt.title(f"{feature} by Anomaly Label")
-        plt.grid(True)
-        plt.savefig(os.path.join(folder_path, f"{feature}_by_anomaly.png"))
-        plt.close()
     
     # ===============================
     # SUMMARY TABLE
@@ -133,7 +214,7 @@ def run_isolation_forest(X_scaled, contamination, output_folder):
     # ===============================
     # SAVE DATA
     # ===============================
-    temp_df.to_csv(os.path.join(folder_path, "dataset1_isolation_forest.csv"), index=False)
+    write_table(temp_df, os.path.join(folder_path, "dataset1_isolation_forest.csv"), partition_by=SUMMARY_PARTITION)
     
     print(f"All results saved under: {folder_path}\n")
     return summary, feature_importance
@@ -141,7 +222,9 @@ def run_isolation_forest(X_scaled, contamination, output_folder):
 # ===============================
 # RUN PIPELINE
 # ===============================
+plots = PlotJobs()
 summary_auto, feature_importance_auto = run_isolation_forest(X_scaled, contamination, SUBFOLDER)
+plots.render()
 
 print("\n===== SUMMARY =====")
 print(summary_auto)
@@ -6,9 +6,15 @@
 import pandas as pd
 import numpy as np
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.impute import SimpleImputer
+import sys
+
+from dataset1_features import build_grouped_summary, time_window_labels, iso_weeks, SUMMARY_INPUTS
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import write_table, TRANSACTIONS_PARTITION, SUMMARY_PARTITION
+from pipeline_schema import DATASET1_RAW_SCHEMA, read_csv_with_schema, filter_rows, memory_report
+from pipeline_parsing import parse_report
+from pipeline_plots import PlotJobs
 
 # ===============================
 # CONFIG
@@ -17,104 +23,159 @@ FILE_PATH = "/Users/anandhytapratamaputrisutisna/FYP2/Data/Dataset 1.csv"
 TIME_WINDOW = 'M'  # 'M' = monthly, 'W' = weekly
 OUTLIER_METHOD = 'IQR'
 OUTLIER_FACTOR = 3
+INGESTION_MODE = 'memory'  # 'memory' = load full CSV, 'streaming' = bounded chunks,
+                           # 'incremental' = only new/modified monthly files in INCOMING_DIR
+CHUNK_SIZE = 1_000_000     # rows per chunk in streaming mode
+QUANTILE_METHOD = 'exact'  # streaming mode: 'exact' (amount frequencies) or 'sketch' (bounded memory, approximate)
+FEATURE_MODE = 'serial'    # 'serial' or 'parallel' (client_id partitions in a process pool, memory mode)
+N_WORKERS = os.cpu_count() # processes for FEATURE_MODE = 'parallel'
+INCOMING_DIR = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset1_monthly"  # incremental mode: one raw CSV per month
+ROLLUP_CUBE = False        # memory/streaming mode: also save day/week/month/quarter aggregates (dataset1_rollup)
 
 OUTPUT_DIR = "/Users/anandhytapratamaputrisutisna/FYP2/data"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 PROCESSED_FILE = os.path.join(OUTPUT_DIR, "dataset1_transactions.csv")
 GROUPED_FILE   = os.path.join(OUTPUT_DIR, "dataset1_summary.csv")
+ROLLUP_FILE    = os.path.join(OUTPUT_DIR, "dataset1_rollup.csv")
 EDA_OUTPUT_DIR = os.path.join(OUTPUT_DIR, "dataset1_eda_summary_plots")
 os.makedirs(EDA_OUTPUT_DIR, exist_ok=True)
 
 pd.set_option('display.float_format', lambda x: f'{x:,.4f}')
 
-# ===============================
-# LOAD DATA
-# ===============================
-print("===== DATA LOADED =====")
-df = pd.read_csv(FILE_PATH)
-print(f"Original dataset shape: {df.shape}")
+if INGESTION_MODE == 'incremental':
+    # ===============================
+    # INCREMENTAL MONTHLY REFRESH
+    # ===============================
+    from dataset1_incremental import refresh_incremental
 
-# ===============================
-# CLEAN AMOUNT
-# ===============================
-df['amount'] = df['amount'].astype(str).str.replace(r'[^0-9\.\-]', '', regex=True)
-df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-print("\n[CHECK] Amount after parsing:")
-print(df['amount'].describe())
+    print("===== INCREMENTAL REFRESH =====")
+    grouped_summary, processed_rows, refreshed_months = refresh_incremental(
+        INCOMING_DIR, PROCESSED_FILE, GROUPED_FILE, OUTPUT_DIR,
+        time_window=TIME_WINDOW,
+        outlier_method=OUTLIER_METHOD,
+        outlier_factor=OUTLIER_FACTOR
+    )
+    if grouped_summary is None or grouped_summary.empty:
+        sys.exit(0)
+elif INGESTION_MODE == 'streaming':
+    # ===============================
+    # STREAMING LOAD + CLEAN + FEATURE ENGINEERING
+    # ===============================
+    from dataset1_ingest import build_summary_streaming
 
-# ===============================
-# CLEAN DATE
-# ===============================
-df['date'] = pd.to_datetime(df['date'], errors='coerce')
-print("\n[CHECK] Date parsing:", df['date'].min(), df['date'].max())
+    print("===== STREAMING DATA IN CHUNKS =====")
+    grouped_summary, processed_rows = build_summary_streaming(
+        FILE_PATH, PROCESSED_FILE,
+        time_window=TIME_WINDOW,
+        chunk_size=CHUNK_SIZE,
+        outlier_method=OUTLIER_METHOD,
+        outlier_factor=OUTLIER_FACTOR,
+        quantile_method=QUANTILE_METHOD,
+        rollup_file=ROLLUP_FILE if ROLLUP_CUBE else None
+    )
+else:
+    # ===============================
+    # LOAD DATA
+    # ===============================
+    print("===== DATA LOADED =====")
+    # Compact dtypes at read time; amount and date are parsed chunk by chunk
+    df = read_csv_with_schema(FILE_PATH, DATASET1_RAW_SCHEMA)
+    print(f"Original dataset shape: {df.shape}")
+    memory_report(df, "TRANSACTIONS MEMORY AFTER LOAD")
 
-df.dropna(subset=['amount', 'date'], inplace=True)
-print(f"\nAfter dropping missing amount/date: {df.shape[0]} rows")
+    # ===============================
+    # CLEAN AMOUNT
+    # ===============================
+    # Parsed by the schema: non-numeric characters stripped, unparseable -> NaN
+    print("\n[CHECK] Amount after parsing:")
+    print(df['amount'].describe())
 
-# ===============================
-# FILTER EXPENSES
-# ===============================
-df = df[df['amount'] > 0]
-print(f"After filtering only expenses: {df.shape[0]} rows")
+    # ===============================
+    # CLEAN DATE
+    # ===============================
+    # Parsed by the schema: unparseable -> NaT
+    print("\n[CHECK] Date parsing:", df['date'].min(), df['date'].max())
 
-# ===============================
-# REMOVE EXTREME OUTLIERS
-# ===============================
-if OUTLIER_METHOD == 'IQR':
-    Q1 = df['amount'].quantile(0.25)
-    Q3 = df['amount'].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - OUTLIER_FACTOR * IQR
-    upper_bound = Q3 + OUTLIER_FACTOR * IQR
-    df = df[(df['amount'] >= lower_bound) & (df['amount'] <= upper_bound)]
-    print(f"After removing extreme outliers: {df.shape[0]} rows")
+    # Row filters are combined into one mask and applied once at the end,
+    # so the transaction frame is copied once instead of after every step
+    keep = df['amount'].notna() & df['date'].notna()
+    print(f"\nAfter dropping missing amount/date: {keep.sum()} rows")
 
-# ===============================
-# TEMPORAL FEATURES
-# ===============================
-df['year'] = df['date'].dt.year
-df['month'] = df['date'].dt.month
-df['week'] = df['date'].dt.isocalendar().week
-df['day_of_week'] = df['date'].dt.dayofweek
-df['is_weekend'] = df['day_of_week'].isin([5,6]).astype(int)
+    # ===============================
+    # FILTER EXPENSES
+    # ===============================
+    keep &= df['amount'] > 0
+    print(f"After filtering only expenses: {keep.sum()} rows")
 
-# ===============================
-# OPTIONAL FEATURES
-# ===============================
-df['log_amount'] = np.log1p(df['amount'])
-high_value_thresh = df['amount'].quantile(0.95)
-df['is_high_value'] = df['amount'] > high_value_thresh
+    # ===============================
+    # REMOVE EXTREME OUTLIERS
+    # ===============================
+    if OUTLIER_METHOD == 'IQR':
+        # plain values: no 8-byte row index copied along with the amounts
+        expenses = pd.Series(df['amount'].to_numpy()[keep.to_numpy()])
+        Q1 = expenses.quantile(0.25)
+        Q3 = expenses.quantile(0.75)
+        IQR = Q3 - Q1
+        lower_bound = Q1 - OUTLIER_FACTOR * IQR
+        upper_bound = Q3 + OUTLIER_FACTOR * IQR
+        keep &= (df['amount'] >= lower_bound) & (df['amount'] <= upper_bound)
+        del expenses
+        print(f"After removing extreme outliers: {keep.sum()} rows")
 
-# ===============================
-# TIME WINDOW AGGREGATION
-# ===============================
-df['time_window'] = df['date'].dt.to_period(TIME_WINDOW).astype(str)
+    df = filter_rows(df, keep)
+    del keep
 
-# ===============================
-# FEATURE ENGINEERING
-# ===============================
-grouped_summary = df.groupby(['client_id', 'time_window']).agg(
-    total_spending=('amount', 'sum'),
-    transaction_count=('amount', 'count'),
-    avg_transaction_value=('amount', 'mean'),
-    spending_variance=('amount', 'var'),
-    max_amount=('amount', 'max'),
-    min_amount=('amount', 'min'),
-    weekend_spending_total=('amount', lambda x: x[df.loc[x.index,'is_weekend']==1].sum())
-).reset_index()
-
-# Weekend ratio
-grouped_summary['weekend_spending_ratio'] = grouped_summary['weekend_spending_total'] / grouped_summary['total_spending']
-grouped_summary.drop(columns=['weekend_spending_total'], inplace=True)
-
-# Category ratio (if category exists)
-if 'category' in df.columns:
-    categories = df['category'].dropna().unique()
-    for cat in categories:
-        cat_sum = df[df['category']==cat].groupby(['client_id','time_window'])['amount'].sum()
-        grouped_summary = grouped_summary.merge(cat_sum.rename(f'ratio_{cat}'), on=['client_id','time_window'], how='left')
-        grouped_summary[f'ratio_{cat}'] = grouped_summary[f'ratio_{cat}'] / grouped_summary['total_spending']
-    grouped_summary.fillna(0, inplace=True)
+    # ===============================
+    # TEMPORAL FEATURES
+    # ===============================
+    # compact integer types; the values (and the saved CSV) are unchanged
+    df['year'] = df['date'].dt.year.astype('int16')
+    df['month'] = df['date'].dt.month.astype('int8')
+    df['week'] = iso_weeks(df['date'])
+    df['day_of_week'] = df['date'].dt.dayofweek.astype('int8')
+    df['is_weekend'] = df['day_of_week'].isin([5,6]).astype('int8')
+
+    # ===============================
+    # OPTIONAL FEATURES
+    # ===============================
+    df['log_amount'] = np.log1p(df['amount'])
+    high_value_thresh = df['amount'].quantile(0.95)
+    df['is_high_value'] = df['amount'] > high_value_thresh
+
+    # ===============================
+    # TIME WINDOW AGGREGATION
+    # ===============================
+    df['time_window'] = time_window_labels(df['date'], TIME_WINDOW)
+    memory_report(df, "TRANSACTIONS MEMORY AFTER FEATURES")
+
+    # ===============================
+    # SAVE TRANSACTIONS
+    # ===============================
+    # Saved before the summary, so the summary only keeps the columns it reads
+    write_table(df, PROCESSED_FILE, partition_by=TRANSACTIONS_PARTITION)
+    processed_rows = df.shape[0]
+
+    # ===============================
+    # ROLLUP CUBE (DAY / WEEK / MONTH / QUARTER)
+    # ===============================
+    if ROLLUP_CUBE:
+        from dataset1_rollup import daily_partials, build_rollup_cube, write_rollup_cube
+        write_rollup_cube(build_rollup_cube(daily_partials(df)), ROLLUP_FILE)
+
+    # ===============================
+    # FEATURE ENGINEERING
+    # ===============================
+    # Single vectorized pass: weekend share and category ratios included
+    df = df[[col for col in SUMMARY_INPUTS if col in df.columns]]
+    if FEATURE_MODE == 'parallel':
+        from dataset1_parallel import build_grouped_summary_parallel
+        grouped_summary = build_grouped_summary_parallel(df, N_WORKERS)
+    else:
+        grouped_summary = build_grouped_summary(df)
+    del df
+
+# rows/s of the amount and date parsers (all chunks read above)
+parse_report()
 
 # ===============================
 # FINAL NUMERICAL IMPUTATION (FOR MODELING)
@@ -133,7 +194,9 @@ numeric_cols = [
 print("\n===== MISSING VALUES BEFORE IMPUTATION =====")
 print(grouped_summary[numeric_cols].isna().sum())
 
-# Median imputation (robust for financial data)
+# Median imputation (robust for financial data); sklearn is imported only
+# now, after the transaction frame is released (it adds ~80 MB of modules)
+from sklearn.impute import SimpleImputer
 imputer = SimpleImputer(strategy='median')
 grouped_summary[numeric_cols] = imputer.fit_transform(
     grouped_summary[numeric_cols]
@@ -149,14 +212,17 @@ print("\n✅ Missing values handled using median imputation.")
 # ===============================
 # SAVE CSV
 # ===============================
-df.to_csv(PROCESSED_FILE, index=False)
-grouped_summary.to_csv(GROUPED_FILE, index=False)
+# transactions: saved above (memory mode) or chunk by chunk (streaming mode)
+if INGESTION_MODE != 'incremental':  # incremental mode replaced only the refreshed months
+    write_table(grouped_summary, GROUPED_FILE, partition_by=SUMMARY_PARTITION)
 
 print("\n===== PREPROCESSING + FEATURE ENGINEERING COMPLETE =====")
 print(f"Processed transaction data saved to: {PROCESSED_FILE}")
 print(f"Grouped summary saved to: {GROUPED_FILE}")
-print(f"Processed rows: {df.shape[0]}")
+print(f"Processed rows: {processed_rows}")
 print(f"Grouped summary shape: {grouped_summary.shape}")
+if INGESTION_MODE == 'incremental':
+    print(f"Refreshed {len(refreshed_months)} month(s); the EDA below covers these months only")
 
 # ===============================
 # AUTOMATIC EDA ON GROUPED DATA
@@ -170,17 +236,16 @@ numeric_cols = [
 print("\n===== GROUPED DATA FEATURE SUMMARY =====")
 print(grouped_summary.describe())
 
+plots = PlotJobs()
+
 # Histograms
 for col in numeric_cols:
     if col in grouped_summary.columns:
-        plt.figure(figsize=(6,4))
-        sns.histplot(grouped_summary[col], bins=50, kde=True)
-        plt.title(f'Distribution of {col}')
-        plt.xlabel(col)
-        plt.ylabel('Frequency')
-        plt.tight_layout()
-        plt.savefig(os.path.join(EDA_OUTPUT_DIR, f'distribution_{col}.png'))
-        plt.close()
+        plots.add(
+            os.path.join(EDA_OUTPUT_DIR, f'distribution_{col}.png'), 'histplot',
+            grouped_summary[[col]], figsize=(6,4), x=col, bins=50, kde=True,
+            title=f'Distribution of {col}', xlabel=col, ylabel='Frequency', tight_layout=True
+        )
 
 # Outlier check (3*IQR)
 print("\n===== EXTREME OUTLIERS CHECK =====")
@@ -193,12 +258,12 @@ for col in numeric_cols:
         print(f"{col}: {len(outliers)} extreme outliers")
 
 # Correlation heatmap
-plt.figure(figsize=(10,8))
-sns.heatmap(grouped_summary[numeric_cols].corr(), annot=True, fmt=".2f", cmap='coolwarm')
-plt.title("Feature Correlation Matrix")
-plt.tight_layout()
-plt.savefig(os.path.join(EDA_OUTPUT_DIR, 'correlation_matrix.png'))
-plt.close()
+plots.add(
+    os.path.join(EDA_OUTPUT_DIR, 'correlation_matrix.png'), 'heatmap',
+    grouped_summary[numeric_cols].corr(), figsize=(10,8), annot=True, fmt=".2f", cmap='coolwarm',
+    title="Feature Correlation Matrix", tight_layout=True
+)
+plots.render()
 
 print(f"\n===== PREPROCESSING COMPLETE =====")
 print(f"EDA plots saved under: {EDA_OUTPUT_DIR}")
@@ -0,0 +1,78 @@
+# ===============================
+# USER-LEVEL BEHAVIOR AGGREGATION - DATASET 1
+# Purpose: Vectorized user aggregation for Dataset1_BEHAVIOR_INSIGHT.py
+#          (no per-group lambdas, no row-wise apply), same output as
+#            groupby(...).agg(lambda x: x.value_counts().idxmax(),
+#                             lambda x: (x == "Anomaly").mean())
+#            + derive_behavior() applied row by row
+# ===============================
+
+import numpy as np
+import pandas as pd
+
+BEHAVIOR_RISK = {
+    "Stable": "Low",
+    "Impulsive": "Medium",
+    "Inconsistent": "High"
+}
+
+
+def dominant_label(keys, labels):
+    """
+    Most frequent label per key; ties go to the label seen first, like
+    value_counts().idxmax().
+
+    Returns:
+    - Series indexed by key (sorted)
+    """
+    counts = (
+        pd.DataFrame({'key': keys.to_numpy(), 'label': labels.to_numpy(), 'pos': np.arange(len(keys))})
+        .groupby(['key', 'label'], sort=False, observed=True)['pos']
+        .agg(['size', 'min'])
+        .reset_index()
+        .sort_values(['key', 'size', 'min'], ascending=[True, False, True], kind='stable')
+    )
+    first = counts.drop_duplicates('key')
+    return pd.Series(first['label'].to_numpy(), index=first['key'].to_numpy())
+
+
+def aggregate_behavior(merged):
+    """
+    One row per client from the merged client-months (spending_intensity,
+    anomaly_label, anomaly_score).
+
+    Behavioral interpretation logic:
+    - Any detected anomaly -> Inconsistent behavior
+    - High dominant spending -> Impulsive behavior
+    - Otherwise -> Stable behavior
+
+    Returns:
+    - DataFrame: client_id, dominant_spending_intensity, anomaly_ratio,
+      max_anomaly_score, has_anomaly, behavior_type, behavior_risk_level,
+      behavior_justification
+    """
+    grouped = merged.assign(is_anomaly=merged["anomaly_label"] == "Anomaly").groupby("client_id")
+    user_agg = pd.DataFrame({
+        "dominant_spending_intensity": dominant_label(merged["client_id"], merged["spending_intensity"]),
+        "anomaly_ratio": grouped["is_anomaly"].mean(),
+        # most anomalous month of the user, for ranking
+        "max_anomaly_score": grouped["anomaly_score"].max()
+    })
+    user_agg.index.name = "client_id"
+    user_agg = user_agg.reset_index()
+
+    # Anomalies are rare; presence is more meaningful than frequency
+    user_agg["has_anomaly"] = user_agg["anomaly_ratio"] > 0
+
+    user_agg["behavior_type"] = np.select(
+        [user_agg["has_anomaly"], user_agg["dominant_spending_intensity"] == "High"],
+        ["Inconsistent", "Impulsive"],
+        default="Stable"
+    )
+    user_agg["behavior_risk_level"] = user_agg["behavior_type"].map(BEHAVIOR_RISK)
+
+    user_agg["behavior_justification"] = (
+        "Dominant intensity=" + user_agg["dominant_spending_intensity"].astype(str)
+        + ", anomaly_ratio=" + user_agg["anomaly_ratio"].round(2).astype(str)
+    )
+    return user_agg
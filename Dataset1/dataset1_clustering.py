@@ -0,0 +1,151 @@
+# ===============================
+# K-MEANS MODEL SELECTION - DATASET 1
+# Purpose: Choose k for Dataset1_MODEL1.py over a wide K range without the
+#          O(n^2) cost of a full silhouette:
+#            - silhouette on a random sample of rows (size and seed configurable)
+#            - elbow (knee of the inertia curve), no pairwise distances at all
+#            - MiniBatchKMeans instead of KMeans for large n
+#            - one process per k, fitted models returned for reuse
+# ===============================
+
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
+
+SELECTION_METHODS = ('silhouette', 'elbow')
+CLUSTER_ALGORITHMS = ('kmeans', 'minibatch', 'auto')
+MINIBATCH_ROWS = 200_000     # 'auto' switches to MiniBatchKMeans from this many rows
+MINIBATCH_BATCH_SIZE = 4_096
+
+_SWEEP_X = None  # matrix inherited by forked workers instead of pickled per task
+
+
+# ===============================
+# MODELS
+# ===============================
+def make_kmeans(k, n_rows, algorithm='kmeans', random_state=42):
+    """
+    KMeans, or MiniBatchKMeans for algorithm='minibatch' (or 'auto' with
+    at least MINIBATCH_ROWS rows).
+    """
+    if algorithm not in CLUSTER_ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {CLUSTER_ALGORITHMS}")
+    if algorithm == 'minibatch' or (algorithm == 'auto' and n_rows >= MINIBATCH_ROWS):
+        return MiniBatchKMeans(n_clusters=k, random_state=random_state, batch_size=MINIBATCH_BATCH_SIZE)
+    return KMeans(n_clusters=k, random_state=random_state)
+
+
+def _score_k(k, algorithm, random_state, sample_size, sample_seed, with_silhouette):
+    """
+    Fit one k on _SWEEP_X; returns its report row and the fitted model.
+    """
+    X = _SWEEP_X
+    start = time.perf_counter()
+    km = make_kmeans(k, len(X), algorithm, random_state).fit(X)
+    fit_seconds = time.perf_counter() - start
+
+    score, score_seconds = np.nan, 0.0
+    if with_silhouette:
+        start = time.perf_counter()
+        if sample_size is not None and sample_size < len(X):
+            score = silhouette_score(X, km.labels_, sample_size=sample_size, random_state=sample_seed)
+        else:
+            score = silhouette_score(X, km.labels_)
+        score_seconds = time.perf_counter() - start
+
+    row = {
+        'k': k,
+        'inertia': float(km.inertia_),
+        'silhouette': float(score),
+        'fit_seconds': fit_seconds,
+        'silhouette_seconds': score_seconds
+    }
+    return row, km
+
+
+def _score_k_worker(args):
+    # one thread per process: n_workers processes already fill the cores
+    with threadpool_limits(1):
+        return _score_k(*args)
+
+
+# ===============================
+# K SELECTION
+# ===============================
+def elbow_k(report):
+    """
+    Knee of the inertia curve: the k farthest below the straight line
+    joining the first and last point (both axes scaled to [0, 1]).
+    """
+    if len(report) < 3:
+        return int(report.loc[report['inertia'].idxmin(), 'k'])
+    k = report['k'].to_numpy(dtype=float)
+    inertia = report['inertia'].to_numpy()
+    x = (k - k.min()) / (k.max() - k.min())
+    y = (inertia - inertia.min()) / max(inertia.max() - inertia.min(), np.finfo(float).tiny)
+    return int(k[np.argmax((1 - x) - y)])
+
+
+def sweep_k(X, k_range, method='silhouette', algorithm='kmeans', random_state=42,
+            sample_size=None, sample_seed=42, n_workers=1):
+    """
+    Fit every k in `k_range` and choose one.
+
+    Parameters:
+    - method (str): 'silhouette' (highest score) or 'elbow' (knee of the inertia curve)
+    - sample_size (int, optional): rows used for each silhouette; None = all rows
+    - n_workers (int): processes, one k per task
+
+    Returns:
+    - (best_k, report, models): report has one row per k (inertia,
+      silhouette, fit and scoring seconds, chosen), models maps k to
+      its fitted estimator
+    """
+    global _SWEEP_X
+    if method not in SELECTION_METHODS:
+        raise ValueError(f"Unknown selection method {method!r}, expected one of {SELECTION_METHODS}")
+
+    tasks = [(k, algorithm, random_state, sample_size, sample_seed, method == 'silhouette') for k in k_range]
+    _SWEEP_X = X
+    try:
+        if n_workers > 1 and len(tasks) > 1 and 'fork' in mp.get_all_start_methods():
+            # fork: workers inherit X, and the pipeline scripts have no __main__ guard
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks)),
+                                     mp_context=mp.get_context('fork')) as pool:
+                results = list(pool.map(_score_k_worker, tasks))
+        else:
+            results = [_score_k(*task) for task in tasks]
+    finally:
+        _SWEEP_X = None
+
+    report = pd.DataFrame([row for row, _ in results])
+    models = {row['k']: km for row, km in results}
+    if method == 'silhouette':
+        # first k with the highest score, like a strict ">" running maximum
+        best_k = int(report.loc[report['silhouette'].idxmax(), 'k'])
+    else:
+        best_k = elbow_k(report)
+    report['chosen'] = report['k'] == best_k
+    return best_k, report, models
+
+
+def print_sweep_report(report, method, sample_size, n_rows):
+    if method == 'elbow':
+        # no silhouette is computed in elbow mode
+        print(f"\n===== K SELECTION ({method}) =====")
+        for row in report.itertuples():
+            print(f"k={row.k}, inertia={row.inertia:,.1f}, fit {row.fit_seconds:.2f}s"
+                  + ("  <- chosen" if row.chosen else ""))
+        return
+    scope = f"sample of {sample_size:,} rows" if sample_size is not None and sample_size < n_rows else "all rows"
+    print(f"\n===== K SELECTION ({method}, silhouette on {scope}) =====")
+    for row in report.itertuples():
+        print(f"k={row.k}, silhouette score={row.silhouette:.4f}, inertia={row.inertia:,.1f}, "
+              f"fit {row.fit_seconds:.2f}s, silhouette {row.silhouette_seconds:.2f}s"
+              + ("  <- chosen" if row.chosen else ""))
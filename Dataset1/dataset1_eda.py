@@ -0,0 +1,307 @@
+# ===============================
+# EDA STATISTICS - DATASET 1
+# Purpose: The Dataset1_EDA.py report, computed either from a DataFrame
+#          in memory (eda_report) or in one pass over typed chunks of the
+#          raw file with fixed memory (StreamingEDA):
+#            - sample:            reservoir (bottom-k random keys)
+#            - describe():        running count / mean / M2 / min / max
+#                                 (Welford, merged chunk by chunk), quantiles
+#                                 from a QuantileSketch or exact amount counts
+#            - per user / MCC / year counts and sums: hash aggregates merged
+#                                 across chunks (memory follows the number of
+#                                 keys, not rows)
+# ===============================
+
+import numpy as np
+import pandas as pd
+
+from dataset1_quantile_sketch import QuantileSketch, quantile_from_counts, DEFAULT_K
+from pipeline_schema import concat_typed
+
+DESCRIBE_INDEX = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+SEGMENT_QUANTILES = [0, 0.33, 0.66, 1.0]
+SEGMENT_LABELS = ['Low', 'Medium', 'Power']
+OUTLIER_FACTOR = 3
+
+
+# ===============================
+# SHARED REPORT PIECES
+# ===============================
+def _user_report(user_stats):
+    """
+    Describe table and segmentation counts from the per-user table.
+    """
+    segment = pd.qcut(user_stats['total_transactions'], q=SEGMENT_QUANTILES, labels=SEGMENT_LABELS)
+    return user_stats.describe(), segment.value_counts()
+
+
+def _top(series, n=10):
+    # largest first; ties keep key order so both paths print the same rows
+    return series.sort_index().sort_values(ascending=False, kind='stable').head(n)
+
+
+def _missing_table(missing_count, n_rows):
+    return pd.DataFrame({
+        'missing_count': missing_count,
+        'missing_percentage': missing_count / n_rows * 100
+    }).sort_values('missing_percentage', ascending=False, kind='stable')
+
+
+def _error_proportion(n_errors, n_rows):
+    proportion = pd.Series({False: (n_rows - n_errors) / n_rows, True: n_errors / n_rows}, name='proportion')
+    proportion.index.name = 'has_error'
+    return proportion.sort_values(ascending=False, kind='stable')
+
+
+# ===============================
+# IN-MEMORY REPORT
+# ===============================
+def eda_report(df, sample_size, random_state=42):
+    """
+    Full report from a DataFrame with amount and date already parsed.
+    """
+    user_stats = df.groupby('client_id').agg(
+        total_transactions=('id', 'count'),
+        total_amount=('amount', 'sum'),
+        avg_amount=('amount', 'mean')
+    )
+    user_describe, segment_counts = _user_report(user_stats)
+    spending = df.loc[df['amount'] > 0, 'amount']
+    refunds = df.loc[df['amount'] < 0, 'amount']
+    years = df['date'].dt.year
+
+    q1 = df['amount'].quantile(0.25)
+    q3 = df['amount'].quantile(0.75)
+    iqr = q3 - q1
+
+    return {
+        'shape': df.shape,
+        'missing': _missing_table(df.isna().sum(), len(df)),
+        'n_users': df['client_id'].nunique(),
+        'amount_describe': df['amount'].describe(),
+        'date_range': (df['date'].min(), df['date'].max()),
+        'sample': df.sample(min(sample_size, len(df)), random_state=random_state),
+        'user_describe': user_describe,
+        'spending_vs_refund': {'spending_tx': len(spending), 'refund_tx': len(refunds)},
+        'spending_describe': spending.describe(),
+        'refund_describe': refunds.describe(),
+        'top_mcc_counts': _top(df['mcc'].value_counts()),
+        'top_mcc_value': _top(df.groupby('mcc')['amount'].sum()),
+        'error_proportion': _error_proportion(int(df['errors'].notna().sum()), len(df)),
+        'yearly_tx': years.groupby(years).size().rename_axis('year'),
+        'yearly_amount': df['amount'].groupby(years).sum().rename_axis('year'),
+        'segment_counts': segment_counts,
+        'extreme_outliers': int(((df['amount'] < q1 - OUTLIER_FACTOR * iqr) |
+                                 (df['amount'] > q3 + OUTLIER_FACTOR * iqr)).sum()),
+        'quantile_note': "exact"
+    }
+
+
+# ===============================
+# STREAMING BUILDING BLOCKS
+# ===============================
+class RunningMoments:
+    """
+    count / mean / M2 / min / max of a stream, merged chunk by chunk with
+    the parallel form of Welford's update (Chan et al.), so the variance
+    never suffers from the catastrophic cancellation of sum-of-squares.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if n == 0:
+            return self
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = np.nanmin([self.min, values.min()])
+        self.max = np.nanmax([self.max, values.max()])
+        return self
+
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def describe(self, quantile, name='amount'):
+        """
+        pandas-style describe(); `quantile(q)` supplies the quartiles.
+        """
+        if self.count == 0:
+            values = [0.0] + [np.nan] * 7
+        else:
+            values = [float(self.count), self.mean, self.std(), self.min,
+                      quantile(0.25), quantile(0.5), quantile(0.75), self.max]
+        return pd.Series(values, index=DESCRIBE_INDEX, name=name)
+
+
+class AmountDistribution:
+    """
+    Moments plus quantiles of one amount stream: exact value counts
+    (amounts are cents, few distinct values) or a QuantileSketch
+    (fixed memory, approximate).
+    """
+
+    def __init__(self, quantile_method='sketch', k=DEFAULT_K, seed=42):
+        self.moments = RunningMoments()
+        self.quantile_method = quantile_method
+        self.sketch = QuantileSketch(k, seed=seed) if quantile_method == 'sketch' else None
+        self.counts = None
+
+    def update(self, values):
+        self.moments.update(values)
+        if self.sketch is not None:
+            self.sketch.update(values)
+        else:
+            chunk_counts = values.value_counts()
+            self.counts = chunk_counts if self.counts is None else self.counts.add(chunk_counts, fill_value=0)
+
+    def value_counts(self):
+        if self.sketch is not None:
+            return self.sketch.to_counts()
+        return self.counts if self.counts is not None else pd.Series(dtype='int64')
+
+    def describe(self):
+        counts = self.value_counts()
+        return self.moments.describe(lambda q: quantile_from_counts(counts, q))
+
+    def count_outside(self, lower, upper):
+        """
+        Values outside [lower, upper] (estimated from the sketch weights).
+        """
+        counts = self.value_counts()
+        return int(counts[(counts.index < lower) | (counts.index > upper)].sum())
+
+
+def _add(total, part):
+    return part if total is None else total.add(part, fill_value=0)
+
+
+# ===============================
+# STREAMING REPORT
+# ===============================
+class StreamingEDA:
+    """
+    One pass over typed chunks of the raw file:
+        eda = StreamingEDA(sample_size)
+        for chunk in iter_csv_with_schema(path, DATASET1_RAW_SCHEMA):
+            eda.update(chunk)
+        report = eda.report()
+    """
+
+    def __init__(self, sample_size, quantile_method='sketch', k=DEFAULT_K, seed=42):
+        self.sample_size = sample_size
+        self.quantile_method = quantile_method
+        self._rng = np.random.default_rng(seed)
+        self.n_rows = 0
+        self.columns = None
+        self.missing = None
+        self.date_min = pd.NaT
+        self.date_max = pd.NaT
+        self.amount = AmountDistribution(quantile_method, k, seed)
+        self.spending = AmountDistribution(quantile_method, k, seed + 1)
+        self.refunds = AmountDistribution(quantile_method, k, seed + 2)
+        self.user_tx = self.user_amount = self.user_amount_n = None
+        self.mcc_count = self.mcc_amount = None
+        self.year_tx = self.year_amount = None
+        self.n_errors = 0
+        self.sample = None
+        self.sample_keys = np.empty(0)
+
+    def _update_sample(self, chunk):
+        """
+        Reservoir sample: every row gets a uniform random key and the
+        `sample_size` smallest keys seen so far are kept, which is a uniform
+        sample without replacement of everything read.
+        """
+        keys = self._rng.random(len(chunk))
+        if len(self.sample_keys) >= self.sample_size:
+            take = keys < self.sample_keys.max()  # rows that can enter the reservoir
+            chunk, keys = chunk[take], keys[take]
+            if not len(chunk):
+                return
+        candidates = chunk if self.sample is None else concat_typed([self.sample, chunk])
+        keys = np.concatenate([self.sample_keys, keys])
+        if len(keys) > self.sample_size:
+            keep = np.sort(np.argpartition(keys, self.sample_size - 1)[:self.sample_size])
+            candidates, keys = candidates.iloc[keep].reset_index(drop=True), keys[keep]
+        self.sample, self.sample_keys = candidates, keys
+
+    def update(self, chunk):
+        self.n_rows += len(chunk)
+        self.columns = chunk.columns
+        self.missing = _add(self.missing, chunk.isna().sum())
+
+        amount = chunk['amount']
+        self.amount.update(amount)
+        self.spending.update(amount[amount > 0])
+        self.refunds.update(amount[amount < 0])
+        self.date_min = min(self.date_min, chunk['date'].min()) if pd.notna(self.date_min) else chunk['date'].min()
+        self.date_max = max(self.date_max, chunk['date'].max()) if pd.notna(self.date_max) else chunk['date'].max()
+
+        by_user = chunk.groupby('client_id')
+        self.user_tx = _add(self.user_tx, by_user['id'].count())
+        self.user_amount = _add(self.user_amount, by_user['amount'].sum())
+        self.user_amount_n = _add(self.user_amount_n, by_user['amount'].count())
+
+        self.mcc_count = _add(self.mcc_count, chunk['mcc'].value_counts())
+        self.mcc_amount = _add(self.mcc_amount, amount.groupby(chunk['mcc']).sum())
+
+        years = chunk['date'].dt.year
+        self.year_tx = _add(self.year_tx, years.groupby(years).size())
+        self.year_amount = _add(self.year_amount, amount.groupby(years).sum())
+
+        self.n_errors += int(chunk['errors'].notna().sum())
+        self._update_sample(chunk)
+        return self
+
+    def report(self):
+        user_stats = pd.DataFrame({
+            'total_transactions': self.user_tx.astype('int64'),
+            'total_amount': self.user_amount,
+            'avg_amount': self.user_amount / self.user_amount_n.where(self.user_amount_n > 0)
+        }).rename_axis('client_id')
+        user_describe, segment_counts = _user_report(user_stats)
+
+        amount_describe = self.amount.describe()
+        q1, q3 = amount_describe['25%'], amount_describe['75%']
+        iqr = q3 - q1
+
+        if self.quantile_method == 'sketch':
+            quantile_note = (f"QuantileSketch, rank error <= {self.amount.sketch.error_bound():.4%}, "
+                             f"{self.amount.sketch.size():,} items")
+        else:
+            quantile_note = f"exact, {len(self.amount.value_counts()):,} distinct amounts"
+
+        return {
+            'shape': (self.n_rows, len(self.columns)),
+            'missing': _missing_table(self.missing.astype('int64'), self.n_rows),
+            'n_users': len(user_stats),
+            'amount_describe': amount_describe,
+            'date_range': (self.date_min, self.date_max),
+            'sample': self.sample,
+            'user_describe': user_describe,
+            'spending_vs_refund': {'spending_tx': self.spending.moments.count,
+                                   'refund_tx': self.refunds.moments.count},
+            'spending_describe': self.spending.describe(),
+            'refund_describe': self.refunds.describe(),
+            'top_mcc_counts': _top(self.mcc_count.astype('int64').rename('count')),
+            'top_mcc_value': _top(self.mcc_amount.rename('amount')),
+            'error_proportion': _error_proportion(self.n_errors, self.n_rows),
+            'yearly_tx': self.year_tx.astype('int64').rename_axis('year'),
+            'yearly_amount': self.year_amount.rename('amount').rename_axis('year'),
+            'segment_counts': segment_counts,
+            'extreme_outliers': self.amount.count_outside(q1 - OUTLIER_FACTOR * iqr, q3 + OUTLIER_FACTOR * iqr),
+            'quantile_note': quantile_note
+        }
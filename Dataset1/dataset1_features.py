@@ -0,0 +1,209 @@
+# ===============================
+# CLIENT-MONTH FEATURE AGGREGATES - DATASET 1
+# Purpose: Client-month features per (client_id, time_window), either in one
+#          vectorized pass or from mergeable partial aggregates so the
+#          summary can be built from any number of transaction chunks
+# ===============================
+
+import numpy as np
+import pandas as pd
+
+KEYS = ['client_id', 'time_window']
+CATEGORY_PREFIX = 'cat_'
+SUMMARY_INPUTS = KEYS + ['amount', 'is_weekend', 'category']  # columns build_grouped_summary reads
+DATE_BLOCK_ROWS = 1_000_000  # dates converted at a time (bounds the int64 intermediates)
+_NO_PERIOD = np.iinfo(np.int32).min  # period ordinal stored for NaT
+
+
+# ===============================
+# SHARED HELPERS
+# ===============================
+def weekend_amount(df):
+    """
+    Amount on weekend rows, 0 elsewhere (summing it gives weekend spending).
+    """
+    return df['amount'].where(df['is_weekend'] == 1, 0.0)
+
+
+def time_window_labels(dates, time_window):
+    """
+    Period labels of `dates` ('2019-11' for monthly windows) as a
+    categorical: one small code per row instead of one string per row.
+    Categories are sorted, so groupby order matches plain strings.
+
+    Period ordinals are computed DATE_BLOCK_ROWS at a time into one int32
+    array, which is then overwritten with the codes, so no full-length
+    int64 array is built.
+    """
+    freq = dates.iloc[:0].dt.to_period(time_window).dtype.freq
+    codes = np.empty(len(dates), dtype=np.int32)
+    for start in range(0, len(dates), DATE_BLOCK_ROWS):
+        periods = dates.iloc[start:start + DATE_BLOCK_ROWS].dt.to_period(time_window).array
+        codes[start:start + DATE_BLOCK_ROWS] = np.where(periods.isna(), _NO_PERIOD, periods.asi8)
+    ordinals = np.unique(codes)
+    ordinals = ordinals[ordinals != _NO_PERIOD]
+    for start in range(0, len(codes), DATE_BLOCK_ROWS):
+        block = codes[start:start + DATE_BLOCK_ROWS]
+        block[:] = np.where(block == _NO_PERIOD, -1, np.searchsorted(ordinals, block))
+    categories = pd.PeriodIndex.from_ordinals(ordinals, freq=freq).astype(str)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=dates.index)
+
+
+def iso_weeks(dates):
+    """
+    ISO week numbers of `dates` (no NaT) as UInt8, like dates.dt.isocalendar().week,
+    computed DATE_BLOCK_ROWS at a time (isocalendar builds a three-column
+    frame for the whole series).
+    """
+    weeks = np.empty(len(dates), dtype=np.uint8)
+    for start in range(0, len(dates), DATE_BLOCK_ROWS):
+        weeks[start:start + DATE_BLOCK_ROWS] = dates.iloc[start:start + DATE_BLOCK_ROWS].dt.isocalendar().week
+    return pd.Series(weeks, index=dates.index).astype('UInt8')
+
+
+def plain_keys(summary):
+    """
+    Categorical key columns back to plain values, so summaries look the
+    same whether time_window was a string or a categorical.
+    """
+    for key in KEYS:
+        if isinstance(summary[key].dtype, pd.CategoricalDtype):
+            summary[key] = summary[key].astype(summary[key].cat.categories.dtype)
+    return summary
+
+
+def category_sums(df):
+    """
+    Spending per (client_id, time_window) x category as one pivot, with
+    categories in first-appearance order like df['category'].unique().
+    """
+    sums = df.groupby(KEYS + ['category'], observed=True)['amount'].sum().unstack('category')
+    return sums[df['category'].dropna().unique()]
+
+
+# ===============================
+# SINGLE-PASS FEATURE BUILDER
+# ===============================
+def build_grouped_summary(df):
+    """
+    All client-month features in one vectorized groupby (plus one pivot for
+    category ratios). Same columns and values as the original per-group
+    lambda + per-category merge loop, before median imputation.
+    """
+    # only the columns used, so the assign does not copy the whole transaction frame
+    grouped_summary = df[KEYS + ['amount']].assign(weekend_amount=weekend_amount(df)).groupby(KEYS, observed=True).agg(
+        total_spending=('amount', 'sum'),
+        transaction_count=('amount', 'count'),
+        avg_transaction_value=('amount', 'mean'),
+        spending_variance=('amount', 'var'),
+        max_amount=('amount', 'max'),
+        min_amount=('amount', 'min'),
+        weekend_spending_total=('weekend_amount', 'sum')
+    )
+
+    grouped_summary['weekend_spending_ratio'] = (
+        grouped_summary['weekend_spending_total'] / grouped_summary['total_spending']
+    )
+    grouped_summary.drop(columns=['weekend_spending_total'], inplace=True)
+
+    if 'category' in df.columns:
+        ratios = category_sums(df).div(grouped_summary['total_spending'], axis=0)
+        grouped_summary = grouped_summary.join(ratios.add_prefix('ratio_'))
+        grouped_summary.fillna(0, inplace=True)
+
+    return plain_keys(grouped_summary.reset_index())
+
+
+# ===============================
+# PARTIAL AGGREGATES
+# ===============================
+def partial_aggregate(df):
+    """
+    Aggregate one chunk of cleaned transactions into sufficient statistics.
+
+    One row per (client_id, time_window) with count, sum, mean, m2 (sum of
+    squared deviations from the mean), max, min, weekend_sum and one
+    cat_<category> sum per category when a 'category' column exists.
+    """
+    part = df[KEYS + ['amount']].assign(weekend_amount=weekend_amount(df)).groupby(KEYS, observed=True).agg(
+        count=('amount', 'count'),
+        sum=('amount', 'sum'),
+        mean=('amount', 'mean'),
+        m2=('amount', 'var'),
+        max=('amount', 'max'),
+        min=('amount', 'min'),
+        weekend_sum=('weekend_amount', 'sum')
+    )
+    part['m2'] = (part['m2'] * (part['count'] - 1)).fillna(0.0)
+
+    if 'category' in df.columns:
+        part = part.join(category_sums(df).add_prefix(CATEGORY_PREFIX))
+
+    return part
+
+
+def merge_partials(partials):
+    """
+    Merge partial aggregates that may share keys into one partial.
+
+    Counts and sums add, min/max combine, and m2 is merged with the
+    parallel-variance formula (Chan et al.) so no raw amounts are needed.
+    """
+    parts = pd.concat(partials, sort=False)
+    if not parts.index.has_duplicates:
+        return parts
+
+    grouped = parts.groupby(level=KEYS, sort=False)
+    count = grouped['count'].sum()
+    total = grouped['sum'].sum()
+    mean = total / count
+
+    delta = parts['mean'] - mean.reindex(parts.index)
+    m2 = (parts['m2'] + parts['count'] * delta ** 2).groupby(level=KEYS, sort=False).sum()
+
+    merged = pd.DataFrame({
+        'count': count,
+        'sum': total,
+        'mean': mean,
+        'm2': m2,
+        'max': grouped['max'].max(),
+        'min': grouped['min'].min(),
+        'weekend_sum': grouped['weekend_sum'].sum()
+    })
+
+    cat_cols = [c for c in parts.columns if c.startswith(CATEGORY_PREFIX)]
+    if cat_cols:
+        # min_count=1 keeps "never seen" as NaN, same as a missing merge row
+        merged = merged.join(grouped[cat_cols].sum(min_count=1))
+
+    return merged
+
+
+# ===============================
+# FINAL SUMMARY
+# ===============================
+def finalize_summary(part):
+    """
+    Turn merged sufficient statistics into the grouped_summary layout of
+    Dataset1_PREPROCESSING.py (before median imputation).
+    """
+    part = part.sort_index()
+    count = part['count']
+
+    summary = pd.DataFrame({
+        'total_spending': part['sum'],
+        'transaction_count': count.astype('int64'),
+        'avg_transaction_value': part['sum'] / count,
+        'spending_variance': (part['m2'] / (count - 1)).where(count > 1, np.nan),
+        'max_amount': part['max'],
+        'min_amount': part['min'],
+        'weekend_spending_ratio': part['weekend_sum'] / part['sum']
+    }, index=part.index)
+
+    cat_cols = [c for c in part.columns if c.startswith(CATEGORY_PREFIX)]
+    for col in cat_cols:
+        summary[f"ratio_{col[len(CATEGORY_PREFIX):]}"] = part[col] / part['sum']
+    if cat_cols:
+        summary.fillna(0, inplace=True)
+
+    return plain_keys(summary.reset_index())
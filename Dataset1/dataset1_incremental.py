@@ -0,0 +1,226 @@
+# ===============================
+# INCREMENTAL MONTHLY REFRESH - DATASET 1
+# Purpose: Ingest only new or modified monthly drops of raw transactions,
+#          replace their months in the transaction and summary stores, and
+#          mark the affected client-months for rescoring by Model1/Model2
+#          and Dataset1_BEHAVIOR_INSIGHT.py
+#
+# State:
+#   dataset1_manifest.json  processed files (size, mtime, sha1, months) plus
+#                           the outlier bounds, high-value threshold and
+#                           imputation medians frozen at the first build
+#   dataset1_rescore.csv    pending (client_id, time_window) keys; cleared by
+#                           Dataset1_BEHAVIOR_INSIGHT.py once rescored
+# ===============================
+
+import os
+import glob
+import json
+import hashlib
+import pandas as pd
+
+from dataset1_features import KEYS, build_grouped_summary
+from dataset1_ingest import clean_chunk, add_temporal_features
+from pipeline_storage import (
+    read_table, replace_partitions, table_exists, TRANSACTIONS_PARTITION, SUMMARY_PARTITION
+)
+from pipeline_schema import DATASET1_RAW_SCHEMA, read_csv_with_schema
+
+MANIFEST_NAME = "dataset1_manifest.json"
+RESCORE_NAME = "dataset1_rescore.csv"
+IMPUTE_COLS = ['spending_variance', 'weekend_spending_ratio']  # the only features that can be NaN
+
+
+# ===============================
+# MANIFEST
+# ===============================
+def load_manifest(manifest_file):
+    if not os.path.exists(manifest_file):
+        return {"files": {}}
+    with open(manifest_file) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, manifest_file):
+    # write then rename, so an interrupted refresh never leaves a half-written manifest
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+
+def file_sha1(path, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_incoming(incoming_dir, manifest):
+    """
+    Compare the monthly drops on disk with the manifest.
+
+    Returns (changed, removed, fingerprints): changed and removed are file
+    names, fingerprints maps every file on disk to its size/mtime/sha1.
+    Files whose size and mtime are unchanged are not re-hashed.
+    """
+    known = manifest["files"]
+    changed, fingerprints = [], {}
+    for path in sorted(glob.glob(os.path.join(incoming_dir, "*.csv"))):
+        name = os.path.basename(path)
+        stat = os.stat(path)
+        entry = known.get(name, {})
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            fingerprints[name] = entry
+            continue
+        sha1 = file_sha1(path)
+        fingerprints[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": sha1}
+        if entry.get("sha1") != sha1:
+            changed.append(name)
+        else:
+            fingerprints[name]["months"] = entry["months"]  # touched, not modified
+    removed = sorted(set(known) - set(fingerprints))
+    return changed, removed, fingerprints
+
+
+# ===============================
+# LOAD + CLEAN
+# ===============================
+def load_drop(path, time_window):
+    """
+    Read and clean one monthly drop; adds 'time_window' so rows can be
+    routed to their month.
+    """
+    df = clean_chunk(read_csv_with_schema(path, DATASET1_RAW_SCHEMA))
+    df['time_window'] = df['date'].dt.to_period(time_window).astype(str)
+    return df
+
+
+# ===============================
+# RESCORE MARKER
+# ===============================
+def mark_for_rescore(keys, rescore_file):
+    """
+    Add client-months to the pending rescore list (union with keys not yet
+    consumed by the model scripts).
+    """
+    if os.path.exists(rescore_file):
+        keys = pd.concat([pd.read_csv(rescore_file, dtype={'time_window': str}), keys])
+    keys = keys.drop_duplicates().sort_values(KEYS, ignore_index=True)
+    keys.to_csv(rescore_file, index=False)
+    return keys
+
+
+def pending_rescore(rescore_file):
+    """
+    Pending (client_id, time_window) keys, or None when nothing is marked.
+    """
+    if not os.path.exists(rescore_file):
+        return None
+    return pd.read_csv(rescore_file, dtype={'time_window': str})
+
+
+def clear_rescore(rescore_file):
+    if os.path.exists(rescore_file):
+        os.remove(rescore_file)
+
+
+# ===============================
+# INCREMENTAL PIPELINE
+# ===============================
+def refresh_incremental(incoming_dir, processed_file, grouped_file, state_dir, time_window='M',
+                        outlier_method='IQR', outlier_factor=3):
+    """
+    Rebuild only the months touched by new, modified or removed drops.
+
+    The first run (no manifest) processes every drop and freezes the IQR
+    bounds, high-value threshold and imputation medians; later runs reuse
+    them so an increment is filtered and imputed exactly like the history.
+
+    Both stores are updated here; the manifest is saved last, so an
+    interrupted refresh is simply redone on the next run.
+
+    Returns (grouped_summary, processed_rows, months): the imputed summary
+    of the refreshed months only, or (None, 0, []) when nothing changed.
+    """
+    manifest_file = os.path.join(state_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_file)
+    changed, removed, fingerprints = scan_incoming(incoming_dir, manifest)
+    if not changed and not removed:
+        print("No new or modified monthly files, nothing to refresh")
+        return None, 0, []
+
+    print(f"New/modified files: {len(changed)}, removed files: {len(removed)}")
+    frames = {name: load_drop(os.path.join(incoming_dir, name), time_window) for name in changed}
+    for name, df in frames.items():
+        fingerprints[name]["months"] = sorted(df['time_window'].unique())
+
+    # Months whose contents may differ: new months of changed drops plus
+    # the months those drops (or removed drops) covered before
+    months = set()
+    for name in changed:
+        months.update(fingerprints[name]["months"])
+    for name in changed + removed:
+        months.update(manifest["files"].get(name, {}).get("months", []))
+    months = sorted(months)
+
+    # Unchanged drops that share a month with the refresh are re-read too
+    for name, entry in fingerprints.items():
+        if name not in frames and set(entry.get("months", [])) & set(months):
+            frames[name] = load_drop(os.path.join(incoming_dir, name), time_window)
+
+    df = pd.concat(frames.values(), ignore_index=True) if frames else pd.DataFrame()
+    if len(df):
+        df = df[df['time_window'].isin(months)]
+    span = f" {months[0]}..{months[-1]}" if months else ""
+    print(f"Refreshing {len(months)} month(s){span} ({len(df)} expense rows)")
+
+    # Thresholds are frozen at the first build with rows
+    if "high_value_thresh" not in manifest and len(df):
+        lower_bound, upper_bound = float('-inf'), float('inf')
+        if outlier_method == 'IQR':
+            Q1 = df['amount'].quantile(0.25)
+            Q3 = df['amount'].quantile(0.75)
+            IQR = Q3 - Q1
+            lower_bound = Q1 - outlier_factor * IQR
+            upper_bound = Q3 + outlier_factor * IQR
+        manifest["time_window"] = time_window
+        manifest["lower_bound"] = float(lower_bound)
+        manifest["upper_bound"] = float(upper_bound)
+        in_bounds = df['amount'].between(lower_bound, upper_bound)
+        manifest["high_value_thresh"] = float(df.loc[in_bounds, 'amount'].quantile(0.95))
+    elif "time_window" in manifest and manifest["time_window"] != time_window:
+        raise ValueError(f"Manifest was built with TIME_WINDOW={manifest['time_window']!r}; "
+                         f"delete {manifest_file} to rebuild with {time_window!r}")
+
+    if len(df):
+        df = df[df['amount'].between(manifest["lower_bound"], manifest["upper_bound"])]
+        # time_window is recomputed last, in the same column position as a full build
+        df = add_temporal_features(df.drop(columns='time_window'), manifest["high_value_thresh"], time_window)
+        df = df.sort_values('date', kind='stable', ignore_index=True)
+        grouped_summary = build_grouped_summary(df)
+    else:
+        grouped_summary = pd.DataFrame(columns=KEYS)
+
+    # frozen from the first build with rows (drops that keep no rows have no medians)
+    if "impute_medians" not in manifest and len(grouped_summary):
+        manifest["impute_medians"] = {col: float(grouped_summary[col].median()) for col in IMPUTE_COLS}
+    for col, median in manifest.get("impute_medians", {}).items():
+        if col in grouped_summary.columns:
+            grouped_summary[col] = grouped_summary[col].fillna(median)
+
+    # Rescore both the client-months being written and those being replaced
+    # (a client can disappear from a modified month)
+    affected = grouped_summary[KEYS]
+    if table_exists(grouped_file):
+        previous = read_table(grouped_file, columns=KEYS, where={SUMMARY_PARTITION: months})
+        affected = pd.concat([affected, previous.astype({'time_window': str})])
+    mark_for_rescore(affected, os.path.join(state_dir, RESCORE_NAME))
+
+    replace_partitions(df, processed_file, TRANSACTIONS_PARTITION, months)
+    replace_partitions(grouped_summary, grouped_file, SUMMARY_PARTITION, months, order_by=KEYS)
+
+    manifest["files"] = fingerprints
+    save_manifest(manifest, manifest_file)
+    return grouped_summary, len(df), months
@@ -0,0 +1,161 @@
+# ===============================
+# STREAMING INGESTION - DATASET 1
+# Purpose: Read the raw transaction log in bounded chunks, clean each chunk,
+#          and build dataset1_summary from mergeable partial aggregates so
+#          peak memory follows CHUNK_SIZE instead of the file size
+# ===============================
+
+import numpy as np
+
+from dataset1_features import partial_aggregate, merge_partials, finalize_summary, time_window_labels, iso_weeks
+from dataset1_rollup import daily_partials, build_rollup_cube, write_rollup_cube
+from dataset1_quantile_sketch import QuantileSketch, quantile_from_counts, DEFAULT_K
+from pipeline_storage import write_table, TRANSACTIONS_PARTITION
+from pipeline_schema import DATASET1_RAW_SCHEMA, iter_csv_with_schema
+
+COMPACT_ROWS = 2_000_000  # merge buffered partials once they hold this many rows
+
+
+# ===============================
+# CHUNK CLEANING
+# ===============================
+def read_chunks(file_path, chunk_size):
+    """
+    Iterate over the raw CSV in typed chunks of `chunk_size` rows
+    (DATASET1_RAW_SCHEMA: compact dtypes, amount and date already parsed).
+    """
+    return iter_csv_with_schema(file_path, DATASET1_RAW_SCHEMA, chunk_size)
+
+
+def clean_chunk(chunk):
+    """
+    Missing-value drop and expense filter (same rules as the in-memory
+    path of Dataset1_PREPROCESSING.py).
+    """
+    chunk = chunk.dropna(subset=['amount', 'date'])
+    return chunk[chunk['amount'] > 0]
+
+
+def add_temporal_features(chunk, high_value_thresh, time_window):
+    """
+    Temporal, optional and time window features for a cleaned chunk.
+    """
+    chunk = chunk.copy()
+    chunk['year'] = chunk['date'].dt.year.astype('int16')
+    chunk['month'] = chunk['date'].dt.month.astype('int8')
+    chunk['week'] = iso_weeks(chunk['date'])
+    chunk['day_of_week'] = chunk['date'].dt.dayofweek.astype('int8')
+    chunk['is_weekend'] = chunk['day_of_week'].isin([5, 6]).astype('int8')
+    chunk['log_amount'] = np.log1p(chunk['amount'])
+    chunk['is_high_value'] = chunk['amount'] > high_value_thresh
+    chunk['time_window'] = time_window_labels(chunk['date'], time_window)
+    return chunk
+
+
+# ===============================
+# AMOUNT DISTRIBUTION (FIRST PASS)
+# ===============================
+def amount_counts(file_path, chunk_size):
+    """
+    First pass: frequency of every cleaned expense amount.
+    """
+    counts = None
+    for chunk in read_chunks(file_path, chunk_size):
+        chunk_counts = clean_chunk(chunk)['amount'].value_counts()
+        counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+    return counts.astype('int64')
+
+
+def amount_sketch(file_path, chunk_size, k=DEFAULT_K):
+    """
+    First pass, bounded memory: quantile sketch of every cleaned expense amount.
+    """
+    sketch = QuantileSketch(k)
+    for chunk in read_chunks(file_path, chunk_size):
+        sketch.update(clean_chunk(chunk)['amount'])
+    return sketch
+
+
+# ===============================
+# STREAMING PIPELINE
+# ===============================
+class PartialBuffer:
+    """
+    Partial aggregates of the chunks read so far, merged into one once
+    they hold more than COMPACT_ROWS rows.
+    """
+
+    def __init__(self):
+        self.partials = []
+        self.rows = 0
+        self.compact_at = COMPACT_ROWS
+
+    def add(self, part):
+        self.partials.append(part)
+        self.rows += len(part)
+        if self.rows > self.compact_at:
+            self.partials = [merge_partials(self.partials)]
+            self.rows = len(self.partials[0])
+            # grow the threshold so a summary with many distinct client-months is not re-merged every chunk
+            self.compact_at = max(COMPACT_ROWS, 2 * self.rows)
+
+    def merged(self):
+        return merge_partials(self.partials)
+
+
+def build_summary_streaming(file_path, processed_file, time_window='M', chunk_size=1_000_000,
+                            outlier_method='IQR', outlier_factor=3, quantile_method='exact',
+                            rollup_file=None):
+    """
+    Two passes over the raw file:
+      1. amount distribution -> IQR bounds and 95th percentile, either exact
+         (value frequencies, memory grows with distinct amounts) or from a
+         quantile sketch (quantile_method='sketch', bounded memory)
+      2. clean, filter and enrich each chunk, append it to `processed_file`
+         and fold it into the partial aggregates (and into the daily
+         partials of the rollup cube written to `rollup_file`, if given)
+
+    Returns (grouped_summary, processed_rows). grouped_summary has the same
+    columns as the in-memory path, before median imputation.
+    """
+    if quantile_method == 'sketch':
+        sketch = amount_sketch(file_path, chunk_size)
+        # the sketch is a weighted sample of the amounts; filtering and
+        # quantiles below work on it exactly like on the exact frequencies
+        counts = sketch.to_counts()
+        print(f"Expense rows after cleaning: {sketch.n} (sketch of {sketch.size()} items, "
+              f"rank error <= {sketch.error_bound():.4%})")
+    else:
+        counts = amount_counts(file_path, chunk_size)
+        print(f"Expense rows after cleaning: {counts.sum()} ({len(counts)} distinct amounts)")
+
+    lower_bound, upper_bound = -np.inf, np.inf
+    if outlier_method == 'IQR':
+        Q1 = quantile_from_counts(counts, 0.25)
+        Q3 = quantile_from_counts(counts, 0.75)
+        IQR = Q3 - Q1
+        lower_bound = Q1 - outlier_factor * IQR
+        upper_bound = Q3 + outlier_factor * IQR
+        counts = counts[(counts.index >= lower_bound) & (counts.index <= upper_bound)]
+    high_value_thresh = quantile_from_counts(counts, 0.95)
+
+    partials, processed_rows = PartialBuffer(), 0
+    day_partials = PartialBuffer() if rollup_file else None
+    for i, chunk in enumerate(read_chunks(file_path, chunk_size)):
+        chunk = clean_chunk(chunk)
+        chunk = chunk[(chunk['amount'] >= lower_bound) & (chunk['amount'] <= upper_bound)]
+        chunk = add_temporal_features(chunk, high_value_thresh, time_window)
+
+        write_table(chunk, processed_file, partition_by=TRANSACTIONS_PARTITION, append=(i > 0), part=i)
+        processed_rows += len(chunk)
+
+        partials.add(partial_aggregate(chunk))
+        if day_partials is not None:
+            day_partials.add(daily_partials(chunk))
+
+        print(f"Chunk {i + 1}: {processed_rows} rows processed")
+
+    if day_partials is not None:
+        write_rollup_cube(build_rollup_cube(day_partials.merged()), rollup_file)
+    grouped_summary = finalize_summary(partials.merged())
+    return grouped_summary, processed_rows
@@ -0,0 +1,123 @@
+# ===============================
+# INTERACTIVE CLUSTER / ANOMALY PLOT - DATASET 1
+# Purpose: Keep the Plotly scatter of Dataset1_EVALUATION.py usable at any
+#          number of client-months:
+#            - density-aware downsampling to a point budget: every anomaly
+#              is kept, normal points are thinned in the dense cells of a
+#              2D grid first, so sparse regions and outliers stay visible
+#            - hover text built column-wise instead of a row-wise apply
+#            - WebGL rendering (Scattergl) instead of one SVG node per point
+#          HTML size and browser render time are bounded by the budget,
+#          not by the number of rows.
+# ===============================
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+# ===============================
+# CONFIGURATION
+# ===============================
+MAX_POINTS = 50_000  # points drawn (None = every row)
+GRID_BINS = 100      # cells per axis of the density grid
+RANDOM_STATE = 42
+
+
+# ===============================
+# DOWNSAMPLING
+# ===============================
+def _cell_cap(counts, budget):
+    """
+    Largest per-cell cap c with sum(min(count, c)) <= budget.
+    """
+    counts = np.sort(counts)
+    # rows kept with cap = counts[i]: every smaller cell whole, the rest capped
+    kept = np.cumsum(counts) - counts + counts * np.arange(len(counts), 0, -1)
+    fits = np.searchsorted(kept, budget, side='right')
+    if fits == len(counts):
+        return counts[-1]
+    below = kept[fits - 1] if fits else 0
+    base = counts[fits - 1] if fits else 0
+    # raise the cap above `base` as far as the remaining budget allows
+    return base + (budget - below) // (len(counts) - fits)
+
+
+def downsample_points(x, y, keep, budget=MAX_POINTS, bins=GRID_BINS, random_state=RANDOM_STATE):
+    """
+    Positions of the rows to draw.
+
+    Parameters:
+    - x, y (array): plot coordinates
+    - keep (array of bool): rows always drawn (anomalies), even beyond the budget
+    - budget (int): total points; None = all rows
+
+    Returns:
+    - sorted integer positions: every `keep` row, plus the other rows
+      capped per grid cell so the total is at most max(budget, keep rows)
+    """
+    x, y, keep = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), np.asarray(keep, dtype=bool)
+    if budget is None or len(x) <= budget:
+        return np.arange(len(x))
+
+    rest = np.flatnonzero(~keep)
+    remaining = max(budget - int(keep.sum()), 0)
+
+    def bin_index(values):
+        lo, hi = values.min(), values.max()
+        scaled = (values - lo) / (hi - lo) if hi > lo else np.zeros_like(values)
+        return np.minimum((scaled * bins).astype(np.int64), bins - 1)
+
+    cells = bin_index(x[rest]) * bins + bin_index(y[rest])
+    cell_ids, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+    cap = _cell_cap(counts, remaining)
+
+    # random order within each cell; keep the first `cap` of every cell
+    rng = np.random.default_rng(random_state)
+    order = np.lexsort((rng.random(len(rest)), inverse))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(rest)) - starts[inverse[order]]
+    sampled = rest[order[rank < cap]]
+    return np.sort(np.concatenate([np.flatnonzero(keep), sampled]))
+
+
+# ===============================
+# FIGURE
+# ===============================
+def fixed(values, decimals):
+    """
+    Numbers as fixed-point strings, like f"{value:.{decimals}f}".
+    """
+    return pd.Series(np.char.mod(f"%.{decimals}f", np.asarray(values, dtype=np.float64)), index=values.index)
+
+
+def cluster_anomaly_figure(df, title, max_points=MAX_POINTS, render_mode='webgl'):
+    """
+    PCA scatter of clusters and anomalies (PCA1, PCA2, cluster, anomaly,
+    anomaly_label, anomaly_score, client_id, total_spending).
+
+    Returns:
+    - (fig, n_drawn)
+    """
+    rows = downsample_points(df['PCA1'], df['PCA2'], df['anomaly'] == -1, max_points)
+    plot_df = df.iloc[rows].copy()
+    plot_df['hover_text'] = (
+        "Client ID: " + plot_df['client_id'].astype(str)
+        + "<br>Cluster: " + plot_df['cluster'].astype(str)
+        + "<br>Anomaly: " + plot_df['anomaly_label'] + " (score " + fixed(plot_df['anomaly_score'], 3) + ")"
+        + "<br>Total Spending: " + fixed(plot_df['total_spending'], 2)
+    )
+    if len(plot_df) < len(df):
+        title += f" ({len(plot_df):,} of {len(df):,} points, all anomalies shown)"
+
+    fig = px.scatter(
+        plot_df,
+        x='PCA1',
+        y='PCA2',
+        color='cluster',
+        symbol='anomaly_label',
+        size=plot_df['anomaly'].map({1:5, -1:10}),
+        hover_name='hover_text',
+        title=title,
+        render_mode=render_mode
+    )
+    return fig, len(plot_df)
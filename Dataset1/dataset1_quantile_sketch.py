@@ -0,0 +1,142 @@
+# ===============================
+# STREAMING QUANTILES - DATASET 1
+# Purpose: Quantiles of the amount column without holding it in memory.
+#          QuantileSketch is a KLL-style compactor sketch that is fed chunk
+#          by chunk and merged across partitions; quantile_from_counts turns
+#          any value -> weight table (exact counts or a sketch) into the same
+#          linear-interpolated quantile pandas computes.
+#
+# Error bound:
+#   Compacting a level keeps every other item of a sorted buffer with twice
+#   the weight, which moves any rank by at most that level's weight (2^h).
+#   The sketch adds those weights up in `rank_error_bound`, so for any q
+#   the returned value has a true rank within rank_error_bound of q * n
+#   (worst case, deterministic). With random offsets the errors mostly
+#   cancel, and the observed error is far below the bound.
+#   Memory: at most k items per level, about k * log2(n / k) items in total.
+# ===============================
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 4096  # items per level; larger k = smaller error, more memory
+
+
+# ===============================
+# QUANTILES FROM VALUE WEIGHTS
+# ===============================
+def quantile_from_counts(counts, q):
+    """
+    Exact quantile (pandas/numpy 'linear' interpolation) from a Series of
+    value -> frequency. Amounts are cents, so the number of distinct values
+    stays small even when the number of rows does not.
+    """
+    counts = counts[counts > 0].sort_index()
+    cum = counts.to_numpy().cumsum()
+    values = counts.index.to_numpy(dtype=float)
+
+    h = (cum[-1] - 1) * q
+    lower = int(np.floor(h))
+    upper = min(lower + 1, cum[-1] - 1)
+    a = values[np.searchsorted(cum, lower, side='right')]
+    b = values[np.searchsorted(cum, upper, side='right')]
+    # interpolate exactly like Series.quantile does
+    return float(np.quantile(np.array([a, b]), h - lower))
+
+
+# ===============================
+# QUANTILE SKETCH
+# ===============================
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded memory.
+
+    Level h holds sorted items that each stand for 2^h input values.
+    Usage:
+        sketch = QuantileSketch()
+        for chunk in chunks:
+            sketch.update(chunk['amount'])
+        sketch.quantile(0.75), sketch.error_bound()
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=42):
+        self.k = k
+        self.n = 0
+        self.levels = []
+        self.rank_error_bound = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """
+        Add a chunk of values (NaN is ignored).
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self._add(0, np.sort(values))
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Fold another sketch (e.g. from another partition) into this one.
+        """
+        self.n += other.n
+        self.rank_error_bound += other.rank_error_bound
+        for h, items in enumerate(other.levels):
+            self._add(h, items)
+        self._compress()
+        return self
+
+    def _add(self, h, sorted_items):
+        while len(self.levels) <= h:
+            self.levels.append(np.empty(0))
+        # both inputs are sorted, so the stable sort is a linear merge of two runs
+        self.levels[h] = np.sort(np.concatenate([self.levels[h], sorted_items]), kind='stable')
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                # an odd item out stays at this level, pairs are halved
+                paired = len(items) - len(items) % 2
+                offset = self._rng.integers(2)
+                self.levels[h] = items[paired:]
+                self._add(h + 1, items[offset:paired:2])
+                self.rank_error_bound += 2 ** h
+            h += 1
+
+    # ===============================
+    # QUERIES
+    # ===============================
+    def to_counts(self):
+        """
+        The sketch as a value -> weight Series (weights sum to n).
+        """
+        values = np.concatenate(self.levels) if self.levels else np.empty(0)
+        weights = np.concatenate([np.full(len(items), 2 ** h, dtype=np.int64)
+                                  for h, items in enumerate(self.levels)]) if self.levels else np.empty(0, dtype=np.int64)
+        return pd.Series(weights, index=values).groupby(level=0).sum()
+
+    def quantile(self, q):
+        return quantile_from_counts(self.to_counts(), q)
+
+    def rank(self, x):
+        """
+        Estimated number of values <= x.
+        """
+        return int(sum(np.searchsorted(items, x, side='right') * 2 ** h
+                       for h, items in enumerate(self.levels)))
+
+    def error_bound(self):
+        """
+        Worst-case rank error as a fraction of n.
+        """
+        return self.rank_error_bound / self.n if self.n else 0.0
+
+    def size(self):
+        """
+        Number of items held (memory is 8 bytes per item).
+        """
+        return sum(len(items) for items in self.levels)
@@ -0,0 +1,91 @@
+# ===============================
+# SPENDING ROLLUP CUBE - DATASET 1
+# Purpose: Client aggregates at day, ISO-week, month and quarter
+#          granularity from one pass over the cleaned transactions.
+#          Only the daily partial aggregates are computed from rows; the
+#          coarser levels are merged from the finer ones (day -> week,
+#          day -> month -> quarter), and any level can be turned into the
+#          dataset1_summary layout without reprocessing raw data
+# ===============================
+
+import pandas as pd
+
+from dataset1_features import KEYS, partial_aggregate, merge_partials, finalize_summary, time_window_labels
+from pipeline_storage import write_table, read_table, ROLLUP_PARTITION
+
+ROLLUP_LEVELS = ['D', 'W', 'M', 'Q']  # period codes, same as TIME_WINDOW
+# finer level each coarser one is merged from; weeks straddle month
+# boundaries, so months are built from days, not from weeks
+ROLLUP_SOURCE = {'W': 'D', 'M': 'D', 'Q': 'M'}
+
+
+# ===============================
+# BUILD
+# ===============================
+def daily_partials(df):
+    """
+    Partial aggregates of cleaned transactions per (client_id, day).
+    """
+    cols = ['client_id', 'amount', 'is_weekend'] + (['category'] if 'category' in df.columns else [])
+    return partial_aggregate(df[cols].assign(time_window=time_window_labels(df['date'], 'D')))
+
+
+def coarsen(part, source, level):
+    """
+    Merge partial aggregates of `source` periods into `level` periods.
+    Only the distinct period labels are converted, not one per row.
+    """
+    windows = part.index.get_level_values('time_window')
+    labels = pd.Index(windows.unique().astype(str))
+    coarse = pd.PeriodIndex(labels, freq=source).asfreq(level).astype(str)
+    mapping = pd.Series(coarse, index=labels)
+    index = pd.MultiIndex.from_arrays(
+        [part.index.get_level_values('client_id'), mapping.reindex(windows.astype(str)).values],
+        names=KEYS
+    )
+    return merge_partials([part.set_axis(index)])
+
+
+def build_rollup_cube(day_part):
+    """
+    Every ROLLUP_LEVELS level from merged daily partials, stacked into one
+    table with a 'granularity' column (partial statistics, not ratios, so
+    the cube itself can be merged further).
+    """
+    levels = {'D': day_part}
+    for level in ROLLUP_LEVELS[1:]:
+        levels[level] = coarsen(levels[ROLLUP_SOURCE[level]], ROLLUP_SOURCE[level], level)
+
+    frames = []
+    for level in ROLLUP_LEVELS:
+        frame = levels[level].sort_index().reset_index()
+        frame.insert(0, ROLLUP_PARTITION, level)
+        frames.append(frame)
+    cube = pd.concat(frames, ignore_index=True, sort=False)
+    cube['time_window'] = cube['time_window'].astype(str)
+    return cube
+
+
+def write_rollup_cube(cube, path):
+    write_table(cube, path, partition_by=ROLLUP_PARTITION)
+    counts = cube[ROLLUP_PARTITION].value_counts().reindex(ROLLUP_LEVELS)
+    print("Rollup cube rows per granularity: " + ", ".join(f"{level}={n}" for level, n in counts.items()))
+
+
+# ===============================
+# QUERY
+# ===============================
+def read_rollup(path, granularity, impute_cols=None):
+    """
+    Summary at one granularity ('D', 'W', 'M' or 'Q') in the
+    dataset1_summary layout; only that level is read from the cube.
+    `impute_cols` are median-imputed like Dataset1_PREPROCESSING.py.
+    """
+    if granularity not in ROLLUP_LEVELS:
+        raise ValueError(f"Unknown granularity {granularity!r}, expected one of {ROLLUP_LEVELS}")
+    part = read_table(path, where={ROLLUP_PARTITION: [granularity]})
+    part = part.drop(columns=ROLLUP_PARTITION).set_index(KEYS)
+    summary = finalize_summary(part)
+    for col in impute_cols or []:
+        summary[col] = summary[col].fillna(summary[col].median())
+    return summary
@@ -0,0 +1,188 @@
+# ===============================
+# STREAMING PER-CLIENT ANOMALY DETECTOR - DATASET 1
+# Purpose: Flag unusual client-months as the data arrives instead of
+#          after the next batch Isolation Forest run (Dataset1_MODEL2.py):
+#            - per client, exponentially weighted mean/variance of the
+#              monthly summary features (total_spending, transaction_count)
+#            - O(1) work per new month (vectorized over the clients of a
+#              month) or per new transaction (running month totals)
+#            - a month is flagged when a feature is more than Z_THRESHOLD
+#              weighted std away from the client's own history; an open
+#              month is flagged as soon as its running totals cross the
+#              upper bound, before the month closes
+#          State is a few arrays and can be saved/loaded between runs.
+# ===============================
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# ===============================
+# CONFIGURATION
+# ===============================
+FEATURES = ['total_spending', 'transaction_count']
+ALPHA = 0.3            # weight of the newest month in the running mean/variance
+Z_THRESHOLD = 4.0      # flag beyond this many weighted std
+WARMUP_MONTHS = 6      # months of history before a client can be flagged
+MIN_STD_RATIO = 0.2    # std floor as a fraction of the mean (steady clients)
+
+
+class StreamingAnomalyDetector:
+    """
+    Per-client exponentially weighted statistics of monthly features.
+
+    Parameters:
+    - features (list): summary columns tracked per client
+    - alpha, z_threshold, warmup, min_std_ratio: see CONFIGURATION
+    """
+
+    def __init__(self, features=FEATURES, alpha=ALPHA, z_threshold=Z_THRESHOLD, warmup=WARMUP_MONTHS,
+                 min_std_ratio=MIN_STD_RATIO):
+        self.features = list(features)
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.min_std_ratio = min_std_ratio
+        self._index = {}                         # client_id -> row of the state arrays
+        self._mean = np.zeros((0, len(self.features)))
+        self._var = np.zeros((0, len(self.features)))
+        self._n = np.zeros(0, dtype=np.int64)
+        self._open = {}                          # client_id -> [time_window, spending, count] (transactions)
+
+    # ===============================
+    # STATE
+    # ===============================
+    def _rows(self, client_ids):
+        """
+        State rows of `client_ids`, adding unseen clients (arrays grow by doubling).
+        """
+        rows = np.empty(len(client_ids), dtype=np.int64)
+        for i, client in enumerate(client_ids):
+            row = self._index.get(client)
+            if row is None:
+                row = self._index[client] = len(self._index)
+            rows[i] = row
+        if len(self._index) > len(self._n):
+            size = max(len(self._index), 2 * len(self._n), 1024)
+            grow = size - len(self._n)
+            self._mean = np.vstack([self._mean, np.zeros((grow, len(self.features)))])
+            self._var = np.vstack([self._var, np.zeros((grow, len(self.features)))])
+            self._n = np.concatenate([self._n, np.zeros(grow, dtype=np.int64)])
+        return rows
+
+    def _std(self, rows):
+        return np.maximum(np.sqrt(self._var[rows]), self.min_std_ratio * np.abs(self._mean[rows]) + 1e-9)
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+    # ===============================
+    # MONTHLY UPDATES
+    # ===============================
+    def update(self, client_ids, X):
+        """
+        Score one window of closed months (each client at most once) against
+        each client's history, then fold them into that history.
+
+        Parameters:
+        - client_ids (array): clients of the window
+        - X (array): their feature values, columns in `features` order
+
+        Returns:
+        - (scores, flags): scores = largest |z| over the features (NaN
+          during warm-up); flags = scores > z_threshold
+        """
+        X = np.asarray(X, dtype=np.float64)
+        rows = self._rows(client_ids)
+        n = self._n[rows]
+
+        z = np.abs(X - self._mean[rows]) / self._std(rows)
+        scores = np.where(n >= self.warmup, z.max(axis=1), np.nan)
+
+        # incremental exponentially weighted mean/variance; the first month seeds the mean
+        first = n == 0
+        diff = X - self._mean[rows]
+        incr = self.alpha * diff
+        self._mean[rows] = np.where(first[:, None], X, self._mean[rows] + incr)
+        self._var[rows] = np.where(first[:, None], 0.0, (1 - self.alpha) * (self._var[rows] + diff * incr))
+        self._n[rows] = n + 1
+        return scores, scores > self.z_threshold
+
+    def replay(self, summary, time_col='time_window', client_col='client_id'):
+        """
+        Feed a client-month summary window by window, in time order.
+
+        Returns:
+        - DataFrame (client, window, stream_score, stream_flag) in the
+          summary's row order
+        """
+        result = pd.DataFrame({
+            client_col: summary[client_col].to_numpy(),
+            time_col: summary[time_col].to_numpy(),
+            'stream_score': np.nan,
+            'stream_flag': False
+        }, index=summary.index)
+        X = summary[self.features].fillna(0).to_numpy(dtype=np.float64)
+        clients = summary[client_col].to_numpy()
+        for _, positions in sorted(summary.groupby(time_col, sort=False).indices.items()):
+            scores, flags = self.update(clients[positions], X[positions])
+            result.iloc[positions, 2] = scores
+            result.iloc[positions, 3] = flags
+        return result.reset_index(drop=True)
+
+    # ===============================
+    # TRANSACTION UPDATES
+    # ===============================
+    def add_transaction(self, client_id, time_window, amount):
+        """
+        Add one transaction to the client's open month. A transaction from
+        a later month first closes the open one through update().
+
+        Returns:
+        - (live_flag, closed): live_flag = the open month's running totals
+          already exceed the client's upper bound; closed = (time_window,
+          score, flag) of a month closed by this call, else None
+        """
+        if not set(self.features) <= {'total_spending', 'transaction_count'}:
+            raise ValueError("Transaction updates track only total_spending and transaction_count")
+        closed = None
+        state = self._open.get(client_id)
+        if state is not None and state[0] != time_window:
+            scores, flags = self.update([client_id], [self._month_features(state)])
+            closed = (state[0], float(scores[0]), bool(flags[0]))
+            state = None
+        if state is None:
+            state = self._open[client_id] = [time_window, 0.0, 0]
+        state[1] += amount
+        state[2] += 1
+
+        # running totals only grow, so only the upper bound can be crossed early
+        row = self._rows([client_id])
+        if self._n[row[0]] < self.warmup:
+            return False, closed
+        upper = self._mean[row[0]] + self.z_threshold * self._std(row)[0]
+        return bool((self._month_features(state) > upper).any()), closed
+
+    def _month_features(self, state):
+        values = {'total_spending': state[1], 'transaction_count': state[2]}
+        return [values[feature] for feature in self.features]
+
+    def flush(self):
+        """
+        Close every open month (end of the stream).
+
+        Returns:
+        - DataFrame (client_id, time_window, stream_score, stream_flag)
+        """
+        if not self._open:
+            return pd.DataFrame(columns=['client_id', 'time_window', 'stream_score', 'stream_flag'])
+        clients = list(self._open)
+        windows = [self._open[c][0] for c in clients]
+        scores, flags = self.update(clients, [self._month_features(self._open[c]) for c in clients])
+        self._open = {}
+        return pd.DataFrame({'client_id': clients, 'time_window': windows,
+                             'stream_score': scores, 'stream_flag': flags})
@@ -1,13 +1,16 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_schema import DATASET2_RAW_SCHEMA, read_csv_with_schema
+from pipeline_plots import PlotJobs
 
 # =====================
 # LOAD DATA
 # =====================
 file_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset 2.csv"
-df2 = pd.read_csv(file_path)
+df2 = read_csv_with_schema(file_path, DATASET2_RAW_SCHEMA)
 
 print("===== DATA LOADED =====")
 print("Shape:", df2.shape)
@@ -35,27 +38,23 @@ expense_cols = ['Rent (USD)','Groceries (USD)','Eating Out (USD)','Entertainment
 # =====================
 # DISTRIBUTION PLOTS
 # =====================
+plots = PlotJobs()
+
 # Income distribution
-plt.figure(figsize=(8,6))
-sns.histplot(df2[income_col], bins=50, kde=True)
-plt.title("Income Distribution")
-plt.xlabel("Income (USD)")
-plt.ylabel("Count")
-plt.tight_layout()
-plt.savefig(os.path.join(output_folder, "Income_Distribution.png"))
-plt.close()
+plots.add(
+    os.path.join(output_folder, "Income_Distribution.png"), 'histplot',
+    df2[[income_col]], figsize=(8,6), x=income_col, bins=50, kde=True,
+    title="Income Distribution", xlabel="Income (USD)", ylabel="Count", tight_layout=True
+)
 
 # Expenses distribution
 for col in expense_cols:
-    plt.figure(figsize=(8,6))
-    sns.histplot(df2[col], bins=50, kde=True)
-    plt.title(f"{col} Distribution")
-    plt.xlabel(col)
-    plt.ylabel("Count")
-    plt.tight_layout()
     safe_name = col.replace(" (USD)","").replace(" ","_")
-    plt.savefig(os.path.join(output_folder, f"{safe_name}_Distribution.png"))
-    plt.close()
+    plots.add(
+        os.path.join(output_folder, f"{safe_name}_Distribution.png"), 'histplot',
+        df2[[col]], figsize=(8,6), x=col, bins=50, kde=True,
+        title=f"{col} Distribution", xlabel=col, ylabel="Count", tight_layout=True
+    )
 
 # =====================
 # EXPENSE RATIO
@@ -63,25 +62,22 @@ for col in expense_cols:
 df2['Total_Expense'] = df2[expense_cols].sum(axis=1)
 df2['Expense_to_Income_Ratio'] = df2['Total_Expense'] / df2[income_col]
 
-plt.figure(figsize=(8,6))
-sns.histplot(df2['Expense_to_Income_Ratio'], bins=50, kde=True)
-plt.title("Expense to Income Ratio Distribution")
-plt.xlabel("Expense/Income")
-plt.ylabel("Count")
-plt.tight_layout()
-plt.savefig(os.path.join(output_folder, "Expense_to_Income_Ratio_Distribution.png"))
-plt.close()
+plots.add(
+    os.path.join(output_folder, "Expense_to_Income_Ratio_Distribution.png"), 'histplot',
+    df2[['Expense_to_Income_Ratio']], figsize=(8,6), x='Expense_to_Income_Ratio', bins=50, kde=True,
+    title="Expense to Income Ratio Distribution", xlabel="Expense/Income", ylabel="Count", tight_layout=True
+)
 
 # =====================
 # CORRELATION HEATMAP
 # =====================
-plt.figure(figsize=(12,10))
 corr = df2[[income_col]+expense_cols].corr()
-sns.heatmap(corr, annot=True, fmt=".2f", cmap="coolwarm")
-plt.title("Correlation Heatmap")
-plt.tight_layout()
-plt.savefig(os.path.join(output_folder, "Correlation_Heatmap.png"))
-plt.close()
+plots.add(
+    os.path.join(output_folder, "Correlation_Heatmap.png"), 'heatmap',
+    corr, figsize=(12,10), annot=True, fmt=".2f", cmap="coolwarm",
+    title="Correlation Heatmap", tight_layout=True
+)
+plots.render()
 
 # =====================
 # SKEWNESS DETECTION
@@ -1,8 +1,13 @@
 import pandas as pd
 import os
+import sys
 import numpy as np
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
-from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import read_table, table_exists
+from pipeline_evaluation import sampled_silhouette, timed_davies_bouldin, write_report
 
 # =====================
 # PATHS
@@ -13,6 +18,10 @@ model5_results = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_model5_
 evaluation_folder = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_evaluation"
 os.makedirs(evaluation_folder, exist_ok=True)
 
+SILHOUETTE_SAMPLE_SIZE = 20_000  # rows per stratified silhouette sample (exact below this; None = always exact)
+SILHOUETTE_SAMPLES = 5           # samples for the mean and 95% confidence interval
+report = {}                      # machine-readable metrics, saved next to the text summary
+
 # =====================
 # LOAD MODEL RESULTS
 # =====================
@@ -23,7 +32,7 @@ rf_feature_file = os.path.join(model3_results, "RandomForest_Feature_Importance.
 vis_actual_vs_pred = os.path.join(model3_results, "Actual_vs_Predicted.png")
 vis_feature_importance = os.path.join(model3_results, "Feature_Importance.png")
 
-predictions_df = pd.read_csv(pred_file) if os.path.exists(pred_file) else None
+predictions_df = read_table(pred_file) if table_exists(pred_file) else None
 rf_feature_importance = pd.read_csv(rf_feature_file) if os.path.exists(rf_feature_file) else None
 
 # Model 4: Overspending / Anomaly Detection
@@ -36,7 +45,7 @@ kmeans_counts_file = os.path.join(model5_results, "KMeans_Cluster_Counts.csv")
 clustered_data_file = os.path.join(model5_results, "dataset2_clustered.csv") 
 kmeans_summary = pd.read_csv(kmeans_summary_file) if os.path.exists(kmeans_summary_file) else None
 kmeans_counts = pd.read_csv(kmeans_counts_file) if os.path.exists(kmeans_counts_file) else None
-clustered_df = pd.read_csv(clustered_data_file) if os.path.exists(clustered_data_file) else None
+clustered_df = read_table(clustered_data_file) if table_exists(clustered_data_file) else None
 
 # =====================
 # EVALUATION SUMMARY
@@ -62,7 +71,8 @@ with open(summary_text_file, "w") as f:
         # Metrics
         y_true = predictions_df['Actual']
         y_pred_linear = predictions_df['Pred_Linear']
-        y_pred_rf = predictions_df['Pred_RF']
+        # Model 3 saves the Random Forest predictions as overspending_risk
+        y_pred_rf = predictions_df['Pred_RF' if 'Pred_RF' in predictions_df else 'overspending_risk']
 
         r2_linear = r2_score(y_true, y_pred_linear)
         mae_linear = mean_absolute_error(y_true, y_pred_linear)
@@ -77,6 +87,11 @@ with open(summary_text_file, "w") as f:
         f.write(f"Random Forest     -> R²: {r2_rf:.4f}, RMSE: {rmse_rf:.2f}, MAE: {mae_rf:.2f}\n")
 
         best_model_3 = "Linear Regression" if r2_linear > r2_rf else "Random Forest"
+        report['model3_regression'] = {
+            'linear_regression': {'r2': r2_linear, 'rmse': rmse_linear, 'mae': mae_linear},
+            'random_forest': {'r2': r2_rf, 'rmse': rmse_rf, 'mae': mae_rf},
+            'best': best_model_3
+        }
         f.write(f"Best model based on evaluation: {best_model_3}\n\n")
     
     f.write("Visualizations (check saved images):\n")
@@ -106,10 +121,27 @@ with open(summary_text_file, "w") as f:
     
     if clustered_df is not None and 'cluster' in clustered_df.columns:
         try:
-            X = clustered_df.drop(columns=['cluster']).values
+            # Model 5 clustered the standardized expense features (the summary
+            # columns), not ID or the PCA coordinates
+            cluster_features = [c for c in kmeans_summary.columns if c != 'cluster']
+            X = StandardScaler().fit_transform(clustered_df[cluster_features])
             cluster_labels = clustered_df['cluster'].values
-            sil_score = silhouette_score(X, cluster_labels)
+            silhouette_report = sampled_silhouette(X, cluster_labels, sample_size=SILHOUETTE_SAMPLE_SIZE,
+                                                   n_samples=SILHOUETTE_SAMPLES)
+            db_report = timed_davies_bouldin(X, cluster_labels)
+            report['model5_kmeans'] = {
+                'n_rows': len(clustered_df),
+                'features': cluster_features,
+                'silhouette': silhouette_report,
+                'davies_bouldin': db_report
+            }
+            sil_score = silhouette_report['silhouette']
             f.write(f"Silhouette Score: {sil_score:.4f}\n")
+            if not silhouette_report['exact']:
+                f.write(f"  (mean of {silhouette_report['n_samples']} stratified samples of "
+                        f"{silhouette_report['sample_size']} rows, 95% CI "
+                        f"{silhouette_report['ci_low']:.4f} - {silhouette_report['ci_high']:.4f})\n")
+            f.write(f"Davies-Bouldin Index: {db_report['davies_bouldin']:.4f}\n")
             f.write("Representative cluster centroids (cluster means):\n")
             f.write(kmeans_summary.to_string(index=False))
             f.write(f"\nRecommended n_clusters based on silhouette score: {len(kmeans_counts)}\n\n")
@@ -119,4 +151,5 @@ with open(summary_text_file, "w") as f:
         f.write("Silhouette score calculation skipped (dataset with cluster labels not found)\n\n")
 
 print(f"Evaluation summary saved to: {summary_text_file}")
+write_report(os.path.join(evaluation_folder, "Dataset2_Evaluation_Report.json"), report)
 print("Evaluation complete. Output saved to Dataset2_Evaluation_Summary.txt")
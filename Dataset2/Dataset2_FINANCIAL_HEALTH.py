@@ -1,6 +1,11 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import read_table
+from dataset2_features import load_features, RATIO_COLS
 
 # =========================
 # CONFIG
@@ -10,20 +15,27 @@ BASE_DIR = "/Users/anandhytapratamaputrisutisna/FYP2/Dataset2"
 
 model3_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_model3_results/Budget_Forecasting_Predictions.csv"
 model4_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_model4_results/Dataset2_Anomalies.csv"
+model4_scores_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_model4_results/Dataset2_Anomaly_Scores.csv"
 model5_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_model5_results/dataset2_clustered.csv"
+raw_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/Dataset 2.csv"
 
 OUTPUT_DIR = f"{BASE_DIR}/dataset2_financial_health"
 OUTPUT_PATH = f"{OUTPUT_DIR}/financial_health.csv"
 
+# None = Model 4 labels; e.g. 0.05 = anomaly when anomaly_score > 0.05 (stricter, no refit)
+ANOMALY_SCORE_THRESHOLD = None
+# False = ratios as Model 4 reports them (anomalous rows only); True = ratios of every ID
+RATIOS_FROM_FEATURES = False
+
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # =========================
 # LOAD DATA
 # =========================
 
-df_m3 = pd.read_csv(model3_path)
-df_m4 = pd.read_csv(model4_path)
-df_m5 = pd.read_csv(model5_path)
+df_m3 = read_table(model3_path)
+df_m4 = read_table(model4_path)
+df_m5 = read_table(model5_path, columns=["ID", "cluster"])
 
 print("===== DATA LOADED =====")
 print("Model 3:", df_m3.shape)
@@ -38,42 +50,27 @@ df = df_m3.merge(df_m4, on="ID", how="left")
 df = df.merge(df_m5[["ID", "cluster"]], on="ID", how="left")
 
 # =========================
-# CALCULATE RATIOS
+# RATIOS
 # =========================
-
-# Savings rate
-if "savings_rate" not in df.columns:
-    if all(col in df.columns for col in ["Income (USD)", "Expense (USD)"]):
-        df["savings_rate"] = (
-            (df["Income (USD)"] - df["Expense (USD)"])
-            / (df["Income (USD)"] + 1e-6)
-        )
-    else:
-        df["savings_rate"] = np.nan
-
-# Expense to income ratio
-if "expense_to_income_ratio" not in df.columns:
-    if all(col in df.columns for col in ["Expense (USD)", "Income (USD)"]):
-        df["expense_to_income_ratio"] = (
-            df["Expense (USD)"] / (df["Income (USD)"] + 1e-6)
-        )
-    else:
-        df["expense_to_income_ratio"] = np.nan
-
-# Discretionary vs fixed ratio
-if "discretionary_vs_fixed_ratio" not in df.columns:
-    if all(col in df.columns for col in ["Discretionary (USD)", "Fixed (USD)"]):
-        df["discretionary_vs_fixed_ratio"] = (
-            df["Discretionary (USD)"] / (df["Fixed (USD)"] + 1e-6)
-        )
-    else:
-        df["discretionary_vs_fixed_ratio"] = np.nan
+# Model 4 carries the ratios of its anomalous rows only; missing ratio
+# columns (or every row with RATIOS_FROM_FEATURES) come from the shared
+# Dataset 2 features instead of being re-derived here
+if RATIOS_FROM_FEATURES or not all(col in df.columns for col in RATIO_COLS):
+    df_ratios, _, _ = load_features(raw_path, columns=["ID"] + RATIO_COLS)
+    df_ratios = df_ratios.astype({"ID": df["ID"].dtype})
+    df = df.drop(columns=RATIO_COLS, errors="ignore").merge(df_ratios, on="ID", how="left")
 
 # =========================
 # NORMALIZE ANOMALY
 # =========================
+# Continuous Isolation Forest score of every row (> 0 = anomaly, higher = more anomalous)
+df_scores = read_table(model4_scores_path, columns=["ID", "anomaly_score"])
+df = df.drop(columns=["anomaly_score"], errors="ignore").merge(df_scores, on="ID", how="left")
+
 # Isolation Forest: -1 = anomaly, 1 = normal
-if "anomaly" in df.columns:
+if ANOMALY_SCORE_THRESHOLD is not None:
+    df["anomaly"] = (df["anomaly_score"] > ANOMALY_SCORE_THRESHOLD).astype(int)
+elif "anomaly" in df.columns:
     df["anomaly"] = df["anomaly"].map({-1: 1, 1: 0})
 else:
     df["anomaly"] = np.nan
@@ -171,6 +168,7 @@ final_cols = [
     "discretionary_vs_fixed_ratio",
     "cluster",
     "anomaly",
+    "anomaly_score",
     "financial_health",
     "financial_risk_level",   # 👈 NEW
     "health_score",
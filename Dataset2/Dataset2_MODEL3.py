@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.model_selection import train_test_split
@@ -8,20 +9,19 @@ from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import write_table
+from pipeline_registry import ModelRegistry
+from dataset2_features import load_features
+
 # =====================
 # PATHS 
 # =====================
-data_path = "Data/dataset2_processed.csv"
+raw_path = "Data/Dataset 2.csv"
 model3_results = "Data/dataset2_model3_results"
 os.makedirs(model3_results, exist_ok=True)
-
-# =====================
-# LOAD DATA
-# =====================
-df = pd.read_csv(data_path)
-print("===== DATA LOADED =====")
-print(df.info())
-print(df.head())
+model_registry_dir = "Data/model_registry"
+registry = ModelRegistry(model_registry_dir)
 
 # =====================
 # FEATURES & TARGET
@@ -33,6 +33,15 @@ feature_columns = [
 ]
 target_column = "total_expense"
 
+# =====================
+# LOAD DATA
+# =====================
+# Processed features from memory or the memory-mapped store (dataset2_features)
+df, _, _ = load_features(raw_path, columns=["ID"] + feature_columns + [target_column])
+print("===== DATA LOADED =====")
+print(df.info())
+print(df.head())
+
 X = df[feature_columns]
 y = df[target_column]
 
@@ -41,11 +50,24 @@ y = df[target_column]
 # =====================
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
+# Fitted regressors are registered with their test metrics and reused while
+# the training split is unchanged
+train_data = X_train.assign(**{target_column: y_train})
+
+def fit_regressor(model):
+    def fit():
+        model.fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+        return {'model': model}, {'mse': mean_squared_error(y_test, y_pred), 'r2': r2_score(y_test, y_pred)}
+    return fit
+
 # =====================
 # LINEAR REGRESSION
 # =====================
-lin_reg = LinearRegression()
-lin_reg.fit(X_train, y_train)
+saved, lin_meta, _ = registry.fit_or_load(
+    "dataset2_budget_linear_regression", fit_regressor(LinearRegression()), train_data, feature_columns,
+    params={'test_size': 0.2, 'random_state': 42}, tags={'target': target_column})
+lin_reg = saved['model']
 y_pred_lin = lin_reg.predict(X_test)
 mse_lin = mean_squared_error(y_test, y_pred_lin)
 r2_lin = r2_score(y_test, y_pred_lin)
@@ -54,8 +76,11 @@ print(f"Linear Regression - MSE: {mse_lin:.2f}, R2: {r2_lin:.3f}")
 # =====================
 # RANDOM FOREST REGRESSION
 # =====================
-rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
-rf_model.fit(X_train, y_train)
+saved, rf_meta, _ = registry.fit_or_load(
+    "dataset2_budget_random_forest", fit_regressor(RandomForestRegressor(n_estimators=100, random_state=42)),
+    train_data, feature_columns,
+    params={'n_estimators': 100, 'test_size': 0.2, 'random_state': 42}, tags={'target': target_column})
+rf_model = saved['model']
 y_pred_rf = rf_model.predict(X_test)
 mse_rf = mean_squared_error(y_test, y_pred_rf)
 r2_rf = r2_score(y_test, y_pred_rf)
@@ -86,7 +111,7 @@ predictions_df = predictions_df.rename(columns={"Pred_RF": "overspending_risk"})
 # pastikan tipe ID sama dengan dataframe lain
 predictions_df['ID'] = predictions_df['ID'].astype(float)
 
-predictions_df.to_csv(os.path.join(model3_results, "Budget_Forecasting_Predictions.csv"), index=False)
+write_table(predictions_df, os.path.join(model3_results, "Budget_Forecasting_Predictions.csv"))
 print(f"Predictions saved to: {model3_results}")
 
 # =====================
@@ -1,21 +1,29 @@
 import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.ensemble import IsolationForest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import write_table
+from pipeline_registry import ModelRegistry
+from pipeline_anomaly import make_isolation_forest, anomaly_scores
+from dataset2_features import load_features
 
 # =====================
 # PATHS
 # =====================
-data_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_processed.csv"
+raw_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/Dataset 2.csv"
 results_folder = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_model4_results"
 os.makedirs(results_folder, exist_ok=True)
+model_registry_dir = "/Users/anandhytapratamaputrisutisna/FYP2/Data/model_registry"
 
 # =====================
 # LOAD DATA
 # =====================
-df = pd.read_csv(data_path)
+# Processed features from memory or the memory-mapped store (dataset2_features)
+df, _, _ = load_features(raw_path)
 print("===== DATA LOADED =====")
 print(df.info())
 print(df.head())
@@ -25,8 +33,20 @@ print("Missing values per column:\n", df.isna().sum())
 # ANOMALY / OVERSPENDING DETECTION
 # =====================
 numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
-iso = IsolationForest(contamination='auto', random_state=42)
-df['anomaly'] = iso.fit_predict(df[numeric_cols])  # -1 = anomaly, 1 = normal
+# Reuse the registered forest while the processed data is unchanged
+def fit_isolation_forest():
+    iso = make_isolation_forest('auto', 42).fit(df[numeric_cols])
+    _, labels = anomaly_scores(iso, df[numeric_cols])
+    return {'iso': iso}, {'n_anomalies': int((labels == -1).sum()), 'anomaly_rate': float((labels == -1).mean())}
+
+registry = ModelRegistry(model_registry_dir)
+saved, _, _ = registry.fit_or_load(
+    "dataset2_model4_isolation_forest", fit_isolation_forest, df[numeric_cols], numeric_cols,
+    params={'contamination': 'auto', 'random_state': 42})
+iso = saved['iso']
+scores, labels = anomaly_scores(iso, df[numeric_cols])
+df['anomaly'] = labels  # -1 = anomaly, 1 = normal
+df['anomaly_score'] = scores  # > 0 = anomaly, higher = more anomalous
 
 num_anomalies = (df['anomaly'] == -1).sum()
 percent_anomalies = num_anomalies / len(df) * 100
@@ -36,7 +56,9 @@ anomaly_clients = df[df['anomaly'] == -1]['ID'].tolist()
 # SAVE RESULTS
 # =====================
 df_anomaly = df[df['anomaly'] == -1]
-df_anomaly.to_csv(os.path.join(results_folder, "Dataset2_Anomalies.csv"), index=False)
+write_table(df_anomaly, os.path.join(results_folder, "Dataset2_Anomalies.csv"))
+# Score of every row, so later stages can rank or re-threshold without refitting
+write_table(df[['ID', 'anomaly', 'anomaly_score']], os.path.join(results_folder, "Dataset2_Anomaly_Scores.csv"))
 
 iso_summary = pd.DataFrame([{
     'Model': 'IsolationForest_auto',
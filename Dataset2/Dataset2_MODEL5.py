@@ -1,26 +1,29 @@
 import os
-import pandas as pd
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
 from sklearn.cluster import KMeans
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import write_table
+from pipeline_registry import ModelRegistry
+from pipeline_feature_cache import feature_cache_dir
+from pipeline_projection import project
+from pipeline_minibatch import scan_table, fit_minibatch_kmeans, cluster_stats, write_clusters
+from dataset2_features import load_features, subset_scaler, scaled_columns
+
 # =====================
 # PATHS
 # =====================
 data_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_processed.csv"  # pake versi processed, bukan scaled
+raw_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/Dataset 2.csv"  # in-core: processed + scaled features from dataset2_features
 results_folder = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_model5_results"
 os.makedirs(results_folder, exist_ok=True)
+model_registry_dir = "/Users/anandhytapratamaputrisutisna/FYP2/Data/model_registry"
 
-# =====================
-# LOAD DATA
-# =====================
-df = pd.read_csv(data_path)
-print("===== DATA LOADED =====")
-print(df.info())
-print(df.head())
+# True = stream data_path from disk (MiniBatchKMeans partial_fit) for tables larger than memory
+OUT_OF_CORE = False
 
 # =====================
 # SELECT FEATURES FOR CLUSTERING
@@ -32,34 +35,94 @@ expense_cols = ['Rent (USD)', 'Groceries (USD)', 'Eating Out (USD)',
                 'Travel (USD)', 'Fitness (USD)', 'Miscellaneous (USD)',
                 'total_expense', 'savings_rate', 'expense_to_income_ratio', 
                 'discretionary_vs_fixed_ratio']
+n_clusters = 4
+
+# =====================
+# OUT-OF-CORE CLUSTERING
+# =====================
+# Same outputs without loading the table: summary and counts cover every
+# row, the PCA plot shows the in-memory sample
+if OUT_OF_CORE:
+    scaler, sample, n_rows = scan_table(data_path, expense_cols, fill_value=None)
+    kmeans = fit_minibatch_kmeans(data_path, expense_cols, n_clusters, scaler, sample, fill_value=None)
+    stats, inertia = cluster_stats(data_path, expense_cols, scaler, kmeans, fill_value=None)
+
+    X_pca, pca = project(scaler.transform(sample[expense_cols].to_numpy(dtype=np.float64)))
+    write_clusters(data_path, os.path.join(results_folder, "dataset2_clustered.csv"), expense_cols, scaler, kmeans,
+                   pca=pca, pca_columns=('PCA1', 'PCA2'), fill_value=None)
+
+    stats.xs('mean', axis=1, level=1).to_csv(os.path.join(results_folder, "KMeans_Cluster_Summary.csv"))
+    stats['size'].to_csv(os.path.join(results_folder, "KMeans_Cluster_Counts.csv"), header=['count'])
+
+    sample['cluster'] = kmeans.predict(scaler.transform(sample[expense_cols].to_numpy(dtype=np.float64)))
+    sample['PCA1'] = X_pca[:,0]
+    sample['PCA2'] = X_pca[:,1]
+    plt.figure(figsize=(8,6))
+    sns.scatterplot(
+        data=sample, x='PCA1', y='PCA2',
+        hue='cluster', palette='tab10', alpha=0.7
+    )
+    plt.title(f"KMeans Clusters Visualization (n_clusters={n_clusters})")
+    plt.tight_layout()
+    plt.savefig(os.path.join(results_folder, "KMeans_PCA_Visualization.png"))
+    plt.close()
+
+    print(f"Model 5 out-of-core clustering of {n_rows} rows (inertia={inertia:,.1f}) saved to: {results_folder}")
+    sys.exit(0)
+
+# =====================
+# LOAD DATA
+# =====================
+# Processed features and their scaled matrix from memory or the memory-mapped store
+df, X_all_scaled, all_scaler = load_features(raw_path)
+print("===== DATA LOADED =====")
+print(df.info())
+print(df.head())
 
 X = df[expense_cols]
 
+# =====================
+# FIT OR LOAD SCALER + KMEANS
+# =====================
+# Registered together, and reused while the processed data is unchanged.
+# The scaler is the shared Dataset 2 scaler restricted to expense_cols
+# (StandardScaler is per column: same result as fitting it on X)
+def fit_clustering():
+    scaler = subset_scaler(all_scaler, expense_cols)
+    X_scaled = scaled_columns(X_all_scaled, all_scaler, expense_cols)
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42).fit(X_scaled)
+    return {'scaler': scaler, 'kmeans': kmeans}, \
+        {'inertia': float(kmeans.inertia_)}
+
+registry = ModelRegistry(model_registry_dir)
+saved, _, _ = registry.fit_or_load(
+    "dataset2_expense_kmeans", fit_clustering, X, expense_cols,
+    params={'n_clusters': n_clusters, 'random_state': 42})
+scaler, kmeans = saved['scaler'], saved['kmeans']
+
 # =====================
 # SCALE FEATURES
 # =====================
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+# already scaled by the feature stage (equal to scaler.transform(X))
+X_scaled = scaled_columns(X_all_scaled, all_scaler, expense_cols)
 
 # =====================
 # OPTIONAL PCA FOR DIMENSIONALITY REDUCTION / VISUALIZATION
 # =====================
-pca = PCA(n_components=2)
-X_pca = pca.fit_transform(X_scaled)
+# fitted once per scaled matrix and kept in the feature cache folder
+X_pca, _ = project(X_scaled, cache_dir=feature_cache_dir(data_path))
 df['PCA1'] = X_pca[:,0]
 df['PCA2'] = X_pca[:,1]
 
 # =====================
 # KMEANS CLUSTERING
 # =====================
-n_clusters = 4
-kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-df['cluster'] = kmeans.fit_predict(X_scaled)
+df['cluster'] = kmeans.predict(X_scaled)
 
 # =====================
 # SAVE CLUSTERED DATA
 # =====================
-df.to_csv(os.path.join(results_folder, "dataset2_clustered.csv"), index=False)
+write_table(df, os.path.join(results_folder, "dataset2_clustered.csv"))
 
 # =====================
 # CLUSTER SUMMARY
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import runpy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dataset2_features import load_features
+
+# =====================
+# PATHS & STAGES
+# =====================
+# Runs the Dataset 2 stages in one process: "Dataset 2.csv" is read and
+# processed once (dataset2_features) and every later stage gets the
+# features from memory instead of re-reading dataset2_processed.csv
+raw_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/Dataset 2.csv"
+STAGES = [
+    "Dataset2_PREPROCESSING",
+    "Dataset2_EDA_OVERSPENDING",
+    "Dataset2_MODEL3",
+    "Dataset2_MODEL4",
+    "Dataset2_MODEL5",
+    "Dataset2_FINANCIAL_HEALTH"
+]
+
+# =====================
+# FEATURES (ONCE)
+# =====================
+start = time.perf_counter()
+df, _, _ = load_features(raw_path)
+timings = [("features", time.perf_counter() - start)]
+print(f"Dataset 2 features ready: {df.shape}")
+
+# =====================
+# RUN STAGES
+# =====================
+stage_dir = os.path.dirname(os.path.abspath(__file__))
+for stage in STAGES:
+    print(f"\n===== {stage} =====")
+    start = time.perf_counter()
+    try:
+        runpy.run_path(os.path.join(stage_dir, f"{stage}.py"), run_name="__main__")
+    except SystemExit as e:
+        # stages end early with sys.exit(0) (e.g. Model 5 out of core)
+        if e.code not in (None, 0):
+            raise
+    timings.append((stage, time.perf_counter() - start))
+
+print("\n===== DATASET 2 PIPELINE TIMINGS =====")
+for stage, seconds in timings:
+    print(f"{stage:<28} {seconds:8.2f}s")
+print(f"{'total':<28} {sum(seconds for _, seconds in timings):8.2f}s")
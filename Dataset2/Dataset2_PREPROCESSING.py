@@ -1,12 +1,17 @@
 import os
+import sys
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import IsolationForest
-from sklearn.decomposition import PCA
-from statsmodels.stats.outliers_influence import variance_inflation_factor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline_storage import write_table
+from pipeline_schema import memory_report
+from pipeline_registry import ModelRegistry
+from pipeline_feature_cache import feature_cache_dir
+from pipeline_projection import project
+from pipeline_anomaly import make_isolation_forest, anomaly_scores
+from dataset2_features import load_features, numeric_columns, raw_missing_values
 
 # =====================
 # PATHS
@@ -16,61 +21,59 @@ processed_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_process
 scaled_path = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_scaled.csv"
 eda_results_folder = "/Users/anandhytapratamaputrisna/FYP2/Data/dataset2_eda_summary_results"
 anomaly_folder = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_anomaly_results"
+model_registry_dir = "/Users/anandhytapratamaputrisutisna/FYP2/Data/model_registry"
 
 # to make sure anomaly results can be saved
 os.makedirs(anomaly_folder, exist_ok=True)
 
 # =====================
-# LOAD DATA
+# LOAD DATA + PREPROCESSING + FEATURE ENGINEERING
 # =====================
-df = pd.read_csv(data_path)
+# Derived ratios, median imputation and scaling in one stage (dataset2_features);
+# the raw CSV is read (compact dtypes: int32 money/IDs, category text) only
+# when the feature store misses. Models 3/4/5, the overspending EDA and
+# financial health load the same features from memory or the
+# memory-mapped store instead of these CSVs
+df, X_scaled, scaler = load_features(data_path)
+numeric_cols = numeric_columns(df)
 print("===== DATA LOADED =====")
 print(df.info())
+memory_report(df, "DATA MEMORY AFTER LOAD")
 print(df.head())
-print("Missing values per column:\n", df.isna().sum())
-
-# =====================
-# PREPROCESSING + FEATURE ENGINEERING
-# =====================
-# Derived features
-expense_cols = ['Rent (USD)', 'Groceries (USD)', 'Eating Out (USD)',
-                'Entertainment (USD)', 'Subscription Services (USD)',
-                'Education (USD)', 'Online Shopping (USD)',
-                'Travel (USD)', 'Fitness (USD)', 'Miscellaneous (USD)']
-
-discretionary_cols = ['Eating Out (USD)', 'Entertainment (USD)',
-                      'Subscription Services (USD)', 'Online Shopping (USD)',
-                      'Travel (USD)', 'Fitness (USD)', 'Miscellaneous (USD)']
-
-fixed_cols = ['Rent (USD)', 'Groceries (USD)', 'Education (USD)']
-
-df['total_expense'] = df[expense_cols].sum(axis=1)
-df['savings_rate'] = df['Savings (USD)'] / df['Income (USD)']
-df['expense_to_income_ratio'] = df['total_expense'] / df['Income (USD)']
-df['discretionary_vs_fixed_ratio'] = df[discretionary_cols].sum(axis=1) / df[fixed_cols].sum(axis=1)
-
-# Fill missing numeric values (median)
-numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
-df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
+print("Missing values per column (raw CSV):\n", raw_missing_values(data_path))
 
 # Save processed CSV
-df.to_csv(processed_path, index=False)
+write_table(df, processed_path)
 print(f"Processed CSV saved to: {processed_path}")
 
 # =====================
 # SCALING
 # =====================
-scaler = StandardScaler()
+# The scaler is not registered: the feature store keeps the fitted one
+# (scaler.joblib, keyed by the raw file hash) and every stage loads it there
 df_scaled = df.copy()
-df_scaled[numeric_cols] = scaler.fit_transform(df[numeric_cols])
-df_scaled.to_csv(scaled_path, index=False)
+df_scaled[numeric_cols] = X_scaled
+write_table(df_scaled, scaled_path)
 print(f"Scaled CSV saved to: {scaled_path}")
 
 # =====================
 # ANOMALY / OVERSPENDING DETECTION
 # =====================
-iso = IsolationForest(contamination='auto', random_state=42)
-df['anomaly'] = iso.fit_predict(df[numeric_cols])  # -1 = anomaly, 1 = normal
+# The forest is registered, and reused while the processed data is unchanged
+registry = ModelRegistry(model_registry_dir)
+
+def fit_isolation_forest():
+    iso = make_isolation_forest('auto', 42).fit(df[numeric_cols])
+    _, labels = anomaly_scores(iso, df[numeric_cols])
+    return {'iso': iso}, {'n_anomalies': int((labels == -1).sum()), 'anomaly_rate': float((labels == -1).mean())}
+
+saved, _, _ = registry.fit_or_load(
+    "dataset2_preprocessing_isolation_forest", fit_isolation_forest, df[numeric_cols], numeric_cols,
+    params={'contamination': 'auto', 'random_state': 42})
+iso = saved['iso']
+scores, labels = anomaly_scores(iso, df[numeric_cols])
+df['anomaly'] = labels  # -1 = anomaly, 1 = normal
+df['anomaly_score'] = scores  # > 0 = anomaly, higher = more anomalous
 
 num_anomalies = (df['anomaly'] == -1).sum()
 anomaly_clients = df[df['anomaly'] == -1]['ID'].tolist()
@@ -89,8 +92,8 @@ print(f"Anomaly detection results saved to: {anomaly_folder}")
 # =====================
 # PCA Visualization (Optional)
 # =====================
-pca = PCA(n_components=2)
-X_pca = pca.fit_transform(df_scaled[numeric_cols])
+# reused from the feature cache folder while the scaled data is unchanged
+X_pca, _ = project(df_scaled[numeric_cols], cache_dir=feature_cache_dir(scaled_path))
 df['PCA1'] = X_pca[:,0]
 df['PCA2'] = X_pca[:,1]
 
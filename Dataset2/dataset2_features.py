@@ -0,0 +1,200 @@
+# ===============================
+# DATASET 2 FEATURE PIPELINE
+# Purpose: Read "Dataset 2.csv" once and give every Dataset 2 stage
+#          (preprocessing, overspending EDA, Models 3/4/5, financial
+#          health) the same processed features without CSV round trips:
+#            - derived ratios (total_expense, savings_rate,
+#              expense_to_income_ratio, discretionary_vs_fixed_ratio),
+#              median imputation and StandardScaler in one stage
+#            - kept in memory for later stages of the same process
+#              (Dataset2_PIPELINE.py runs them all in one process)
+#            - saved next to the raw file as one .npy per numeric column
+#              plus the scaled matrix, and memory-mapped by stages run on
+#              their own (other columns, e.g. text or category, are
+#              pickled with their dtype and loaded into memory)
+#          The store key hashes the raw file, so an edited CSV is
+#          processed again.
+# ===============================
+
+import os
+import json
+import shutil
+import hashlib
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from pipeline_schema import DATASET2_RAW_SCHEMA, read_csv_with_schema
+from pipeline_feature_cache import file_hash, feature_cache_dir, prune_cache, publish_entry
+
+# ===============================
+# COLUMNS
+# ===============================
+EXPENSE_COLS = ['Rent (USD)', 'Groceries (USD)', 'Eating Out (USD)',
+                'Entertainment (USD)', 'Subscription Services (USD)',
+                'Education (USD)', 'Online Shopping (USD)',
+                'Travel (USD)', 'Fitness (USD)', 'Miscellaneous (USD)']
+
+DISCRETIONARY_COLS = ['Eating Out (USD)', 'Entertainment (USD)',
+                      'Subscription Services (USD)', 'Online Shopping (USD)',
+                      'Travel (USD)', 'Fitness (USD)', 'Miscellaneous (USD)']
+
+FIXED_COLS = ['Rent (USD)', 'Groceries (USD)', 'Education (USD)']
+
+RATIO_COLS = ['savings_rate', 'expense_to_income_ratio', 'discretionary_vs_fixed_ratio']
+DERIVED_COLS = ['total_expense'] + RATIO_COLS
+
+STORE_VERSION = 3  # bump when the processing below changes
+
+_MEMO = {}  # store key -> (df, X_scaled, scaler)
+
+
+# ===============================
+# PROCESSING
+# ===============================
+def add_derived_features(df):
+    """
+    Derived expense features, added in place (same formulas as the
+    original Dataset2_PREPROCESSING.py).
+    """
+    df['total_expense'] = df[EXPENSE_COLS].sum(axis=1)
+    df['savings_rate'] = df['Savings (USD)'] / df['Income (USD)']
+    df['expense_to_income_ratio'] = df['total_expense'] / df['Income (USD)']
+    df['discretionary_vs_fixed_ratio'] = df[DISCRETIONARY_COLS].sum(axis=1) / df[FIXED_COLS].sum(axis=1)
+    return df
+
+
+def numeric_columns(df):
+    return df.select_dtypes(include=np.number).columns.tolist()
+
+
+def process_raw(df):
+    """
+    Derived features and median imputation of the numeric columns.
+
+    Returns:
+    - (df, X_scaled, scaler): X_scaled = StandardScaler of the numeric
+      columns, in df column order
+    """
+    add_derived_features(df)
+    numeric_cols = numeric_columns(df)
+    df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
+    scaler = StandardScaler().fit(df[numeric_cols])
+    return df, scaler.transform(df[numeric_cols]), scaler
+
+
+def subset_scaler(scaler, columns):
+    """
+    The fitted StandardScaler restricted to `columns` (scaling is per
+    column, so it transforms them exactly as the full scaler does).
+    """
+    names = list(scaler.feature_names_in_)
+    idx = [names.index(col) for col in columns]
+    sub = StandardScaler(with_mean=scaler.with_mean, with_std=scaler.with_std)
+    sub.n_features_in_ = len(idx)
+    sub.feature_names_in_ = np.asarray(columns, dtype=object)
+    sub.n_samples_seen_ = scaler.n_samples_seen_
+    sub.mean_ = None if scaler.mean_ is None else scaler.mean_[idx]
+    sub.var_ = None if scaler.var_ is None else scaler.var_[idx]
+    sub.scale_ = None if scaler.scale_ is None else scaler.scale_[idx]
+    return sub
+
+
+# ===============================
+# STORE
+# ===============================
+def _store_key(raw_path):
+    spec = json.dumps({'file_hash': file_hash(raw_path), 'version': STORE_VERSION,
+                       'schema': DATASET2_RAW_SCHEMA}, sort_keys=True)
+    return "dataset2_" + hashlib.sha1(spec.encode()).hexdigest()[:16]
+
+
+def _can_mmap(series):
+    # plain numpy dtypes without Python objects (not object, category, nullable ints)
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind != 'O'
+
+
+def _save_store(entry, df, X_scaled, scaler, raw_missing):
+    # temp folder + rename, like the feature cache
+    tmp_entry = f"{entry}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_entry, ignore_errors=True)
+    os.makedirs(tmp_entry)
+    mapped = [col for col in df.columns if _can_mmap(df[col])]
+    for i, col in enumerate(df.columns):
+        if col in mapped:
+            np.save(os.path.join(tmp_entry, f"col_{i:03d}.npy"), df[col].to_numpy())
+        else:
+            joblib.dump(df[col], os.path.join(tmp_entry, f"col_{i:03d}.joblib"))
+    np.save(os.path.join(tmp_entry, "X_scaled.npy"), X_scaled)
+    joblib.dump(scaler, os.path.join(tmp_entry, "scaler.joblib"))
+    with open(os.path.join(tmp_entry, "meta.json"), "w") as f:
+        json.dump({'columns': list(df.columns), 'mmap_columns': mapped,
+                   'scaled_columns': list(scaler.feature_names_in_), 'n_rows': len(df),
+                   'raw_missing': raw_missing}, f, indent=2)
+    publish_entry(tmp_entry, entry)
+
+
+def _load_store(entry):
+    with open(os.path.join(entry, "meta.json")) as f:
+        meta = json.load(f)
+    # one memory map per numeric column: DataFrame(copy=False) keeps them as they are
+    df = pd.DataFrame({
+        col: (np.load(os.path.join(entry, f"col_{i:03d}.npy"), mmap_mode='r') if col in meta['mmap_columns']
+              else joblib.load(os.path.join(entry, f"col_{i:03d}.joblib")))
+        for i, col in enumerate(meta['columns'])
+    }, copy=False)
+    return df, np.load(os.path.join(entry, "X_scaled.npy"), mmap_mode='r'), joblib.load(os.path.join(entry, "scaler.joblib"))
+
+
+def load_features(raw_path, columns=None):
+    """
+    Processed Dataset 2: from this process's memory, else the store next
+    to the raw file, else built from the raw CSV (read once) and stored.
+
+    Parameters:
+    - columns (list, optional): columns of df to return (None = all)
+
+    Returns:
+    - (df, X_scaled, scaler): df and X_scaled are read-only (memory maps
+      when loaded from the store); X_scaled has scaler.feature_names_in_
+      as columns
+    """
+    key = _store_key(raw_path)
+    if key not in _MEMO:
+        cache_dir = feature_cache_dir(raw_path)
+        entry = os.path.join(cache_dir, key)
+        if os.path.exists(os.path.join(entry, "meta.json")):
+            os.utime(os.path.join(entry, "meta.json"))
+            print(f"Dataset 2 features from store: {entry}")
+            _MEMO[key] = _load_store(entry)
+        else:
+            raw = read_csv_with_schema(raw_path, DATASET2_RAW_SCHEMA)
+            raw_missing = {col: int(n) for col, n in raw.isna().sum().items()}
+            df, X_scaled, scaler = process_raw(raw)
+            _save_store(entry, df, X_scaled, scaler, raw_missing)
+            prune_cache(cache_dir, keep=key)
+            print(f"Dataset 2 features stored: {entry}")
+            _MEMO[key] = _load_store(entry)
+
+    df, X_scaled, scaler = _MEMO[key]
+    # a new frame, so columns added by one stage never reach the next
+    return (df.copy(deep=False) if columns is None else df[list(columns)]), X_scaled, scaler
+
+
+def raw_missing_values(raw_path):
+    """
+    Missing values per column of the raw CSV, before median imputation
+    (recorded in the store, so the raw file is not read again).
+    """
+    with open(os.path.join(feature_cache_dir(raw_path), _store_key(raw_path), "meta.json")) as f:
+        return pd.Series(json.load(f)['raw_missing'])
+
+
+def scaled_columns(X_scaled, scaler, columns):
+    """
+    Columns of the scaled matrix, by name.
+    """
+    names = list(scaler.feature_names_in_)
+    return np.asarray(X_scaled[:, [names.index(col) for col in columns]])
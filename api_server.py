@@ -11,16 +11,21 @@
 #     - Human-readable recommendation text
 # =========================================
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import pandas as pd
 import uvicorn
 
 # Import existing modules
 from get_user_insight import get_user_insight
 from recommendation import generate_financial_recommendation
+from budget_projection import (
+    project_user_trajectory,
+    MIN_PROJECTION_MONTHS,
+    MAX_PROJECTION_MONTHS,
+)
 
 # ===============================
 # FASTAPI APP INITIALIZATION
@@ -65,6 +70,23 @@ class UserInsightResponse(BaseModel):
     insight_text: str
     expense_changes: Dict[str, dict]  # Category -> {current, recommended, change_percent}
 
+class ProjectedMonth(BaseModel):
+    month: int  # 0 = current month
+    total_budget: float
+    expense_to_income_ratio: Optional[float]  # None when the user has no income
+    savings_rate: Optional[float]
+    financial_health: str
+    health_score: int
+    budget: Dict[str, float]
+
+class BudgetProjectionResponse(BaseModel):
+    user_id: int
+    income: float
+    months: int
+    months_to_controlled_spending: Optional[int]  # First month with expense/income <= 0.8
+    months_to_healthy: Optional[int]  # First month rated "Healthy"
+    trajectory: List[ProjectedMonth]
+
 # ===============================
 # API ENDPOINTS
 # ===============================
@@ -79,6 +101,7 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "user_insight": "/user_insight/{user_id}",
+            "budget_projection": "/budget_projection/{user_id}?months=12",
             "docs": "/docs"
         }
     }
@@ -186,6 +209,46 @@ async def get_user_financial_insight(user_id: int):
             detail=f"Internal server error: {str(e)}"
         )
 
+@app.get("/budget_projection/{user_id}", response_model=BudgetProjectionResponse)
+async def get_budget_projection(
+    user_id: int,
+    months: int = Query(MIN_PROJECTION_MONTHS, ge=MIN_PROJECTION_MONTHS, le=MAX_PROJECTION_MONTHS)
+):
+    """
+    Project the recommended budget month over month if the user follows the plan
+    
+    Args:
+        user_id: Unique identifier for the user
+        months: Projection horizon (12-36 months)
+    
+    Returns:
+        BudgetProjectionResponse containing:
+        - trajectory: Budget, ratios and health for every projected month
+        - months_to_controlled_spending: When expense/income first drops to 80% or less
+        - months_to_healthy: When financial health first reaches "Healthy"
+    
+    Raises:
+        HTTPException: If user_id has no expense data
+    """
+    try:
+        projection = project_user_trajectory(user_id, months)
+        
+        if projection is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No expense data available for user ID {user_id}"
+            )
+        
+        return BudgetProjectionResponse(user_id=user_id, **projection)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
 # ===============================
 # RUN SERVER
 # ===============================
@@ -0,0 +1,54 @@
+# ===============================
+# BENCHMARK - ISOLATION FOREST SCORING
+# Purpose: Time of the Model 2 Isolation Forest fit for several
+#          max_samples / n_jobs settings, and of scoring every row with
+#          predict (labels only, today) vs pipeline_anomaly.anomaly_scores
+#          (continuous score + identical labels) in chunks, serial and
+#          over worker processes
+# ===============================
+
+import os
+import time
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from pipeline_anomaly import make_isolation_forest, anomaly_scores
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 6_000_000
+N_CLIENTS = 40_000  # x 36 months = 1.44M client-months
+FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value',
+            'spending_variance', 'weekend_spending_ratio']
+FIT_SETTINGS = [('auto', None), ('auto', -1), (4_096, -1)]  # (max_samples, n_jobs)
+SCORE_WORKERS = sorted({1, os.cpu_count() or 1})
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    df = build_grouped_summary(make_transactions(N_ROWS, n_clients=N_CLIENTS))
+    X_scaled = StandardScaler().fit_transform(df[FEATURES].fillna(0))
+    print(f"{len(X_scaled):,} client-months, {os.cpu_count()} CPUs")
+
+    for max_samples, n_jobs in FIT_SETTINGS:
+        _, elapsed = timed(lambda: make_isolation_forest(0.01, 42, max_samples, n_jobs).fit(X_scaled))
+        print(f"fit max_samples={str(max_samples):<5} n_jobs={str(n_jobs):<4} {elapsed:6.2f}s")
+
+    iso = make_isolation_forest(0.01, 42).fit(X_scaled)
+    labels, base = timed(lambda: iso.predict(X_scaled))
+    print(f"predict (labels only)          {base:6.2f}s")
+    for n_workers in SCORE_WORKERS:
+        (scores, chunk_labels), elapsed = timed(lambda: anomaly_scores(iso, X_scaled, n_workers=n_workers))
+        print(f"anomaly_scores {n_workers:2d} worker(s)     {elapsed:6.2f}s  speedup {base / elapsed:5.1f}x  "
+              f"labels identical: {np.array_equal(labels, chunk_labels)}")
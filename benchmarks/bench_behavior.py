@@ -0,0 +1,84 @@
+# ===============================
+# BENCHMARK - USER-LEVEL BEHAVIOR AGGREGATION
+# Purpose: Time of Dataset1_BEHAVIOR_INSIGHT.py's user aggregation as it
+#          was (groupby lambdas + row-wise apply) vs the vectorized
+#          dataset1_behavior.aggregate_behavior, at 1M clients, and that
+#          both produce an identical table
+# ===============================
+
+import time
+import numpy as np
+import pandas as pd
+
+import synthetic_data  # noqa: F401 (puts Dataset1 on sys.path)
+from dataset1_behavior import aggregate_behavior
+
+# ===============================
+# CONFIG
+# ===============================
+N_CLIENTS = 1_000_000
+MONTHS_PER_CLIENT = 4
+ANOMALY_RATE = 0.01
+
+
+def make_merged(n_clients, months, seed=42):
+    """
+    Merged Model 1 / Model 2 client-months as BEHAVIOR_INSIGHT builds them.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = n_clients * months
+    scores = rng.normal(-0.2, 0.05, n_rows)
+    return pd.DataFrame({
+        'client_id': np.repeat(np.arange(n_clients), months),
+        'time_window': np.tile([f"2012-{m:02d}" for m in range(1, months + 1)], n_clients),
+        'spending_intensity': rng.choice(['Low', 'Medium', 'High'], n_rows, p=[0.5, 0.3, 0.2]),
+        'anomaly_label': np.where(rng.random(n_rows) < ANOMALY_RATE, 'Anomaly', 'Normal'),
+        'anomaly_score': scores
+    })
+
+
+def aggregate_behavior_apply(merged):
+    # the aggregation Dataset1_BEHAVIOR_INSIGHT.py used before
+    user_agg = merged.groupby("client_id").agg(
+        dominant_spending_intensity=("spending_intensity", lambda x: x.value_counts().idxmax()),
+        anomaly_ratio=("anomaly_label", lambda x: (x == "Anomaly").mean()),
+        max_anomaly_score=("anomaly_score", "max")
+    ).reset_index()
+    user_agg["has_anomaly"] = user_agg["anomaly_ratio"] > 0
+
+    def derive_behavior(row):
+        if row["has_anomaly"]:
+            return "Inconsistent"
+        elif row["dominant_spending_intensity"] == "High":
+            return "Impulsive"
+        else:
+            return "Stable"
+
+    user_agg["behavior_type"] = user_agg.apply(derive_behavior, axis=1)
+    user_agg["behavior_risk_level"] = user_agg["behavior_type"].map(
+        {"Stable": "Low", "Impulsive": "Medium", "Inconsistent": "High"})
+    user_agg["behavior_justification"] = (
+        "Dominant intensity=" + user_agg["dominant_spending_intensity"]
+        + ", anomaly_ratio=" + user_agg["anomaly_ratio"].round(2).astype(str)
+    )
+    return user_agg
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    merged = make_merged(N_CLIENTS, MONTHS_PER_CLIENT)
+    print(f"{N_CLIENTS:,} clients, {len(merged):,} client-months")
+
+    results, base = {}, None
+    for name, fn in [('lambdas + apply', aggregate_behavior_apply), ('vectorized', aggregate_behavior)]:
+        start = time.perf_counter()
+        results[name] = fn(merged)
+        elapsed = time.perf_counter() - start
+        base = base or elapsed
+        print(f"{name:<16} {elapsed:8.2f}s  speedup {base / elapsed:6.1f}x")
+
+    expected, actual = results['lambdas + apply'], results['vectorized']
+    identical = expected.to_csv(index=False) == actual.to_csv(index=False)
+    print(f"identical behavior_insight.csv: {identical}")
@@ -0,0 +1,50 @@
+# ===============================
+# BENCHMARK - CLUSTER-QUALITY METRICS
+# Purpose: Time and value of the silhouette as the evaluation scripts
+#          computed it (sklearn silhouette_score on every row) vs
+#          pipeline_evaluation.sampled_silhouette (stratified samples,
+#          chunked distances under MAX_MEMORY_MB, 95% confidence interval)
+#          on Model 1 style client-month features
+# ===============================
+
+import time
+from sklearn.preprocessing import StandardScaler
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from pipeline_evaluation import sampled_silhouette, chunked_silhouette, MAX_MEMORY_MB
+
+# ===============================
+# CONFIG
+# ===============================
+CLIENT_COUNTS = [1_000, 5_000, 40_000]  # x 36 months
+FULL_SILHOUETTE_MAX_ROWS = 50_000       # sklearn on every row is skipped above this
+FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value',
+            'spending_variance', 'weekend_spending_ratio']
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    print(f"distance blocks capped at {MAX_MEMORY_MB} MB")
+    for n_clients in CLIENT_COUNTS:
+        summary = build_grouped_summary(make_transactions(n_clients * 150, n_clients=n_clients))
+        X = StandardScaler().fit_transform(summary[FEATURES].fillna(0))
+        labels = KMeans(n_clusters=3, random_state=42).fit_predict(X)
+        print(f"\n{len(X):,} client-months")
+
+        if len(X) <= FULL_SILHOUETTE_MAX_ROWS:
+            start = time.perf_counter()
+            full = silhouette_score(X, labels)
+            print(f"  sklearn, all rows       {time.perf_counter() - start:8.2f}s  silhouette {full:.4f}")
+            start = time.perf_counter()
+            exact = chunked_silhouette(X, labels)
+            print(f"  chunked, all rows       {time.perf_counter() - start:8.2f}s  silhouette {exact:.4f}")
+        else:
+            print("  sklearn, all rows       skipped (O(n^2))")
+
+        result = sampled_silhouette(X, labels)
+        print(f"  stratified {result['n_samples']} x {result['sample_size']:,}  {result['seconds']:8.2f}s  "
+              f"silhouette {result['silhouette']:.4f}  95% CI {result['ci_low']:.4f} - {result['ci_high']:.4f}")
@@ -0,0 +1,89 @@
+# ===============================
+# BENCHMARK - DATASET 2 FEATURE PIPELINE
+# Purpose: Time spent on Dataset 2 feature I/O across the stages that use
+#          it (preprocessing, overspending EDA, Models 3/4/5):
+#            - CSV round trips: preprocessing reads the raw CSV, derives,
+#              imputes and writes dataset2_processed.csv, every later stage
+#              parses it again (and Model 5 scales its columns again)
+#            - dataset2_features: raw CSV read and processed once, later
+#              stages memory-map the stored columns / scaled matrix
+#          and a check that both give the same features
+# ===============================
+
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from synthetic_data import REPO_DIR  # noqa: F401 (puts Dataset2 on sys.path)
+from pipeline_schema import DATASET2_RAW_SCHEMA, DATASET2_MONEY_COLS, read_csv_with_schema
+from pipeline_storage import read_table, write_table
+import dataset2_features
+from dataset2_features import load_features, process_raw, scaled_columns
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 2_000_000
+MODEL3_COLS = ['ID', 'Age', 'Income (USD)', 'Rent (USD)', 'Groceries (USD)', 'Eating Out (USD)',
+               'Entertainment (USD)', 'Subscription Services (USD)', 'Education (USD)',
+               'Online Shopping (USD)', 'Travel (USD)', 'Fitness (USD)', 'Miscellaneous (USD)', 'total_expense']
+MODEL5_COLS = dataset2_features.EXPENSE_COLS + dataset2_features.DERIVED_COLS
+EDA_COLS = ['Income (USD)', 'Savings (USD)'] + dataset2_features.EXPENSE_COLS + dataset2_features.DERIVED_COLS
+
+
+def make_dataset2(n_rows, seed=42):
+    """
+    Raw Dataset 2 style rows (ID, Age, monthly income and expenses in USD).
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'ID': np.arange(1, n_rows + 1), 'Age': rng.integers(18, 65, n_rows)})
+    for col in DATASET2_MONEY_COLS:
+        scale = 6000 if col == 'Income (USD)' else 400
+        df[col] = rng.gamma(2.0, scale / 2, n_rows).astype(np.int64) + 1
+    return df
+
+
+def csv_round_trips(raw_path, processed_path):
+    df = read_csv_with_schema(raw_path, DATASET2_RAW_SCHEMA)
+    df, _, _ = process_raw(df)
+    write_table(df, processed_path)
+    read_table(processed_path, columns=EDA_COLS)       # overspending EDA
+    read_table(processed_path, columns=MODEL3_COLS)    # Model 3
+    read_table(processed_path)                         # Model 4
+    df5 = read_table(processed_path)                   # Model 5
+    return StandardScaler().fit_transform(df5[MODEL5_COLS])
+
+
+def feature_store(raw_path):
+    load_features(raw_path)
+    dataset2_features._MEMO.clear()  # later stages as separate processes: memory-map the store
+    load_features(raw_path, columns=EDA_COLS)
+    load_features(raw_path, columns=MODEL3_COLS)
+    df, _, _ = load_features(raw_path)
+    df['anomaly'] = 1                                  # Model 4 adds its columns to a new frame
+    _, X_scaled, scaler = load_features(raw_path)
+    return scaled_columns(X_scaled, scaler, MODEL5_COLS)
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory(prefix="bench_dataset2_") as tmp:
+        raw_path = os.path.join(tmp, "Dataset 2.csv")
+        make_dataset2(N_ROWS).to_csv(raw_path, index=False)
+        print(f"{N_ROWS:,} rows, raw CSV {os.path.getsize(raw_path) / 1e6:,.0f} MB")
+
+        results, base = {}, None
+        for name, run in [('CSV round trips', lambda: csv_round_trips(raw_path, os.path.join(tmp, "processed.csv"))),
+                          ('feature store', lambda: feature_store(raw_path))]:
+            start = time.perf_counter()
+            results[name] = run()
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print(f"{name:<16} {elapsed:7.2f}s  speedup {base / elapsed:5.1f}x")
+
+        print(f"same Model 5 matrix: {np.allclose(results['CSV round trips'], results['feature store'], rtol=0, atol=1e-12)}")
@@ -0,0 +1,73 @@
+# ===============================
+# BENCHMARK - SINGLE-PASS FEATURE BUILDER (DATASET 1)
+# Purpose: Compare the original per-group lambda + per-category merge loop
+#          against build_grouped_summary, check both give the same
+#          grouped_summary, and time the new builder on 10M transactions
+# ===============================
+
+import time
+import pandas as pd
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 10_000_000      # size for the new builder
+LEGACY_ROWS = 1_000_000  # the legacy lambda is too slow to run at 10M
+N_CLIENTS = 2_000
+
+
+# ===============================
+# LEGACY IMPLEMENTATION (reference)
+# ===============================
+def legacy_grouped_summary(df):
+    grouped_summary = df.groupby(['client_id', 'time_window']).agg(
+        total_spending=('amount', 'sum'),
+        transaction_count=('amount', 'count'),
+        avg_transaction_value=('amount', 'mean'),
+        spending_variance=('amount', 'var'),
+        max_amount=('amount', 'max'),
+        min_amount=('amount', 'min'),
+        weekend_spending_total=('amount', lambda x: x[df.loc[x.index, 'is_weekend'] == 1].sum())
+    ).reset_index()
+    grouped_summary['weekend_spending_ratio'] = grouped_summary['weekend_spending_total'] / grouped_summary['total_spending']
+    grouped_summary.drop(columns=['weekend_spending_total'], inplace=True)
+
+    if 'category' in df.columns:
+        for cat in df['category'].dropna().unique():
+            cat_sum = df[df['category'] == cat].groupby(['client_id', 'time_window'])['amount'].sum()
+            grouped_summary = grouped_summary.merge(cat_sum.rename(f'ratio_{cat}'), on=['client_id', 'time_window'], how='left')
+            grouped_summary[f'ratio_{cat}'] = grouped_summary[f'ratio_{cat}'] / grouped_summary['total_spending']
+        grouped_summary.fillna(0, inplace=True)
+    return grouped_summary
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    print(f"Generating {N_ROWS:,} synthetic transactions...")
+    df = make_transactions(N_ROWS, n_clients=N_CLIENTS, categories=True)
+    legacy_df = df.iloc[:LEGACY_ROWS]
+
+    legacy_out, legacy_time = timed(legacy_grouped_summary, legacy_df)
+    new_small, new_small_time = timed(build_grouped_summary, legacy_df)
+    pd.testing.assert_frame_equal(legacy_out, new_small, check_exact=False, rtol=1e-9)
+    print(f"[{LEGACY_ROWS:,} rows] outputs match: {legacy_out.shape[0]:,} client-months, {legacy_out.shape[1]} columns")
+
+    new_out, new_time = timed(build_grouped_summary, df)
+
+    print("\n===== FEATURE BUILDER BENCHMARK =====")
+    print(f"legacy   {LEGACY_ROWS:>12,} rows: {legacy_time:8.2f}s ({LEGACY_ROWS / legacy_time:,.0f} rows/s)")
+    print(f"new      {LEGACY_ROWS:>12,} rows: {new_small_time:8.2f}s ({LEGACY_ROWS / new_small_time:,.0f} rows/s)")
+    print(f"new      {N_ROWS:>12,} rows: {new_time:8.2f}s ({N_ROWS / new_time:,.0f} rows/s), "
+          f"{new_out.shape[0]:,} client-months")
+    print(f"speedup at {LEGACY_ROWS:,} rows: {legacy_time / new_small_time:.1f}x")
@@ -0,0 +1,67 @@
+# ===============================
+# BENCHMARK - SCALED FEATURE CACHE
+# Purpose: Time and peak RSS of getting the scaled Model 1/2 feature
+#          matrix by reading the summary, filling NaN and fitting a
+#          StandardScaler (every stage today) vs memory-mapping the cached
+#          float32 matrix, each run in a fresh process
+# ===============================
+
+import os
+import sys
+import time
+import resource
+import subprocess
+import tempfile
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from pipeline_storage import read_table, write_table
+from pipeline_feature_cache import scaled_features
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 6_000_000
+N_CLIENTS = 40_000  # x 36 months = 1.44M client-months
+FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value',
+            'spending_variance', 'weekend_spending_ratio']
+ORDER_BY = ['client_id', 'time_window']
+MODES = ['scale', 'cache miss', 'cache hit']
+
+
+def child(mode, summary_file):
+    if mode == 'generate':
+        write_table(build_grouped_summary(make_transactions(N_ROWS, n_clients=N_CLIENTS)), summary_file)
+        return
+    start = time.perf_counter()
+    if mode == 'scale':
+        df = read_table(summary_file, order_by=ORDER_BY)
+        X_scaled = StandardScaler().fit_transform(df[FEATURES].fillna(0))
+    else:
+        X_scaled, _, _ = scaled_features(summary_file, FEATURES, order_by=ORDER_BY)
+    checksum = float(np.asarray(X_scaled, dtype=np.float64).sum(axis=0)[0])  # touch every page
+    elapsed = time.perf_counter() - start
+    print(f"RESULT {elapsed:.3f} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024} {checksum:.3f}")
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        child(*sys.argv[1:])
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory(prefix="bench_feature_cache_") as tmp:
+        summary_file = os.path.join(tmp, "dataset1_summary.csv")
+        subprocess.run([sys.executable, __file__, 'generate', summary_file], check=True)
+        print(f"summary: {os.path.getsize(summary_file) / 1e6:,.0f} MB on disk")
+        base = None
+        for mode in MODES:
+            result = subprocess.run([sys.executable, __file__, mode, summary_file],
+                                    capture_output=True, text=True, check=True)
+            elapsed, peak, _ = result.stdout.rsplit("RESULT", 1)[1].split()
+            base = base or float(elapsed)
+            print(f"{mode:<11} {float(elapsed):7.2f}s  speedup {base / float(elapsed):6.1f}x  peak RSS {int(peak):6d} MB")
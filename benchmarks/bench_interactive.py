@@ -0,0 +1,77 @@
+# ===============================
+# BENCHMARK - INTERACTIVE CLUSTER / ANOMALY PLOT
+# Purpose: Build + write time and HTML size of the Dataset1_EVALUATION
+#          Plotly scatter as it was (row-wise apply hover text, SVG, every
+#          point) vs dataset1_interactive.cluster_anomaly_figure (column-wise
+#          hover text, WebGL, density-aware point budget) as rows grow
+# ===============================
+
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from synthetic_data import REPO_DIR  # noqa: F401 (puts Dataset1 on sys.path)
+from dataset1_interactive import cluster_anomaly_figure, MAX_POINTS
+
+# ===============================
+# CONFIG
+# ===============================
+ROW_COUNTS = [100_000, 400_000, 1_500_000]
+ANOMALY_RATE = 0.01
+
+
+def make_scored_summary(n_rows, seed=42):
+    """
+    Client-months with clusters, anomaly labels/scores and PCA coordinates.
+    """
+    rng = np.random.default_rng(seed)
+    cluster = rng.integers(0, 3, n_rows)
+    anomaly = np.where(rng.random(n_rows) < ANOMALY_RATE, -1, 1)
+    df = pd.DataFrame({
+        'client_id': rng.integers(0, 50_000, n_rows),
+        'cluster': cluster,
+        'anomaly': anomaly,
+        'anomaly_score': rng.normal(-0.1, 0.05, n_rows) + (anomaly == -1) * 0.2,
+        'total_spending': np.round(rng.lognormal(6, 1, n_rows), 2),
+        'PCA1': rng.normal(cluster * 2.0, 1.0) + (anomaly == -1) * rng.normal(0, 6, n_rows),
+        'PCA2': rng.normal(0, 1, n_rows) + (anomaly == -1) * rng.normal(0, 6, n_rows)
+    })
+    df['anomaly_label'] = df['anomaly'].map({1:'Normal', -1:'Anomaly'})
+    return df
+
+
+def figure_apply_svg(df, title):
+    # the interactive plot Dataset1_EVALUATION.py drew before
+    df = df.copy()
+    df['hover_text'] = df.apply(
+        lambda row: f"Client ID: {row['client_id']}<br>"
+                    f"Cluster: {row['cluster']}<br>"
+                    f"Anomaly: {row['anomaly_label']} (score {row['anomaly_score']:.3f})<br>"
+                    f"Total Spending: {row['total_spending']:.2f}",
+        axis=1
+    )
+    fig = px.scatter(df, x='PCA1', y='PCA2', color='cluster', symbol='anomaly_label',
+                     size=df['anomaly'].map({1:5, -1:10}), hover_name='hover_text', title=title,
+                     render_mode='svg')
+    return fig, len(df)
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    print(f"point budget: {MAX_POINTS:,}")
+    with tempfile.TemporaryDirectory(prefix="bench_interactive_") as tmp:
+        for n_rows in ROW_COUNTS:
+            df = make_scored_summary(n_rows)
+            for name, build in [('apply + SVG', figure_apply_svg), ('budget + WebGL', cluster_anomaly_figure)]:
+                html_file = os.path.join(tmp, "plot.html")
+                start = time.perf_counter()
+                fig, n_drawn = build(df, "bench")
+                fig.write_html(html_file)
+                elapsed = time.perf_counter() - start
+                print(f"{n_rows:>10,} rows  {name:<15} {elapsed:7.2f}s  {n_drawn:>10,} points  "
+                      f"HTML {os.path.getsize(html_file) / 1e6:8.1f} MB")
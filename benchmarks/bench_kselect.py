@@ -0,0 +1,50 @@
+# ===============================
+# BENCHMARK - K SELECTION (MODEL 1)
+# Purpose: Wall time and chosen k of the original full-silhouette search
+#          over range(2, 4) vs sampled silhouette, elbow and MiniBatchKMeans
+#          sweeps over a wide K range, on a synthetic client-month summary
+# ===============================
+
+import os
+import time
+from sklearn.preprocessing import StandardScaler
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from dataset1_clustering import sweep_k
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 3_000_000
+N_CLIENTS = 1_500  # x 36 months = 54,000 client-months
+FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value',
+            'spending_variance', 'weekend_spending_ratio']
+SAMPLE_SIZE = 10_000
+N_WORKERS = os.cpu_count()
+
+RUNS = [
+    # label, k_range, method, algorithm, sample_size
+    ('full silhouette, k=2..3', range(2, 4), 'silhouette', 'kmeans', None),
+    ('sampled silhouette, k=2..3', range(2, 4), 'silhouette', 'kmeans', SAMPLE_SIZE),
+    ('sampled silhouette, k=2..15', range(2, 16), 'silhouette', 'kmeans', SAMPLE_SIZE),
+    ('elbow, k=2..15', range(2, 16), 'elbow', 'kmeans', None),
+    ('elbow minibatch, k=2..15', range(2, 16), 'elbow', 'minibatch', None),
+]
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    summary = build_grouped_summary(make_transactions(N_ROWS, n_clients=N_CLIENTS)).fillna(0)
+    X = StandardScaler().fit_transform(summary[FEATURES])
+    print(f"{len(X):,} client-months, {N_WORKERS} worker(s)")
+
+    for label, k_range, method, algorithm, sample_size in RUNS:
+        start = time.perf_counter()
+        best_k, report, _ = sweep_k(X, k_range, method=method, algorithm=algorithm,
+                                    sample_size=sample_size, n_workers=N_WORKERS)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<28} {elapsed:7.2f}s  chosen k={best_k:<3} "
+              f"fit {report['fit_seconds'].sum():6.2f}s  silhouette {report['silhouette_seconds'].sum():6.2f}s")
@@ -0,0 +1,83 @@
+# ===============================
+# BENCHMARK - OUT-OF-CORE CLUSTERING
+# Purpose: Time, peak RSS and quality of the Model 1 k=3 clustering done
+#          in memory (read summary, StandardScaler, KMeans, write labels)
+#          vs out-of-core (pipeline_minibatch: streamed scaler, partial_fit
+#          MiniBatchKMeans, streamed labelling), each in a fresh process.
+#          Quality: inertia on the full table and adjusted Rand index of
+#          the out-of-core labels against the full-batch ones
+# ===============================
+
+import os
+import sys
+import time
+import resource
+import subprocess
+import tempfile
+from sklearn.preprocessing import StandardScaler
+from sklearn.cluster import KMeans
+from sklearn.metrics import adjusted_rand_score
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from pipeline_storage import read_table, write_table
+from pipeline_minibatch import scan_table, fit_minibatch_kmeans, cluster_stats, write_clusters
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 6_000_000
+N_CLIENTS = 40_000  # x 36 months = 1.44M client-months
+K = 3
+FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value',
+            'spending_variance', 'weekend_spending_ratio']
+MODES = ['full batch', 'out of core']
+
+
+def child(mode, summary_file, output_file):
+    if mode == 'generate':
+        write_table(build_grouped_summary(make_transactions(N_ROWS, n_clients=N_CLIENTS)), summary_file)
+        return
+    start = time.perf_counter()
+    if mode == 'full batch':
+        df = read_table(summary_file)
+        X_scaled = StandardScaler().fit_transform(df[FEATURES].fillna(0))
+        km = KMeans(n_clusters=K, random_state=42).fit(X_scaled)
+        df['cluster'] = km.labels_
+        write_table(df, output_file)
+        inertia = km.inertia_
+    else:
+        scaler, sample, _ = scan_table(summary_file, FEATURES)
+        km = fit_minibatch_kmeans(summary_file, FEATURES, K, scaler, sample)
+        _, inertia = cluster_stats(summary_file, FEATURES, scaler, km)
+        write_clusters(summary_file, output_file, FEATURES, scaler, km)
+    elapsed = time.perf_counter() - start
+    print(f"RESULT {elapsed:.3f} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024} {inertia:.1f}")
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        child(*sys.argv[1:])
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory(prefix="bench_out_of_core_") as tmp:
+        summary_file = os.path.join(tmp, "dataset1_summary.csv")
+        subprocess.run([sys.executable, __file__, 'generate', summary_file, '-'], check=True)
+        print(f"summary: {os.path.getsize(summary_file) / 1e6:,.0f} MB on disk")
+
+        labels, base = {}, None
+        for mode in MODES:
+            output_file = os.path.join(tmp, f"{mode.replace(' ', '_')}.csv")
+            result = subprocess.run([sys.executable, __file__, mode, summary_file, output_file],
+                                    capture_output=True, text=True, check=True)
+            elapsed, peak, inertia = result.stdout.rsplit("RESULT", 1)[1].split()
+            base = base or float(elapsed)
+            labels[mode] = read_table(output_file, columns=['cluster'])['cluster'].to_numpy()
+            print(f"{mode:<12} {float(elapsed):7.2f}s  speedup {base / float(elapsed):5.1f}x  "
+                  f"peak RSS {int(peak):6d} MB  inertia {float(inertia):14,.1f}")
+
+        ari = adjusted_rand_score(labels['full batch'], labels['out of core'])
+        print(f"adjusted Rand index (out of core vs full batch): {ari:.4f}")
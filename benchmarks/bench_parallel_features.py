@@ -0,0 +1,54 @@
+# ===============================
+# BENCHMARK - PARALLEL CLIENT-MONTH FEATURES (DATASET 1)
+# Purpose: Time build_grouped_summary_parallel for 1, 2, 4, ... workers up to
+#          the core count, check every run is identical to the serial
+#          builder, and report speedup and parallel efficiency
+# ===============================
+
+import os
+import time
+import pandas as pd
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from dataset1_parallel import build_grouped_summary_parallel
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 10_000_000
+N_CLIENTS = 20_000
+CATEGORIES = True
+
+
+def worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    print(f"Generating {N_ROWS:,} synthetic transactions...")
+    df = make_transactions(N_ROWS, n_clients=N_CLIENTS, categories=CATEGORIES)
+
+    serial_out, serial_time = timed(build_grouped_summary, df)
+    print(f"\n===== PARALLEL FEATURE BENCHMARK ({os.cpu_count()} cores) =====")
+    print(f"serial          : {serial_time:7.2f}s")
+
+    for n_workers in worker_counts(os.cpu_count()):
+        parallel_out, parallel_time = timed(build_grouped_summary_parallel, df, n_workers)
+        pd.testing.assert_frame_equal(serial_out, parallel_out, check_exact=True)
+        speedup = serial_time / parallel_time
+        print(f"{n_workers:3d} worker(s)    : {parallel_time:7.2f}s  speedup {speedup:5.2f}x  "
+              f"efficiency {speedup / n_workers:6.1%}  (identical output)")
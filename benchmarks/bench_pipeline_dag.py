@@ -0,0 +1,84 @@
+# ===============================
+# BENCHMARK - PIPELINE DAG RUNNER
+# Purpose: Wall time of the run_pipeline.py stage graph
+#          (pipeline_dag.run_pipeline) with synthetic stages of fixed CPU
+#          work: run one stage at a time (the manual order), with parallel
+#          workers, a rerun with nothing changed, and a rerun after only
+#          the Dataset 2 raw file changed
+# ===============================
+
+import os
+import time
+import tempfile
+
+import synthetic_data  # noqa: F401 (puts the repo root on sys.path)
+from pipeline_dag import run_pipeline
+
+# ===============================
+# CONFIG
+# ===============================
+STAGE_SECONDS = 2.0  # CPU work per stage
+N_WORKERS = os.cpu_count()
+
+# same graph as run_pipeline.py
+GRAPH = {
+    'dataset1_preprocessing': (["raw1.csv"], ["d1_summary.csv"]),
+    'dataset1_model1': (["d1_summary.csv"], ["d1_kmeans.csv"]),
+    'dataset1_model2': (["d1_summary.csv"], ["d1_iforest.csv"]),
+    'dataset1_behavior_insight': (["d1_kmeans.csv", "d1_iforest.csv"], ["behavior.csv"]),
+    'dataset2_preprocessing': (["raw2.csv"], ["d2_processed.csv"]),
+    'dataset2_model3': (["d2_processed.csv"], ["d2_model3.csv"]),
+    'dataset2_model4': (["d2_processed.csv"], ["d2_model4.csv"]),
+    'dataset2_model5': (["d2_processed.csv"], ["d2_model5.csv"]),
+    'dataset2_financial_health': (["d2_model3.csv", "d2_model4.csv", "d2_model5.csv"], ["financial.csv"]),
+    'combine_behavior_financial': (["behavior.csv", "financial.csv"], ["combined.csv"])
+}
+
+# a stage: STAGE_SECONDS of CPU, then outputs that depend only on the inputs
+STAGE_TEMPLATE = '''
+import time, hashlib
+start = time.process_time()
+while time.process_time() - start < {seconds}:
+    sum(i * i for i in range(10_000))
+digest = hashlib.sha1(b"".join(open(p, "rb").read() for p in {inputs})).hexdigest()
+for p in {outputs}:
+    open(p, "w").write(digest)
+'''
+
+
+def make_stages(work_dir):
+    stages = {}
+    for name, (inputs, outputs) in GRAPH.items():
+        script = os.path.join(work_dir, f"{name}.py")
+        with open(script, "w") as f:
+            f.write(STAGE_TEMPLATE.format(seconds=STAGE_SECONDS, inputs=inputs, outputs=outputs))
+        stages[name] = {'script': script, 'inputs': inputs, 'outputs': outputs}
+    return stages
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    print(f"{len(GRAPH)} stages x {STAGE_SECONDS:.1f}s CPU, {N_WORKERS} CPUs")
+    runs = [
+        ('serial (cold)', 1, None),
+        (f'{N_WORKERS} workers (cold)', N_WORKERS, None),
+        ('nothing changed', N_WORKERS, None),
+        ('raw2.csv changed', N_WORKERS, "raw2.csv")
+    ]
+    with tempfile.TemporaryDirectory(prefix="bench_dag_") as work_dir:
+        stages = make_stages(work_dir)
+        base = None
+        for i, (name, n_workers, changed) in enumerate(runs):
+            state_dir = os.path.join(work_dir, "state" if i >= 1 else "state_serial")
+            for raw in ("raw1.csv", "raw2.csv"):
+                if not os.path.exists(os.path.join(work_dir, raw)) or raw == changed:
+                    with open(os.path.join(work_dir, raw), "w") as f:
+                        f.write(f"{raw} {time.time()}")
+            start = time.perf_counter()
+            report = run_pipeline(stages, work_dir, state_dir, max_workers=n_workers)
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print(f"{name:<20} {(report['status'] == 'ran').sum():3d} stages run  "
+                  f"{elapsed:7.2f}s  speedup {base / elapsed:6.1f}x")
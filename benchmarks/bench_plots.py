@@ -0,0 +1,71 @@
+# ===============================
+# BENCHMARK - PLOT RENDERING
+# Purpose: Wall time of the Dataset1 preprocessing + model figures
+#          (histograms, boxplots, PCA scatters, heatmap) on a synthetic
+#          client-month summary, drawn serially, in a process pool, again
+#          with every figure cached, and with plots disabled
+# ===============================
+
+import os
+import time
+import tempfile
+import numpy as np
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from pipeline_plots import PlotJobs
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 2_000_000
+N_CLIENTS = 5_000
+N_WORKERS = os.cpu_count()
+FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value',
+            'spending_variance', 'max_amount', 'min_amount', 'weekend_spending_ratio']
+
+
+def queue_figures(plots, summary, out_dir):
+    for col in FEATURES:
+        plots.add(os.path.join(out_dir, f'distribution_{col}.png'), 'histplot',
+                  summary[[col]], figsize=(6, 4), x=col, bins=50, kde=True,
+                  title=f'Distribution of {col}', xlabel=col, ylabel='Frequency', tight_layout=True)
+        plots.add(os.path.join(out_dir, f'{col}_by_cluster.png'), 'boxplot',
+                  summary[['cluster_label', col]], figsize=(8, 5), x='cluster_label', y=col,
+                  hue='cluster_label', legend=False, palette='Set2', title=f"{col} by Cluster", grid=True)
+    plots.add(os.path.join(out_dir, 'pca.png'), 'scatterplot',
+              summary[['pca1', 'pca2', 'cluster_label']], figsize=(8, 6), x='pca1', y='pca2',
+              hue='cluster_label', palette='Set2', alpha=0.7, title="PCA", grid=True)
+    plots.add(os.path.join(out_dir, 'correlation_matrix.png'), 'heatmap',
+              summary[FEATURES].corr(), figsize=(10, 8), annot=True, fmt=".2f", cmap='coolwarm',
+              title="Feature Correlation Matrix", tight_layout=True)
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    summary = build_grouped_summary(make_transactions(N_ROWS, n_clients=N_CLIENTS))
+    rng = np.random.default_rng(0)
+    summary['cluster_label'] = rng.choice(['Low', 'Medium', 'High'], len(summary))
+    summary['pca1'], summary['pca2'] = rng.normal(size=(2, len(summary)))
+    print(f"{len(summary):,} client-months, {os.cpu_count()} CPU(s)")
+
+    with tempfile.TemporaryDirectory(prefix="bench_plots_") as tmp:
+        runs = [
+            ('serial', 'serial', 'serial'),
+            ('parallel', 'parallel', 'parallel'),
+            ('parallel, cached', 'parallel', 'parallel'),  # same folder again: nothing changed
+            ('none', 'none', 'none'),
+        ]
+        base = None
+        for label, mode, folder in runs:
+            out_dir = os.path.join(tmp, folder)
+            os.makedirs(out_dir, exist_ok=True)
+            plots = PlotJobs(mode, n_workers=N_WORKERS)
+            start = time.perf_counter()
+            queue_figures(plots, summary, out_dir)
+            counts = plots.render()
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print(f"{label:<17} {elapsed:7.2f}s  speedup {base / elapsed:6.1f}x  {counts}")
@@ -0,0 +1,78 @@
+# ===============================
+# BENCHMARK - SHARED PCA PROJECTION
+# Purpose: Time of the Model 1 + Model 2 PCA work today (one fit per k run
+#          plus one in Model 2) vs one shared projection, and time / extra
+#          memory of the full, randomized and incremental solvers on a large
+#          memory-mapped feature matrix, with how closely they agree
+# ===============================
+
+import os
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+from sklearn.decomposition import PCA
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from pipeline_storage import write_table
+from pipeline_feature_cache import scaled_features, feature_cache_dir
+import pipeline_projection
+from pipeline_projection import project
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 6_000_000
+N_CLIENTS = 40_000  # x 36 months = 1.44M client-months
+FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value',
+            'spending_variance', 'weekend_spending_ratio']
+ORDER_BY = ['client_id', 'time_window']
+PCA_FITS_TODAY = 3  # best-k run, k=3 run, Model 2
+METHODS = ['full', 'randomized', 'incremental']
+
+
+def timed(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def agreement(a, b):
+    # components are only defined up to sign
+    return min(abs(np.corrcoef(a[:, i], b[:, i])[0, 1]) for i in range(a.shape[1]))
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory(prefix="bench_projection_") as tmp:
+        summary_file = os.path.join(tmp, "dataset1_summary.csv")
+        write_table(build_grouped_summary(make_transactions(N_ROWS, n_clients=N_CLIENTS)), summary_file)
+        X_scaled, _, _ = scaled_features(summary_file, FEATURES, order_by=ORDER_BY)
+        cache_dir = feature_cache_dir(summary_file)
+        print(f"{X_scaled.shape[0]:,} x {X_scaled.shape[1]} memory-mapped {X_scaled.dtype} matrix")
+
+        # today: every run and stage fits its own PCA
+        _, today, _ = timed(lambda: [PCA(n_components=2, random_state=42).fit_transform(X_scaled)
+                                     for _ in range(PCA_FITS_TODAY)])
+        # shared: first stage fits and caches, the others load (fresh process = empty memo)
+        _, first, _ = timed(lambda: project(X_scaled, random_state=42, cache_dir=cache_dir))
+        pipeline_projection._MEMO.clear()
+        _, later, _ = timed(lambda: project(X_scaled, random_state=42, cache_dir=cache_dir))
+        shared = first + (PCA_FITS_TODAY - 1) * later
+        print(f"{PCA_FITS_TODAY} PCA fits {today:6.2f}s  shared projection {shared:6.2f}s "
+              f"(fit {first:.2f}s, cache load {later:.3f}s)  speedup {today / shared:5.1f}x")
+
+        reference = None
+        for method in METHODS:
+            pipeline_projection._MEMO.clear()
+            (X_pca, _), elapsed, peak = timed(lambda: project(X_scaled, method=method, random_state=42))
+            reference = X_pca if reference is None else reference
+            print(f"{method:<12} {elapsed:6.2f}s  peak traced {peak:7.1f} MB  "
+                  f"min |corr| with full {agreement(reference, X_pca):.6f}")
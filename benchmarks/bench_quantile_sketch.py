@@ -0,0 +1,101 @@
+# ===============================
+# BENCHMARK - STREAMING QUANTILE SKETCH (DATASET 1)
+# Purpose: Compare the Q1 / Q3 / P95 thresholds of the preprocessing stage
+#          (P95 after the 3*IQR outlier filter) computed exactly and with
+#          QuantileSketch fed chunk by chunk, both from a single stream and
+#          merged from partitions; report value error, observed rank error
+#          against the documented bound, and sketch memory
+# ===============================
+
+import time
+import numpy as np
+
+from synthetic_data import REPO_DIR  # noqa: F401 (puts Dataset1 on sys.path)
+from dataset1_quantile_sketch import QuantileSketch, quantile_from_counts
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 20_000_000
+CHUNK_SIZE = 1_000_000
+N_PARTITIONS = 4
+K_VALUES = [1024, 4096, 16384]
+OUTLIER_FACTOR = 3
+
+
+def make_amounts(n_rows, cents=True, seed=42):
+    amounts = np.random.default_rng(seed).lognormal(3.0, 1.2, n_rows)
+    return np.round(amounts, 2) if cents else amounts
+
+
+def thresholds(quantile, counts_in_bounds):
+    """
+    Q1, Q3 and the P95 of the amounts inside the 3*IQR bounds.
+    """
+    q1, q3 = quantile(0.25), quantile(0.75)
+    iqr = q3 - q1
+    return q1, q3, quantile_from_counts(counts_in_bounds(q1 - OUTLIER_FACTOR * iqr, q3 + OUTLIER_FACTOR * iqr), 0.95)
+
+
+def sketch_thresholds(sketch):
+    counts = sketch.to_counts()
+    return thresholds(
+        lambda q: quantile_from_counts(counts, q),
+        lambda lo, hi: counts[(counts.index >= lo) & (counts.index <= hi)]
+    )
+
+
+def exact_thresholds(sorted_amounts):
+    q1, q3 = np.quantile(sorted_amounts, [0.25, 0.75])
+    iqr = q3 - q1
+    lo = np.searchsorted(sorted_amounts, q1 - OUTLIER_FACTOR * iqr, side='left')
+    hi = np.searchsorted(sorted_amounts, q3 + OUTLIER_FACTOR * iqr, side='right')
+    return q1, q3, float(np.quantile(sorted_amounts[lo:hi], 0.95))
+
+
+def rank_error(sorted_amounts, value, q):
+    """
+    Distance between the target rank q*(n-1) and the rank range of `value`.
+    """
+    n = len(sorted_amounts)
+    target = q * (n - 1)
+    first = np.searchsorted(sorted_amounts, value, side='left')
+    last = np.searchsorted(sorted_amounts, value, side='right') - 1
+    return max(0.0, first - target, target - last) / n
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    for cents in (True, False):
+        amounts = make_amounts(N_ROWS, cents)
+        sorted_amounts = np.sort(amounts)
+        exact = exact_thresholds(sorted_amounts)
+        kind = "cent amounts" if cents else "continuous amounts"
+        print(f"\n===== {N_ROWS:,} {kind} =====")
+        print(f"exact            Q1={exact[0]:.4f}  Q3={exact[1]:.4f}  P95={exact[2]:.4f}")
+
+        for k in K_VALUES:
+            start = time.perf_counter()
+            sketch = QuantileSketch(k)
+            for i in range(0, N_ROWS, CHUNK_SIZE):
+                sketch.update(amounts[i:i + CHUNK_SIZE])
+            stream_time = time.perf_counter() - start
+
+            # one sketch per partition, merged afterwards
+            parts = [QuantileSketch(k, seed=p) for p in range(N_PARTITIONS)]
+            for i, start_row in enumerate(range(0, N_ROWS, CHUNK_SIZE)):
+                parts[i % N_PARTITIONS].update(amounts[start_row:start_row + CHUNK_SIZE])
+            merged = parts[0]
+            for part in parts[1:]:
+                merged.merge(part)
+
+            for label, s in (("stream", sketch), ("merged", merged)):
+                est = sketch_thresholds(s)
+                rel = [abs(e - x) / x for e, x in zip(est, exact)]
+                rank_errs = [rank_error(sorted_amounts, est[0], 0.25), rank_error(sorted_amounts, est[1], 0.75)]
+                print(f"k={k:<6} {label}  Q1={est[0]:.4f}  Q3={est[1]:.4f}  P95={est[2]:.4f}  "
+                      f"max rel err {max(rel):.2e}  rank err {max(rank_errs):.2e} "
+                      f"(bound {s.error_bound():.2e})  {s.size():,} items ({s.size() * 8 / 1e3:,.0f} KB)")
+            print(f"k={k:<6} stream time {stream_time:.2f}s")
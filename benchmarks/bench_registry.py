@@ -0,0 +1,60 @@
+# ===============================
+# BENCHMARK - MODEL REGISTRY
+# Purpose: Time of fitting the Model 1 / Model 2 / Model 3 style models
+#          (KMeans, Isolation Forest, Random Forest) vs reusing the
+#          registered versions on the same data, and that reused models
+#          predict exactly what the fresh fits did
+# ===============================
+
+import time
+import tempfile
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from sklearn.cluster import KMeans
+from sklearn.ensemble import IsolationForest, RandomForestRegressor
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from pipeline_registry import ModelRegistry
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 2_000_000
+N_CLIENTS = 2_000
+FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value',
+            'spending_variance', 'weekend_spending_ratio']
+
+
+def model_specs(X):
+    X_scaled = StandardScaler().fit_transform(X)
+    return [
+        ('kmeans', lambda: ({'model': KMeans(n_clusters=3, random_state=42).fit(X_scaled)}, {}),
+         lambda m: m.predict(X_scaled)),
+        ('isolation_forest', lambda: ({'model': IsolationForest(random_state=42).fit(X_scaled)}, {}),
+         lambda m: m.predict(X_scaled)),
+        ('random_forest', lambda: ({'model': RandomForestRegressor(n_estimators=100, random_state=42)
+                                    .fit(X_scaled[:, 1:], X_scaled[:, 0])}, {}),
+         lambda m: m.predict(X_scaled[:, 1:])),
+    ]
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    X = build_grouped_summary(make_transactions(N_ROWS, n_clients=N_CLIENTS))[FEATURES].fillna(0)
+    print(f"{len(X):,} client-months")
+
+    with tempfile.TemporaryDirectory(prefix="bench_registry_") as tmp:
+        registry = ModelRegistry(tmp)
+        for name, fit, predict in model_specs(X):
+            timings, predictions = [], []
+            for _ in range(2):  # first call fits and registers, second reuses
+                start = time.perf_counter()
+                artifacts, _, reused = registry.fit_or_load(name, fit, X, FEATURES)
+                timings.append(time.perf_counter() - start)
+                predictions.append(predict(artifacts['model']))
+            identical = np.array_equal(predictions[0], predictions[1])
+            print(f"{name:<17} fit {timings[0]:7.2f}s  reuse {timings[1]:6.2f}s  "
+                  f"speedup {timings[0] / timings[1]:6.1f}x  identical predictions: {identical}")
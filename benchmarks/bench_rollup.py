@@ -0,0 +1,68 @@
+# ===============================
+# BENCHMARK - ROLLUP CUBE (DATASET 1)
+# Purpose: Time to build the day/week/month/quarter rollup cube once vs
+#          rebuilding the summary from transactions for every granularity,
+#          and time to save the cube and query one level from it (CSV and
+#          Parquet); checks that each level matches build_grouped_summary
+#          at that TIME_WINDOW
+# ===============================
+
+import os
+import time
+import tempfile
+import pandas as pd
+
+from synthetic_data import make_transactions
+import pipeline_storage
+from dataset1_features import build_grouped_summary, time_window_labels
+from dataset1_rollup import ROLLUP_LEVELS, daily_partials, build_rollup_cube, write_rollup_cube, read_rollup
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 3_000_000
+N_CLIENTS = 2_000
+STORAGE_FORMATS = ['csv', 'parquet']
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    df = make_transactions(N_ROWS, n_clients=N_CLIENTS, categories=True)
+    print(f"{N_ROWS:,} transactions, {N_CLIENTS:,} clients")
+
+    start = time.perf_counter()
+    expected, rebuild_times = {}, {}
+    for level in ROLLUP_LEVELS:
+        level_start = time.perf_counter()
+        expected[level] = build_grouped_summary(df.assign(time_window=time_window_labels(df['date'], level)))
+        rebuild_times[level] = time.perf_counter() - level_start
+    rebuild_time = time.perf_counter() - start
+    print(f"rebuild from transactions, every level   {rebuild_time:7.2f}s")
+
+    start = time.perf_counter()
+    cube = build_rollup_cube(daily_partials(df))
+    cube_time = time.perf_counter() - start
+    print(f"rollup cube, every level in one pass     {cube_time:7.2f}s  speedup {rebuild_time / cube_time:.1f}x")
+
+    with tempfile.TemporaryDirectory(prefix="bench_rollup_") as tmp:
+        for storage_format in STORAGE_FORMATS:
+            # write_table / read_table read the module setting at call time
+            saved, pipeline_storage.STORAGE_FORMAT = pipeline_storage.STORAGE_FORMAT, storage_format
+            try:
+                print(f"\n===== {storage_format} =====")
+                rollup_file = os.path.join(tmp, "dataset1_rollup.csv")
+                start = time.perf_counter()
+                write_rollup_cube(cube, rollup_file)
+                print(f"save cube                                {time.perf_counter() - start:7.2f}s")
+
+                for level in ROLLUP_LEVELS:
+                    start = time.perf_counter()
+                    summary = read_rollup(rollup_file, level)
+                    query_time = time.perf_counter() - start
+                    pd.testing.assert_frame_equal(summary, expected[level], check_dtype=False, rtol=1e-9)
+                    print(f"query '{level}' ({len(summary):>9,} rows)    {query_time:7.2f}s  "
+                          f"vs rebuild {rebuild_times[level]:6.2f}s  identical: True")
+            finally:
+                pipeline_storage.STORAGE_FORMAT = saved
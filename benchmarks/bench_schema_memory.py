@@ -0,0 +1,97 @@
+# ===============================
+# BENCHMARK - DTYPE SCHEMA MEMORY (DATASET 1)
+# Purpose: Peak RSS of Dataset1_PREPROCESSING.py itself (memory mode) on
+#          synthetic raw transactions: the script as it was before the
+#          dtype schema (taken from git at LEGACY_REVISION) vs the current
+#          one, each run in a fresh process, and a check that both save the
+#          same summary and transactions. The reduction in raw peak RSS is
+#          reported against TARGET_REDUCTION
+# ===============================
+
+import os
+import re
+import sys
+import resource
+import subprocess
+import tempfile
+import pandas as pd
+
+from synthetic_data import make_raw_transactions
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 5_000_000
+N_CLIENTS = 2_000
+TARGET_REDUCTION = 3.0  # requested cut in peak RSS
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(REPO_DIR, "Dataset1", "Dataset1_PREPROCESSING.py")
+LEGACY_REVISION = "5777c68^"  # last commit before the dtype schema
+
+
+def run_script(source_file, raw_file, out_dir):
+    """
+    Run a version of Dataset1_PREPROCESSING.py on `raw_file`, writing under
+    `out_dir` (the configured paths are replaced, nothing else).
+    """
+    with open(source_file) as f:
+        source = f.read()
+    source = re.sub(r'^FILE_PATH = .*$', f'FILE_PATH = {raw_file!r}', source, flags=re.M)
+    source = re.sub(r'^OUTPUT_DIR = .*$', f'OUTPUT_DIR = {out_dir!r}', source, flags=re.M)
+    # compiled as the real script, so its own sys.path setup finds the repo modules
+    sys.path.insert(0, os.path.dirname(SCRIPT))
+    try:
+        exec(compile(source, SCRIPT, 'exec'), {'__name__': '__main__', '__file__': SCRIPT})
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise
+
+
+def child(mode, raw_file, out_dir):
+    if mode == 'generate':
+        make_raw_transactions(N_ROWS, n_clients=N_CLIENTS).to_csv(raw_file, index=False)
+        return
+    source_file = os.path.join(out_dir, "legacy_preprocessing.py") if mode == 'legacy' else SCRIPT
+    run_script(source_file, raw_file, os.path.join(out_dir, mode))
+    print(f"PEAK {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024}")
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        child(*sys.argv[1:])
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory(prefix="bench_schema_") as out_dir:
+        legacy = subprocess.run(["git", "show", f"{LEGACY_REVISION}:Dataset1/Dataset1_PREPROCESSING.py"],
+                                cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout
+        with open(os.path.join(out_dir, "legacy_preprocessing.py"), "w") as f:
+            f.write(legacy)
+
+        raw_file = os.path.join(out_dir, "Dataset 1.csv")
+        print(f"Writing {N_ROWS:,} synthetic raw transactions...")
+
+        # every run in its own process: peak RSS is per process (and survives exec on Linux)
+        env = dict(os.environ, MPLBACKEND='Agg')
+        peaks = {}
+        for mode in ('generate', 'legacy', 'schema'):
+            result = subprocess.run([sys.executable, __file__, mode, raw_file, out_dir],
+                                    capture_output=True, text=True, check=True, env=env)
+            if mode != 'generate':
+                peaks[mode] = int(result.stdout.rsplit("PEAK", 1)[1])
+
+        def saved(mode, name):
+            return pd.read_csv(os.path.join(out_dir, mode, name))
+
+        pd.testing.assert_frame_equal(saved('legacy', "dataset1_summary.csv"), saved('schema', "dataset1_summary.csv"))
+        same_rows = saved('legacy', "dataset1_transactions.csv").equals(saved('schema', "dataset1_transactions.csv"))
+
+        print(f"\n===== PEAK RSS OF Dataset1_PREPROCESSING.py ({N_ROWS:,} rows) =====")
+        print(f"before schema ({LEGACY_REVISION}): {peaks['legacy']:6d} MB")
+        print(f"current                : {peaks['schema']:6d} MB")
+        reduction = peaks['legacy'] / peaks['schema']
+        print(f"reduction              : {reduction:.2f}x "
+              f"({'meets' if reduction >= TARGET_REDUCTION else 'misses'} the {TARGET_REDUCTION:.0f}x target)")
+        print(f"summary identical: True, saved transactions identical: {same_rows}")
@@ -0,0 +1,130 @@
+# ===============================
+# BENCHMARK - CSV vs PARTITIONED PARQUET INTERMEDIATES
+# Purpose: Write and read the Dataset1 and Dataset2 intermediate tables the
+#          way the pipeline stages do (same columns, same partitions) in
+#          both storage formats, and report time and disk footprint per
+#          table and per chain
+# ===============================
+
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from pipeline_storage import (
+    write_table, read_table, disk_usage, TRANSACTIONS_PARTITION, SUMMARY_PARTITION
+)
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 5_000_000        # Dataset 1 transactions
+N_CLIENTS = 2_000
+N_PROFILES = 1_000_000    # Dataset 2 personal-finance rows
+FORMATS = ['csv', 'parquet']
+
+DATASET2_COLUMNS = [
+    "Income", "Age", "Dependents", "Rent", "Loan_Repayment", "Insurance",
+    "Groceries", "Transport", "Eating_Out", "Entertainment", "Utilities",
+    "Healthcare", "Education", "Miscellaneous", "Desired_Savings_Percentage",
+    "Desired_Savings", "Disposable_Income"
+]
+NUMERICAL_COLS = ['total_spending', 'transaction_count', 'avg_transaction_value',
+                  'spending_variance', 'max_amount', 'min_amount', 'weekend_spending_ratio']
+
+
+def make_dataset2(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: np.round(rng.lognormal(7.0, 1.0, n_rows), 2) for col in DATASET2_COLUMNS})
+    df.insert(0, "ID", np.arange(1, n_rows + 1))
+    df["Occupation"] = rng.choice(["Self_Employed", "Retired", "Student", "Professional"], n_rows)
+    df["City_Tier"] = rng.choice(["Tier_1", "Tier_2", "Tier_3"], n_rows)
+    return df
+
+
+# ===============================
+# CHAINS
+# ===============================
+# (table, frame, partition_by, [(stage, read kwargs), ...]) - reads mirror the pipeline scripts
+def dataset1_chain(transactions):
+    summary = build_grouped_summary(transactions).fillna(0)
+    kmeans = summary.assign(cluster=np.arange(len(summary)) % 4)
+    iso = summary.assign(anomaly=np.where(np.arange(len(summary)) % 20 == 0, -1, 1))
+    sample_ids = transactions['client_id'].drop_duplicates().head(5).tolist()
+    order = {'order_by': ['client_id', 'time_window']}
+    return [
+        ('dataset1_transactions', transactions, TRANSACTIONS_PARTITION, [
+            ('EVALUATION', {'where': {'client_id': sample_ids}}),
+        ]),
+        ('dataset1_summary', summary, SUMMARY_PARTITION, [
+            ('MODEL1', order),
+            ('MODEL2', order),
+            ('EVALUATION', {'columns': ['client_id', 'time_window'] + NUMERICAL_COLS, **order}),
+        ]),
+        ('dataset1_kmeans', kmeans, SUMMARY_PARTITION, [
+            ('BEHAVIOR_INSIGHT', {'columns': ['client_id', 'time_window', 'cluster']}),
+            ('EVALUATION', {'columns': ['client_id', 'time_window', 'cluster'], **order}),
+        ]),
+        ('dataset1_isolation_forest', iso, SUMMARY_PARTITION, [
+            ('BEHAVIOR_INSIGHT', {'columns': ['client_id', 'time_window', 'anomaly']}),
+        ]),
+    ]
+
+
+def dataset2_chain(processed):
+    model3_cols = ["ID"] + DATASET2_COLUMNS[:14] + ["Desired_Savings"]
+    return [
+        ('dataset2_processed', processed, None, [
+            ('EDA_OVERSPENDING', {'columns': ["ID", "Income", "Groceries", "Eating_Out", "Entertainment"]}),
+            ('MODEL3', {'columns': model3_cols}),
+            ('MODEL4', {}),
+            ('MODEL5', {}),
+        ]),
+    ]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_chain(name, tables, workdir):
+    print(f"\n===== {name} =====")
+    totals = {fmt: [0.0, 0.0, 0] for fmt in FORMATS}
+    for table, frame, partition_by, reads in tables:
+        path = os.path.join(workdir, f"{table}.csv")
+        for fmt in FORMATS:
+            _, write_time = timed(write_table, frame, path, partition_by=partition_by, storage_format=fmt)
+            read_time = sum(timed(read_table, path, storage_format=fmt, **kwargs)[1] for _, kwargs in reads)
+            size = disk_usage(path, storage_format=fmt)
+            totals[fmt][0] += write_time
+            totals[fmt][1] += read_time
+            totals[fmt][2] += size
+            print(f"{table:<28} {fmt:<8} write {write_time:7.2f}s  "
+                  f"read x{len(reads)} {read_time:7.2f}s  {size / 1e6:9.1f} MB")
+
+    for fmt, (write_time, read_time, size) in totals.items():
+        print(f"{'TOTAL':<28} {fmt:<8} write {write_time:7.2f}s  read    {read_time:7.2f}s  {size / 1e6:9.1f} MB")
+    csv_total = totals['csv'][0] + totals['csv'][1]
+    parquet_total = totals['parquet'][0] + totals['parquet'][1]
+    print(f"parquet vs csv: {csv_total / parquet_total:.1f}x faster I/O, "
+          f"{totals['csv'][2] / totals['parquet'][2]:.1f}x smaller on disk")
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp(prefix="bench_storage_")
+    try:
+        print(f"Generating {N_ROWS:,} transactions and {N_PROFILES:,} Dataset 2 rows...")
+        transactions = make_transactions(N_ROWS, n_clients=N_CLIENTS, categories=True)
+        run_chain("DATASET 1 CHAIN", dataset1_chain(transactions), workdir)
+        run_chain("DATASET 2 CHAIN", dataset2_chain(make_dataset2(N_PROFILES)), workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,96 @@
+# ===============================
+# BENCHMARK - STREAMING EDA (DATASET 1)
+# Purpose: Peak RSS and time of the Dataset1_EDA.py report computed in
+#          memory vs in one streaming pass (exact amount counts and
+#          QuantileSketch), for growing raw files, each run in a fresh
+#          process; checks that the exact streaming report matches the
+#          in-memory one
+# ===============================
+
+import os
+import sys
+import time
+import pickle
+import resource
+import subprocess
+import tempfile
+import pandas as pd
+
+from synthetic_data import make_raw_transactions
+from dataset1_eda import eda_report, StreamingEDA
+from pipeline_schema import DATASET1_RAW_SCHEMA, read_csv_with_schema, iter_csv_with_schema
+
+# ===============================
+# CONFIG
+# ===============================
+ROW_COUNTS = [1_000_000, 4_000_000]
+N_CLIENTS = 2_000
+SAMPLE_SIZE = 500_000
+CHUNK_SIZE = 200_000
+MODES = ['memory', 'exact', 'sketch']
+# compared between memory and exact streaming (the sample differs by design)
+EXACT_KEYS = ['shape', 'missing', 'n_users', 'amount_describe', 'date_range', 'user_describe',
+              'spending_vs_refund', 'spending_describe', 'refund_describe', 'top_mcc_counts',
+              'top_mcc_value', 'error_proportion', 'yearly_tx', 'yearly_amount', 'segment_counts',
+              'extreme_outliers']
+
+
+def child(mode, raw_file, out_file):
+    if mode == 'generate':
+        make_raw_transactions(int(out_file), n_clients=N_CLIENTS).to_csv(raw_file, index=False)
+        return
+    start = time.perf_counter()
+    if mode == 'memory':
+        report = eda_report(read_csv_with_schema(raw_file, DATASET1_RAW_SCHEMA), SAMPLE_SIZE)
+    else:
+        eda = StreamingEDA(SAMPLE_SIZE, quantile_method=mode)
+        for chunk in iter_csv_with_schema(raw_file, DATASET1_RAW_SCHEMA, CHUNK_SIZE):
+            eda.update(chunk)
+        report = eda.report()
+    elapsed = time.perf_counter() - start
+    with open(out_file, 'wb') as f:
+        pickle.dump({key: report[key] for key in EXACT_KEYS}, f)
+    print(f"RESULT {elapsed:.2f} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024}")
+
+
+def same(a, b):
+    if isinstance(a, (pd.Series, pd.DataFrame)):
+        try:
+            (pd.testing.assert_series_equal if isinstance(a, pd.Series) else pd.testing.assert_frame_equal)(
+                a, b, check_dtype=False, check_index_type=False, check_names=False, rtol=1e-9)
+            return True
+        except AssertionError:
+            return False
+    return a == b
+
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        child(*sys.argv[1:])
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory(prefix="bench_eda_") as tmp:
+        for n_rows in ROW_COUNTS:
+            raw_file = os.path.join(tmp, "Dataset 1.csv")
+            # every step in its own process: peak RSS is per process
+            subprocess.run([sys.executable, __file__, 'generate', raw_file, str(n_rows)], check=True)
+            print(f"\n===== {n_rows:,} raw rows =====")
+            reports = {}
+            for mode in MODES:
+                out_file = os.path.join(tmp, f"{mode}.pkl")
+                result = subprocess.run([sys.executable, __file__, mode, raw_file, out_file],
+                                        capture_output=True, text=True, check=True)
+                elapsed, peak = result.stdout.rsplit("RESULT", 1)[1].split()
+                with open(out_file, 'rb') as f:
+                    reports[mode] = pickle.load(f)
+                print(f"{mode:<7} {float(elapsed):7.2f}s  peak RSS {int(peak):6d} MB")
+
+            mismatched = [key for key in EXACT_KEYS if not same(reports['memory'][key], reports['exact'][key])]
+            print(f"exact streaming report identical to in-memory: {not mismatched} {mismatched or ''}")
+            sketch_q = reports['sketch']['amount_describe'][['25%', '50%', '75%']]
+            exact_q = reports['memory']['amount_describe'][['25%', '50%', '75%']]
+            print(f"sketch quartiles max abs error: {(sketch_q - exact_q).abs().max():.4f}, "
+                  f"outliers {reports['sketch']['extreme_outliers']} vs {reports['memory']['extreme_outliers']}")
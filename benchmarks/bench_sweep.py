@@ -0,0 +1,52 @@
+# ===============================
+# BENCHMARK - HYPERPARAMETER SWEEP
+# Purpose: Wall time of a K-Means sweep over the Model 1 client-month
+#          features (pipeline_sweep.run_sweep): configurations fitted one
+#          after another, in a process pool, and rerun from the result
+#          cache with two new grid points
+# ===============================
+
+import os
+import time
+import tempfile
+from sklearn.preprocessing import StandardScaler
+
+from synthetic_data import make_transactions
+from dataset1_features import build_grouped_summary
+from pipeline_sweep import run_sweep
+
+# ===============================
+# CONFIG
+# ===============================
+N_ROWS = 2_000_000
+N_CLIENTS = 10_000  # x 36 months = 360k client-months
+FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value',
+            'spending_variance', 'weekend_spending_ratio']
+GRID = {'n_clusters': list(range(2, 8)), 'algorithm': ['kmeans', 'minibatch']}
+EXTENDED_GRID = {'n_clusters': list(range(2, 9)), 'algorithm': ['kmeans', 'minibatch']}
+N_WORKERS = os.cpu_count()
+
+# ===============================
+# RUN
+# ===============================
+if __name__ == "__main__":
+    summary = build_grouped_summary(make_transactions(N_ROWS, n_clients=N_CLIENTS))
+    X = StandardScaler().fit_transform(summary[FEATURES].fillna(0))
+    print(f"{len(X):,} client-months, {N_WORKERS} CPUs")
+
+    with tempfile.TemporaryDirectory(prefix="bench_sweep_") as cache_dir:
+        runs = [
+            ('serial', GRID, None, 1),
+            (f'{N_WORKERS} workers', GRID, None, N_WORKERS),
+            ('cached + 2 new', EXTENDED_GRID, cache_dir, N_WORKERS)
+        ]
+        # warm the cache with the base grid for the last run
+        run_sweep('bench', 'kmeans', GRID, X, cache_dir=cache_dir, n_workers=N_WORKERS)
+
+        base = None
+        for name, grid, cache, n_workers in runs:
+            start = time.perf_counter()
+            report = run_sweep('bench', 'kmeans', grid, X, cache_dir=cache, n_workers=n_workers)
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print(f"{name:<16} {len(report):3d} configs  {elapsed:7.2f}s  speedup {base / elapsed:5.1f}x")
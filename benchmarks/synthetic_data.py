@@ -0,0 +1,73 @@
+# ===============================
+# SYNTHETIC DATA FOR BENCHMARKS
+# Purpose: Generate Dataset 1 style transactions of any size so pipeline
+#          stages can be timed without the real card transaction log
+# ===============================
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Make the pipeline modules importable from benchmark scripts
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in (REPO_DIR, os.path.join(REPO_DIR, "Dataset1"), os.path.join(REPO_DIR, "Dataset2")):
+    if folder not in sys.path:
+        sys.path.append(folder)
+
+CATEGORIES = ['groceries', 'dining', 'travel', 'shopping', 'utilities']
+
+
+def make_transactions(n_rows, n_clients=2_000, n_months=36, categories=False, seed=42):
+    """
+    Cleaned transactions as they look after preprocessing (amount as float,
+    is_weekend and time_window present), ready for the feature builders.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2010-01-01T00:00')
+    minutes = rng.integers(0, n_months * 30 * 24 * 60, n_rows)
+    dates = pd.to_datetime(np.sort(start + minutes.astype('timedelta64[m]')))
+
+    df = pd.DataFrame({
+        'client_id': rng.integers(0, n_clients, n_rows),
+        'date': dates,
+        'amount': np.round(rng.lognormal(3.0, 1.0, n_rows), 2),
+    })
+    df['is_weekend'] = (df['date'].dt.dayofweek >= 5).astype(int)
+    df['time_window'] = df['date'].dt.to_period('M').astype(str)
+    if categories:
+        df['category'] = rng.choice(CATEGORIES, n_rows)
+    return df
+
+
+def make_raw_transactions(n_rows, n_clients=2_000, n_months=36, seed=42):
+    """
+    Raw Dataset 1 layout ('$'-prefixed amounts, text timestamps, refunds,
+    a few unparseable values) for ingestion benchmarks.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2010-01-01T00:00:00')
+    minutes = np.sort(rng.integers(0, n_months * 30 * 24 * 60, n_rows))
+    dates = pd.Series(start + minutes.astype('timedelta64[m]')).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+    amount = np.round(rng.lognormal(3.0, 1.2, n_rows), 2)
+    amount[rng.random(n_rows) < 0.05] *= -1
+    amount_text = pd.Series(amount).map('${:.2f}'.format)
+
+    df = pd.DataFrame({
+        'id': np.arange(n_rows) + 7_475_327,
+        'date': dates,
+        'client_id': rng.integers(0, n_clients, n_rows),
+        'card_id': rng.integers(0, 6_000, n_rows),
+        'amount': amount_text,
+        'use_chip': rng.choice(['Swipe Transaction', 'Chip Transaction', 'Online Transaction'], n_rows),
+        'merchant_id': rng.integers(0, 100_000, n_rows),
+        'merchant_city': rng.choice(['ONLINE', 'Houston', 'Pensacola', 'Austin', 'Miami'], n_rows),
+        'merchant_state': rng.choice(np.array(['TX', 'FL', 'CA', None], dtype=object), n_rows),
+        'zip': rng.choice([77001.0, 32504.0, np.nan], n_rows),
+        'mcc': rng.choice([5411, 5812, 4121, 5912, 5541], n_rows),
+        'errors': rng.choice(np.array([None, None, None, 'Insufficient Balance'], dtype=object), n_rows),
+    })
+    bad = rng.choice(n_rows, max(1, n_rows // 100_000), replace=False)
+    df.loc[bad, 'amount'] = 'n/a'
+    return df
@@ -0,0 +1,323 @@
+# =========================================
+# budget_projection.py
+# Purpose:
+#   Project the recommended budget month over month (12-36 months)
+#   by reapplying the recommendation policy from recommendation.py
+#   to the previous month's recommended budget:
+#     - Health-based rules (Healthy / Moderate / At Risk)
+#     - Capped 50/30/20 allocation (±MAX_CHANGE_PERCENT)
+#     - Scale-down to fit within income
+#   Financial health is re-evaluated each month with the same
+#   thresholds as calculate_real_financial_health (get_user_insight.py),
+#   so we can tell WHEN a user crosses into a healthier state.
+#
+#   The recurrence runs on (categories x users) numpy arrays, one
+#   step per month, so a whole-population projection is a handful
+#   of array operations per month instead of a Python loop per user.
+# =========================================
+
+import time
+import numpy as np
+import pandas as pd
+
+from recommendation import (
+    df_expenses,
+    MAX_CHANGE_PERCENT,
+    EXPENSE_COLS,
+    NEEDS_COLS,
+    WANTS_COLS,
+    SAVINGS_INVESTMENT_COLS,
+)
+
+# ===============================
+# CONFIGURATION
+# ===============================
+MIN_PROJECTION_MONTHS = 12
+MAX_PROJECTION_MONTHS = 36
+BLOCK_USERS = 16_384  # users projected together per cache-sized block
+
+# Health labels, same as calculate_real_financial_health
+HEALTH_LABELS = np.array(["Healthy", "Moderate", "At Risk", "Critical", "Unknown"])
+HEALTHY, MODERATE, AT_RISK, CRITICAL, UNKNOWN = range(5)
+
+# Internally budgets are stored category-major (categories x users) in
+# 50/30/20 group order, so every category and every group is a
+# contiguous slice of memory.
+POLICY_ORDER = NEEDS_COLS + WANTS_COLS + SAVINGS_INVESTMENT_COLS
+_TO_POLICY = [EXPENSE_COLS.index(c) for c in POLICY_ORDER]
+_FROM_POLICY = [POLICY_ORDER.index(c) for c in EXPENSE_COLS]
+_ROW = {c: i for i, c in enumerate(POLICY_ORDER)}
+_SAVINGS = _ROW["Savings (USD)"]
+_INVESTMENTS = _ROW["Investments (USD)"]
+_MODERATE_CUTS = [_ROW[c] for c in ["Eating Out (USD)", "Entertainment (USD)", "Online Shopping (USD)"]]
+_TRAVEL = _ROW["Travel (USD)"]
+_n_needs, _n_wants = len(NEEDS_COLS), len(WANTS_COLS)
+_ALLOCATION_GROUPS = [
+    (slice(0, _n_needs), 0.5),
+    (slice(_n_needs, _n_needs + _n_wants), 0.3),
+    (slice(_n_needs + _n_wants, len(POLICY_ORDER)), 0.2),
+]
+
+
+# ===============================
+# HELPER: Vectorized Real Financial Health
+# ===============================
+def evaluate_health_arrays(income, total_expenses):
+    """
+    Vectorized version of calculate_real_financial_health.
+
+    Returns (health_code, health_score, expense_ratio, savings_rate) arrays.
+    Users without income get UNKNOWN with score 0 and NaN ratios.
+    """
+    income = np.asarray(income, dtype=float)
+    total_expenses = np.asarray(total_expenses, dtype=float)
+    has_income = np.nan_to_num(income) != 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expense_ratio = np.where(has_income, total_expenses / income, np.nan)
+        savings_rate = np.where(has_income, (income - total_expenses) / income, np.nan)
+
+    spending_points = np.select(
+        [expense_ratio > 1.5, expense_ratio > 1.0, expense_ratio > 0.9, expense_ratio > 0.8],
+        [-3, -2, -1, 1],
+        default=2,
+    )
+    savings_points = np.select(
+        [savings_rate >= 0.2, savings_rate >= 0.1, savings_rate >= 0],
+        [2, 1, 0],
+        default=-1,
+    )
+    score = np.where(has_income, spending_points + savings_points, 0)
+
+    health = np.select(
+        [~has_income, score >= 3, score >= 1, score >= -1],
+        [UNKNOWN, HEALTHY, MODERATE, AT_RISK],
+        default=CRITICAL,
+    )
+    return health, score, expense_ratio, savings_rate
+
+
+# ===============================
+# HELPER: One Month of the Recommendation Policy
+# ===============================
+def apply_recommendation_step(budgets, income, health):
+    """
+    Apply generate_financial_recommendation's adjustment to every user at
+    once and return next month's budgets.
+
+    `budgets` is category-major in POLICY_ORDER (categories x users).
+    `health` holds health codes; anything other than Healthy/Moderate takes
+    the At Risk branch, exactly like the scalar function.
+    """
+    total_expenses = budgets.sum(axis=0)
+    recommended = budgets.copy()
+
+    healthy = health == HEALTHY
+    moderate = health == MODERATE
+    at_risk = ~(healthy | moderate)
+
+    # -------------------------------
+    # Financial health rules
+    # -------------------------------
+    recommended[_SAVINGS] += np.where(at_risk, 0.1, 0.05) * total_expenses
+    recommended[_INVESTMENTS] += np.where(healthy, 0.05, 0.0) * total_expenses
+    cut = np.select([moderate, at_risk], [0.7, 0.5], default=1.0)
+    for row in _MODERATE_CUTS:
+        recommended[row] *= cut
+    recommended[_TRAVEL] *= np.where(at_risk, 0.5, 1.0)
+
+    # -------------------------------
+    # Capped 50/30/20 allocation
+    # -------------------------------
+    for rows, share in _ALLOCATION_GROUPS:
+        group = recommended[rows]
+        current_sum = group.sum(axis=0)
+        scale = np.divide(share * income, current_sum,
+                          out=np.ones_like(current_sum), where=current_sum != 0)
+        # Cap change to ±MAX_CHANGE_PERCENT
+        np.clip(scale, 1 - MAX_CHANGE_PERCENT, 1 + MAX_CHANGE_PERCENT, out=scale)
+        group *= scale
+
+    # -------------------------------
+    # Ensure total recommended expenses <= income
+    # -------------------------------
+    total_recommended = recommended.sum(axis=0)
+    over_income = total_recommended > income
+    scale_factor = np.divide(income, total_recommended,
+                             out=np.ones_like(total_recommended), where=over_income)
+    np.copyto(recommended, np.round(recommended * scale_factor, 2), where=over_income)
+    return recommended
+
+
+# ===============================
+# FUNCTION: PROJECT TRAJECTORIES (ARRAY RECURRENCE)
+# ===============================
+def project_budget_arrays(budgets, income, months=MIN_PROJECTION_MONTHS,
+                          initial_health=None, keep_budgets=False):
+    """
+    Iterate the recommendation policy for `months` months.
+
+    Parameters:
+    - budgets (ndarray): users x EXPENSE_COLS, current monthly expenses
+    - income (ndarray): monthly income per user
+    - months (int): projection horizon (12-36)
+    - initial_health (ndarray, optional): health codes used for the first
+      step; defaults to the real-time health of the current budget
+    - keep_budgets (bool): also return the full (months+1, users, categories)
+      budget cube, only needed for single-user views
+
+    Returns:
+    - dict of arrays with shape (months+1, users); index 0 is the current month
+    """
+    if not MIN_PROJECTION_MONTHS <= months <= MAX_PROJECTION_MONTHS:
+        raise ValueError(
+            f"months must be between {MIN_PROJECTION_MONTHS} and {MAX_PROJECTION_MONTHS}"
+        )
+
+    budgets = np.asarray(budgets, dtype=float)
+    income = np.nan_to_num(np.asarray(income, dtype=float))
+    n_users = budgets.shape[0]
+
+    totals = np.empty((months + 1, n_users))
+    ratios = np.empty((months + 1, n_users))
+    savings = np.empty((months + 1, n_users))
+    scores = np.empty((months + 1, n_users), dtype=int)
+    health = np.empty((months + 1, n_users), dtype=int)
+    cube = np.empty((months + 1,) + budgets.shape) if keep_budgets else None
+
+    # Users are independent, so the recurrence runs block by block; each
+    # block stays cache-resident for all months instead of streaming the
+    # whole population through memory once per month.
+    for start in range(0, n_users, BLOCK_USERS):
+        block = slice(start, start + BLOCK_USERS)
+        block_income = income[block]
+        current = np.ascontiguousarray(budgets[block][:, _TO_POLICY].T)
+        for m in range(months + 1):
+            totals[m, block] = current.sum(axis=0)
+            (health[m, block], scores[m, block],
+             ratios[m, block], savings[m, block]) = evaluate_health_arrays(block_income, totals[m, block])
+            if keep_budgets:
+                cube[m, block] = current[_FROM_POLICY].T
+            if m == months:
+                break
+            if m == 0 and initial_health is not None:
+                step_health = np.asarray(initial_health)[block]
+            else:
+                step_health = health[m, block]
+            current = apply_recommendation_step(current, block_income, step_health)
+
+    return {
+        "total_budget": totals,
+        "expense_to_income_ratio": ratios,
+        "savings_rate": savings,
+        "health_score": scores,
+        "health_code": health,
+        "budgets": cube,
+    }
+
+
+def first_month_where(mask):
+    """
+    First month index (axis 0) where `mask` holds, per user; -1 if never.
+    """
+    reached = mask.any(axis=0)
+    return np.where(reached, mask.argmax(axis=0), -1)
+
+
+# ===============================
+# FUNCTION: POPULATION PROJECTION
+# ===============================
+def project_population(months=MIN_PROJECTION_MONTHS, expenses_df=None):
+    """
+    Project every user in the expenses table and summarize when each
+    crosses the health thresholds.
+
+    Returns a DataFrame with one row per user.
+    """
+    if expenses_df is None:
+        expenses_df = df_expenses
+    users = expenses_df.drop_duplicates("ID", keep="first")
+
+    budgets = users[EXPENSE_COLS].to_numpy(dtype=float)
+    total_now = budgets.sum(axis=1)
+    if "Income (USD)" in users.columns:
+        income = users["Income (USD)"].to_numpy(dtype=float)
+    else:
+        income = total_now
+
+    result = project_budget_arrays(budgets, income, months)
+
+    return pd.DataFrame({
+        "ID": users["ID"].to_numpy(),
+        "income": income,
+        "current_total": total_now,
+        "current_health": HEALTH_LABELS[result["health_code"][0]],
+        "projected_total": result["total_budget"][-1],
+        "projected_expense_to_income_ratio": result["expense_to_income_ratio"][-1],
+        "projected_health": HEALTH_LABELS[result["health_code"][-1]],
+        "months_to_controlled_spending": first_month_where(result["expense_to_income_ratio"] <= 0.8),
+        "months_to_healthy": first_month_where(result["health_code"] == HEALTHY),
+    })
+
+
+# ===============================
+# FUNCTION: SINGLE USER PROJECTION (Returns Dictionary for API)
+# ===============================
+def _rounded_or_none(value, decimals):
+    # NaN (users without income) is not valid JSON: send null instead
+    value = float(value)
+    return None if np.isnan(value) else round(value, decimals)
+
+
+def project_user_trajectory(user_id, months=MIN_PROJECTION_MONTHS):
+    """
+    Month-by-month budget trajectory for one user.
+    Returns None if the user has no expense data; users without income
+    get None ratios.
+    """
+    user_exp = df_expenses[df_expenses["ID"] == user_id]
+    if user_exp.empty:
+        return None
+
+    budgets = user_exp[EXPENSE_COLS].iloc[[0]].to_numpy(dtype=float)
+    total_now = budgets.sum(axis=1)
+    income = user_exp["Income (USD)"].iloc[[0]].to_numpy(dtype=float) \
+        if "Income (USD)" in user_exp.columns else total_now
+
+    result = project_budget_arrays(budgets, income, months, keep_budgets=True)
+
+    trajectory = []
+    for m in range(months + 1):
+        trajectory.append({
+            "month": m,
+            "total_budget": round(float(result["total_budget"][m, 0]), 2),
+            "expense_to_income_ratio": _rounded_or_none(result["expense_to_income_ratio"][m, 0], 4),
+            "savings_rate": _rounded_or_none(result["savings_rate"][m, 0], 4),
+            "financial_health": str(HEALTH_LABELS[result["health_code"][m, 0]]),
+            "health_score": int(result["health_score"][m, 0]),
+            "budget": {c: round(float(v), 2) for c, v in zip(EXPENSE_COLS, result["budgets"][m, 0])},
+        })
+
+    months_to_controlled = int(first_month_where(result["expense_to_income_ratio"] <= 0.8)[0])
+    months_to_healthy = int(first_month_where(result["health_code"] == HEALTHY)[0])
+
+    return {
+        "income": float(income[0]),
+        "months": months,
+        "months_to_controlled_spending": months_to_controlled if months_to_controlled >= 0 else None,
+        "months_to_healthy": months_to_healthy if months_to_healthy >= 0 else None,
+        "trajectory": trajectory,
+    }
+
+
+# ===============================
+# EXAMPLE USAGE
+# ===============================
+if __name__ == "__main__":
+    start = time.perf_counter()
+    projection = project_population(MAX_PROJECTION_MONTHS)
+    elapsed = time.perf_counter() - start
+
+    print(f"Projected {len(projection)} users over {MAX_PROJECTION_MONTHS} months in {elapsed:.3f}s")
+    print(projection["projected_health"].value_counts())
+    print(projection.head())
@@ -0,0 +1,103 @@
+# =========================================
+# model_sweep.py
+# Purpose:
+#   Compare alternative settings of the hard-coded model choices
+#   (Model 1 K_RANGE, Model 2 automatic contamination mean + 3*std,
+#   Model 5 n_clusters = 4, Model 3 n_estimators = 100) in one run:
+#     - one parameter grid per model (SWEEPS)
+#     - configurations fitted in parallel (pipeline_sweep.run_sweep)
+#     - each (configuration, data hash) result cached on disk, so a rerun
+#       with a larger grid only fits the new points
+#   Writes <OUTPUT_DIR>/<sweep>_sweep.csv and sweep_comparison.csv:
+#   quality metrics next to fit and predict seconds.
+#   The model scripts are unchanged; copy the chosen values into them.
+# =========================================
+
+import os
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from pipeline_storage import read_table
+from pipeline_sweep import run_sweep, print_sweep_report, SWEEP_WORKERS
+
+# =========================
+# CONFIG
+# =========================
+DATASET1_SUMMARY = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset1_summary.csv"
+DATASET2_PROCESSED = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_processed.csv"
+OUTPUT_DIR = "/Users/anandhytapratamaputrisutisna/FYP2/Data/model_sweep_results"
+CACHE_DIR = os.path.join(OUTPUT_DIR, ".sweep_cache")
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+# feature lists as in the model scripts
+DATASET1_FEATURES = ['total_spending', 'transaction_count', 'avg_transaction_value',
+                     'spending_variance', 'weekend_spending_ratio']
+MODEL3_FEATURES = [
+    "Age", "Income (USD)", "Rent (USD)", "Groceries (USD)", "Eating Out (USD)",
+    "Entertainment (USD)", "Subscription Services (USD)", "Education (USD)",
+    "Online Shopping (USD)", "Travel (USD)", "Fitness (USD)", "Miscellaneous (USD)"
+]
+MODEL3_TARGET = "total_expense"
+MODEL5_FEATURES = ['Rent (USD)', 'Groceries (USD)', 'Eating Out (USD)',
+                   'Entertainment (USD)', 'Subscription Services (USD)',
+                   'Education (USD)', 'Online Shopping (USD)',
+                   'Travel (USD)', 'Fitness (USD)', 'Miscellaneous (USD)',
+                   'total_expense', 'savings_rate', 'expense_to_income_ratio',
+                   'discretionary_vs_fixed_ratio']
+
+# sweep name -> (model kind, parameter grid); remove an entry to skip that model
+SWEEPS = {
+    'model1_kmeans': ('kmeans', {'n_clusters': list(range(2, 9)), 'algorithm': ['kmeans', 'minibatch']}),
+    'model2_isolation_forest': ('isolation_forest', [
+        {'n_sigma': [2, 2.5, 3, 3.5, 4], 'max_samples': ['auto', 1024]},
+        {'contamination': ['auto']}
+    ]),
+    'model3_random_forest': ('random_forest', {'n_estimators': [50, 100, 200], 'max_depth': [None, 10, 20]}),
+    'model5_kmeans': ('kmeans', {'n_clusters': list(range(2, 9))})
+}
+
+# =========================
+# LOAD DATA (once per dataset)
+# =========================
+def dataset1_inputs():
+    # scaled like Dataset1_MODEL1/2: NaN -> 0, StandardScaler
+    df = read_table(DATASET1_SUMMARY, columns=DATASET1_FEATURES)
+    X_scaled = StandardScaler().fit_transform(df[DATASET1_FEATURES].fillna(0))
+    return X_scaled, df['total_spending'].fillna(0).to_numpy()
+
+
+def dataset2_inputs():
+    df = read_table(DATASET2_PROCESSED, columns=list(dict.fromkeys(MODEL3_FEATURES + MODEL5_FEATURES)))
+    return df, StandardScaler().fit_transform(df[MODEL5_FEATURES])
+
+
+inputs = {}
+if {'model1_kmeans', 'model2_isolation_forest'} & set(SWEEPS):
+    inputs['dataset1'] = dataset1_inputs()
+if {'model3_random_forest', 'model5_kmeans'} & set(SWEEPS):
+    inputs['dataset2'] = dataset2_inputs()
+
+sweep_data = {
+    'model1_kmeans': lambda: (inputs['dataset1'][0], None),
+    'model2_isolation_forest': lambda: inputs['dataset1'],
+    'model3_random_forest': lambda: (inputs['dataset2'][0][MODEL3_FEATURES], inputs['dataset2'][0][MODEL3_TARGET]),
+    'model5_kmeans': lambda: (inputs['dataset2'][1], None)
+}
+
+# =========================
+# RUN SWEEPS
+# =========================
+reports = []
+for name, (kind, grid) in SWEEPS.items():
+    X, y = sweep_data[name]()
+    report = run_sweep(name, kind, grid, X, y, cache_dir=CACHE_DIR, n_workers=SWEEP_WORKERS)
+    report.to_csv(os.path.join(OUTPUT_DIR, f"{name}_sweep.csv"), index=False)
+    print_sweep_report(report)
+    reports.append(report)
+
+# =========================
+# SAVE COMPARISON
+# =========================
+comparison = pd.concat(reports, ignore_index=True)
+comparison.to_csv(os.path.join(OUTPUT_DIR, "sweep_comparison.csv"), index=False)
+print(f"\nSweep comparison saved to: {OUTPUT_DIR}/sweep_comparison.csv")
@@ -0,0 +1,85 @@
+# =========================================
+# pipeline_anomaly.py
+# Purpose:
+#   Isolation Forest fitting and scoring shared by the anomaly stages
+#   (Dataset1 Model 2 and evaluation, Dataset2 preprocessing and Model 4):
+#     - fit with configurable max_samples and n_jobs (trees built in parallel)
+#     - score every row with score_samples in chunks, optionally spread
+#       over worker processes
+#     - a continuous anomaly score saved next to the -1/1 label:
+#         anomaly_score = offset_ - score_samples   (> 0 = anomaly)
+#       The label is exactly IsolationForest.predict, and later stages can
+#       rank rows or apply their own threshold without refitting.
+# =========================================
+
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import IsolationForest
+from threadpoolctl import threadpool_limits
+
+# ===============================
+# CONFIGURATION
+# ===============================
+MAX_SAMPLES = 'auto'        # rows drawn per tree: 'auto' = min(256, n), an int, or a fraction
+N_JOBS = None               # processes/threads for fitting (-1 = all cores)
+SCORE_CHUNK_ROWS = 100_000  # rows scored per task
+SCORE_WORKERS = 1           # processes for scoring (os.cpu_count() for all cores)
+
+_SCORE_JOB = None  # (model, X) inherited by forked workers instead of pickled per chunk
+
+
+# ===============================
+# FIT
+# ===============================
+def make_isolation_forest(contamination='auto', random_state=42, max_samples=MAX_SAMPLES, n_jobs=N_JOBS):
+    return IsolationForest(contamination=contamination, random_state=random_state,
+                           max_samples=max_samples, n_jobs=n_jobs)
+
+
+# ===============================
+# SCORE
+# ===============================
+def _score_chunk(bounds):
+    iso, X = _SCORE_JOB
+    start, stop = bounds
+    return iso.score_samples(X[start:stop])
+
+
+def _score_chunk_worker(bounds):
+    # one thread per process: the workers already fill the cores
+    with threadpool_limits(1):
+        return _score_chunk(bounds)
+
+
+def anomaly_scores(iso, X, chunk_rows=SCORE_CHUNK_ROWS, n_workers=SCORE_WORKERS):
+    """
+    Continuous score and label of every row of X (array or DataFrame).
+
+    Parameters:
+    - iso: fitted IsolationForest
+    - chunk_rows (int): rows per score_samples call
+    - n_workers (int): processes, one chunk per task
+
+    Returns:
+    - (scores, labels): scores = offset_ - score_samples (higher = more
+      anomalous, > 0 = anomaly); labels = -1 anomaly / 1 normal, as predict
+    """
+    global _SCORE_JOB
+    chunks = [(start, min(start + chunk_rows, len(X))) for start in range(0, len(X), chunk_rows)]
+    _SCORE_JOB = (iso, X)
+    try:
+        if n_workers > 1 and len(chunks) > 1 and 'fork' in mp.get_all_start_methods():
+            # fork: workers inherit the model and X (the pipeline scripts have no __main__ guard)
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(chunks)),
+                                     mp_context=mp.get_context('fork')) as pool:
+                parts = list(pool.map(_score_chunk_worker, chunks))
+        else:
+            parts = [_score_chunk(bounds) for bounds in chunks]
+    finally:
+        _SCORE_JOB = None
+
+    scores = iso.offset_ - np.concatenate(parts) if parts else np.empty(0)
+    labels = np.where(scores > 0, -1, 1)
+    return scores, labels
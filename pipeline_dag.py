@@ -0,0 +1,352 @@
+# =========================================
+# pipeline_dag.py
+# Purpose:
+#   Run the stage scripts as a dependency graph instead of by hand:
+#     - every stage declares its script, input files and output files;
+#       a stage depends on the stages whose outputs it reads
+#     - a stage is skipped when the content hashes of its inputs and of
+#       its code (the script and the repo modules it imports) match its
+#       last successful run and its outputs still exist
+#     - stages whose upstream stages are done run in parallel, each in its
+#       own Python process (MAX_WORKERS at a time)
+#     - per-stage log files and a timing report (ran / skipped / failed /
+#       blocked, seconds, start and end offsets)
+#   Hashes are kept in a JSON state file together with each file's size
+#   and modification time, so unchanged files are not read again.
+# =========================================
+
+import os
+import ast
+import sys
+import json
+import time
+import hashlib
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+
+from pipeline_storage import storage_path
+
+# ===============================
+# CONFIGURATION
+# ===============================
+MAX_WORKERS = max(1, min(4, os.cpu_count() or 1))  # stages running at the same time
+HASH_BLOCK = 1 << 24                                # bytes read at a time while hashing
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ===============================
+# GRAPH
+# ===============================
+def _path_key(path):
+    # the scripts spell the same folder "data" and "Data" (case-insensitive filesystem)
+    return os.path.normpath(path).lower()
+
+
+def _produces(path, outputs):
+    key = _path_key(path)
+    return any(key == out or key.startswith(out + os.sep) for out in outputs)
+
+
+def stage_dependencies(stages):
+    """
+    Upstream stages of every stage: those with an output equal to (or a
+    folder containing) one of its inputs.
+
+    Parameters:
+    - stages (dict): name -> {'script', 'inputs', 'outputs'}
+
+    Returns:
+    - dict: name -> list of upstream stage names
+    """
+    outputs = {name: [_path_key(p) for p in stage['outputs']] for name, stage in stages.items()}
+    deps = {
+        name: [other for other in stages
+               if other != name and any(_produces(p, outputs[other]) for p in stage['inputs'])]
+        for name, stage in stages.items()
+    }
+
+    # reject cycles (depth-first search)
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'active':
+            raise ValueError(f"Stage cycle: {' -> '.join(path + [name])}")
+        state[name] = 'active'
+        for dep in deps[name]:
+            visit(dep, path + [name])
+        state[name] = 'done'
+
+    for name in stages:
+        visit(name, [])
+    return deps
+
+
+def upstream(deps, names):
+    """
+    `names` and every stage they depend on, directly or not.
+    """
+    selected, todo = set(), list(names)
+    while todo:
+        name = todo.pop()
+        if name not in selected:
+            selected.add(name)
+            todo.extend(deps[name])
+    return selected
+
+
+# ===============================
+# HASHES
+# ===============================
+class FileHashes:
+    """
+    Content hashes of files and folders, reusing the stored hash of a file
+    whose size and modification time are unchanged.
+    """
+
+    def __init__(self, known=None):
+        self.known = dict(known or {})
+        self.lock = threading.Lock()
+
+    def _file(self, path):
+        stat = os.stat(path)
+        with self.lock:
+            cached = self.known.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                digest.update(block)
+        with self.lock:
+            self.known[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def hash(self, path):
+        """
+        Hash of a file, or of every file in a folder (None if missing).
+        """
+        path = resolve_path(path)
+        if os.path.isfile(path):
+            return self._file(path)
+        if not os.path.isdir(path):
+            return None
+        digest = hashlib.sha1()
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for name in sorted(files):
+                if name.startswith('.'):
+                    continue
+                full = os.path.join(root, name)
+                digest.update(os.path.relpath(full, path).encode())
+                digest.update(self._file(full).encode())
+        return digest.hexdigest()
+
+    def snapshot(self):
+        """
+        Stored hashes of the files that still exist.
+        """
+        with self.lock:
+            return {path: entry for path, entry in self.known.items() if os.path.exists(path)}
+
+
+def resolve_path(path):
+    """
+    A table's file for the active storage format (e.g. its partitioned
+    Parquet folder), else the path as declared.
+    """
+    target = storage_path(path) if path.endswith(".csv") else path
+    return target if os.path.exists(target) else path
+
+
+def code_files(script, search_dirs):
+    """
+    The script and every module it imports (recursively) that lives in
+    `search_dirs` (the repo), so an edited helper module reruns the stage.
+    """
+    found, todo = [], [os.path.abspath(script)]
+    while todo:
+        path = todo.pop()
+        if path in found:
+            continue
+        found.append(path)
+        with open(path) as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                modules = [node.module]
+            else:
+                continue
+            for module in modules:
+                for folder in [os.path.dirname(path)] + list(search_dirs):
+                    candidate = os.path.join(folder, *module.split('.')) + ".py"
+                    if os.path.isfile(candidate):
+                        todo.append(os.path.abspath(candidate))
+                        break
+    return sorted(found)
+
+
+# ===============================
+# STATE
+# ===============================
+def load_state(path):
+    if not os.path.exists(path):
+        return {'stages': {}, 'files': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, path)
+
+
+def _run_reason(previous, code, inputs, outputs):
+    # why the stage has to run, or None when it can be skipped
+    if previous is None:
+        return "no previous run"
+    # a missing input hashes to None: unchanged while it stays missing
+    changed = [p for p in inputs if previous['inputs'].get(p) != inputs[p]]
+    if changed:
+        return "input changed: " + ", ".join(os.path.basename(p) for p in changed)
+    changed = [p for p in sorted(set(code) | set(previous['code'])) if previous['code'].get(p) != code.get(p)]
+    if changed:
+        return "code changed: " + ", ".join(os.path.basename(p) for p in changed)
+    missing = [p for p in outputs if not os.path.exists(resolve_path(p))]
+    if missing:
+        return "missing output: " + ", ".join(os.path.basename(p) for p in missing)
+    return None
+
+
+# ===============================
+# RUN
+# ===============================
+def run_pipeline(stages, base_dir, state_dir, targets=None, force=(), max_workers=MAX_WORKERS, dry_run=False):
+    """
+    Run the stage graph.
+
+    Parameters:
+    - stages (dict): name -> {'script': path relative to the repo,
+      'inputs': [...], 'outputs': [...]} (data paths relative to base_dir)
+    - base_dir (str): working directory of every stage
+    - state_dir (str): state file, logs and timing report
+    - targets (list, optional): run only these stages and their upstream
+      stages (None = all)
+    - force (list): stages run even when unchanged (their downstream
+      stages then run only if their outputs changed)
+    - dry_run (bool): report what would run, run nothing
+
+    Returns:
+    - DataFrame: stage, status, reason, seconds, start, end, log
+    """
+    os.makedirs(os.path.join(state_dir, "logs"), exist_ok=True)
+    state_file = os.path.join(state_dir, "pipeline_state.json")
+    state = load_state(state_file)
+    hashes = FileHashes(state['files'])
+    state_lock = threading.Lock()
+
+    stages = {
+        name: {
+            'script': os.path.join(REPO_DIR, stage['script']),
+            'inputs': [os.path.join(base_dir, p) for p in stage['inputs']],
+            'outputs': [os.path.join(base_dir, p) for p in stage['outputs']]
+        }
+        for name, stage in stages.items()
+    }
+    deps = stage_dependencies(stages)
+    unknown = (set(targets or ()) | set(force)) - set(stages)
+    if unknown:
+        raise ValueError(f"Unknown stages {sorted(unknown)}, expected some of {list(stages)}")
+    selected = upstream(deps, targets) if targets else set(stages)
+    forced = set(force) & selected
+    env = dict(os.environ, MPLBACKEND=os.environ.get('MPLBACKEND', 'Agg'))
+
+    rows, done = {}, {}
+    t0 = time.perf_counter()
+
+    def run_stage(name):
+        stage = stages[name]
+        start = time.perf_counter()
+        code = {os.path.relpath(p, REPO_DIR): hashes.hash(p)
+                for p in code_files(stage['script'], [os.path.dirname(stage['script']), REPO_DIR])}
+        inputs = {p: hashes.hash(p) for p in stage['inputs']}
+        reason = "forced" if name in forced else _run_reason(state['stages'].get(name), code, inputs, stage['outputs'])
+        if reason is None and any(done.get(dep) == "would run" for dep in deps[name]):
+            reason = "upstream stage runs"
+        log_file = os.path.join(state_dir, "logs", f"{name}.log")
+
+        if reason is None or dry_run:
+            status = "skipped" if reason is None else "would run"
+        else:
+            print(f"[{name}] running ({reason})")
+            with open(log_file, "w") as log:
+                result = subprocess.run([sys.executable, stage['script']], cwd=base_dir, env=env,
+                                        stdout=log, stderr=subprocess.STDOUT)
+            status = "ran" if result.returncode == 0 else "failed"
+            with state_lock:
+                if status == "ran":
+                    state['stages'][name] = {'code': code, 'inputs': inputs,
+                                             'finished': time.strftime("%Y-%m-%d %H:%M:%S")}
+                else:
+                    # outputs may be half-written: run again next time, never skip
+                    state['stages'].pop(name, None)
+                state['files'] = hashes.snapshot()
+                save_state(state_file, state)
+
+        end = time.perf_counter()
+        rows[name] = {'stage': name, 'status': status, 'reason': reason or "unchanged",
+                      'seconds': round(end - start, 2), 'start': round(start - t0, 2), 'end': round(end - t0, 2),
+                      'log': log_file if status in ("ran", "failed") else ""}
+        print(f"[{name}] {status} in {end - start:.2f}s" + (f" (see {log_file})" if status == "failed" else ""))
+        return status
+
+    # schedule: submit every stage whose upstream stages are all finished
+    pending = {name for name in stages if name in selected}
+    futures = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or futures:
+            for name in sorted(pending):
+                if any(done.get(dep) in ("failed", "blocked") for dep in deps[name] if dep in selected):
+                    done[name] = "blocked"
+                    rows[name] = {'stage': name, 'status': "blocked", 'reason': "upstream stage failed",
+                                  'seconds': 0.0, 'start': None, 'end': None, 'log': ""}
+                    pending.discard(name)
+                elif all(dep in done for dep in deps[name] if dep in selected):
+                    futures[pool.submit(run_stage, name)] = name
+                    pending.discard(name)
+            if not futures:
+                continue
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done[futures.pop(future)] = future.result()
+
+    if not dry_run:
+        state['files'] = hashes.snapshot()
+        save_state(state_file, state)
+
+    order = [name for name in stages if name in rows]
+    report = pd.DataFrame([rows[name] for name in order])
+    report.to_csv(os.path.join(state_dir, "pipeline_timings.csv"), index=False)
+    return report
+
+
+def print_timing_report(report, wall_seconds):
+    """
+    Per-stage timing table, then wall time against the serial total.
+    """
+    print("\n===== PIPELINE TIMINGS =====")
+    print(f"{'stage':<28} {'status':<10} {'seconds':>8} {'start':>8} {'end':>8}  reason")
+    for row in report.itertuples():
+        start = "" if pd.isna(row.start) else f"{row.start:8.2f}"
+        end = "" if pd.isna(row.end) else f"{row.end:8.2f}"
+        print(f"{row.stage:<28} {row.status:<10} {row.seconds:8.2f} {start:>8} {end:>8}  {row.reason}")
+    serial = report.loc[report['status'].isin(["ran", "failed"]), 'seconds'].sum()
+    print(f"\nWall time: {wall_seconds:.2f}s (stages run: {serial:.2f}s in total)")
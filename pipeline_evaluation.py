@@ -0,0 +1,152 @@
+# =========================================
+# pipeline_evaluation.py
+# Purpose:
+#   Cluster-quality metrics for the evaluation scripts at any number of
+#   rows. A full silhouette needs every pairwise distance (O(n^2) time and,
+#   in sklearn, large distance blocks in memory). Here:
+#     - silhouette on stratified samples (each cluster in proportion,
+#       at least 2 rows each), N_SAMPLES samples -> mean, std and a
+#       normal-approximation 95% confidence interval
+#     - distances computed in row chunks whose block stays under
+#       MAX_MEMORY_MB (one reused buffer, built in place); per-cluster distance sums are accumulated per chunk
+#       (one matrix product with the one-hot labels), never the full matrix
+#     - with sample_size=None or >= n the exact silhouette of all rows
+#       (same chunking, bounded memory)
+#   Every metric records its computation time; write_report() saves them
+#   as JSON next to the text summaries.
+# =========================================
+
+import os
+import json
+import time
+
+import numpy as np
+from sklearn.metrics import davies_bouldin_score
+
+# ===============================
+# CONFIGURATION
+# ===============================
+SAMPLE_SIZE = 10_000   # rows per silhouette sample (None = all rows, exact)
+N_SAMPLES = 5          # samples averaged for the mean and confidence interval
+MAX_MEMORY_MB = 256    # distance block size per chunk
+RANDOM_STATE = 42
+Z_95 = 1.96
+
+
+# ===============================
+# SAMPLING
+# ===============================
+def stratified_sample(labels, sample_size, rng):
+    """
+    Positions of `sample_size` rows with every cluster in proportion to
+    its size (at least 2 rows, or all of a smaller cluster).
+    """
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    quota = np.minimum(np.maximum(np.floor(counts * sample_size / len(labels)).astype(np.int64), 2), counts)
+    order = np.lexsort((rng.random(len(labels)), inverse))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(labels)) - starts[inverse[order]]
+    return np.sort(order[rank < quota[inverse[order]]])
+
+
+# ===============================
+# SILHOUETTE
+# ===============================
+def chunked_silhouette(X, labels, max_memory_mb=MAX_MEMORY_MB):
+    """
+    Mean silhouette of all rows of X, same definition as
+    sklearn.metrics.silhouette_score (0 for rows of single-row clusters),
+    with distance blocks of at most `max_memory_mb`.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    if len(counts) < 2:
+        raise ValueError("Silhouette needs at least 2 clusters")
+    onehot = np.zeros((len(X), len(counts)))
+    onehot[np.arange(len(X)), inverse] = 1.0
+    sq_norms = np.einsum('ij,ij->i', X, X)
+
+    chunk_rows = max(1, min(len(X), int(max_memory_mb * 2**20 // (8 * len(X)))))
+    buf = np.empty((chunk_rows, len(X)))  # the only chunk-by-n block, filled in place
+    scores = np.empty(len(X))
+    for start in range(0, len(X), chunk_rows):
+        stop = min(start + chunk_rows, len(X))
+        dist = buf[:stop - start]
+        np.matmul(X[start:stop], X.T, out=dist)
+        dist *= -2.0
+        dist += sq_norms[None, :]
+        dist += sq_norms[start:stop, None]
+        np.maximum(dist, 0, out=dist)
+        np.sqrt(dist, out=dist)
+        sums = dist @ onehot  # distance from each chunk row to every cluster
+
+        own = inverse[start:stop]
+        rows = np.arange(stop - start)
+        own_counts = counts[own]
+        a = sums[rows, own] / np.maximum(own_counts - 1, 1)
+        means = sums / counts
+        means[rows, own] = np.inf
+        b = means.min(axis=1)
+        s = (b - a) / np.maximum(a, b)
+        scores[start:stop] = np.where(own_counts > 1, np.nan_to_num(s), 0.0)
+    return float(scores.mean())
+
+
+def sampled_silhouette(X, labels, sample_size=SAMPLE_SIZE, n_samples=N_SAMPLES, random_state=RANDOM_STATE,
+                       max_memory_mb=MAX_MEMORY_MB):
+    """
+    Silhouette estimate from stratified samples (exact when the sample
+    would cover every row).
+
+    Returns:
+    - dict: silhouette (mean), std, ci_low, ci_high, n_samples,
+      sample_size, exact, seconds
+    """
+    start = time.perf_counter()
+    labels = np.asarray(labels)
+    exact = sample_size is None or sample_size >= len(labels)
+    if exact:
+        value = chunked_silhouette(X, labels, max_memory_mb)
+        values, sample_size = np.array([value]), len(labels)
+    else:
+        rng = np.random.default_rng(random_state)
+        values = np.array([
+            chunked_silhouette(np.asarray(X[rows]), labels[rows], max_memory_mb)
+            for rows in (stratified_sample(labels, sample_size, rng) for _ in range(n_samples))
+        ])
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+    half_width = Z_95 * std / np.sqrt(len(values))
+    return {
+        'silhouette': mean,
+        'std': std,
+        'ci_low': float(mean - half_width),
+        'ci_high': float(mean + half_width),
+        'n_samples': int(len(values)),
+        'sample_size': int(sample_size),
+        'exact': exact,
+        'seconds': time.perf_counter() - start
+    }
+
+
+# ===============================
+# OTHER METRICS / REPORT
+# ===============================
+def timed_davies_bouldin(X, labels):
+    """
+    Davies-Bouldin index (O(n * k), no pairwise distances) and its seconds.
+    """
+    start = time.perf_counter()
+    value = float(davies_bouldin_score(X, labels))
+    return {'davies_bouldin': value, 'seconds': time.perf_counter() - start}
+
+
+def write_report(path, report):
+    """
+    Save an evaluation report (dict of metrics and timings) as JSON.
+    """
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True, default=str)
+    os.replace(tmp_file, path)
+    print(f"Evaluation report saved to: {path}")
@@ -0,0 +1,171 @@
+# =========================================
+# pipeline_feature_cache.py
+# Purpose:
+#   Scaled feature matrices shared between model stages. The first stage
+#   that needs (input table, feature list, fill value, dtype) reads the
+#   table, fills NaN, fits a StandardScaler and saves
+#     <table dir>/.feature_cache/<key>/X.npy        scaled matrix
+#     <table dir>/.feature_cache/<key>/scaler.joblib
+#     <table dir>/.feature_cache/<key>/meta.json
+#   Later stages memory-map X.npy instead of parsing and scaling again.
+#   The key hashes the input file contents, so a rewritten table never
+#   serves a stale matrix. Content hashes are kept in
+#   .feature_cache/file_hashes.json with each file's size and mtime, so an
+#   unchanged table is not read again just to find its entry.
+# =========================================
+
+import os
+import json
+import glob
+import shutil
+import hashlib
+
+import joblib
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from pipeline_storage import read_table, storage_path
+
+# ===============================
+# CONFIGURATION
+# ===============================
+CACHE_DIR_NAME = ".feature_cache"
+MAX_ENTRIES = 16           # oldest matrices and projections beyond this are deleted
+HASH_BLOCK = 1 << 24       # bytes read at a time while hashing input files
+HASH_INDEX_NAME = "file_hashes.json"  # stored hashes with each file's size and mtime
+
+
+# ===============================
+# KEYS
+# ===============================
+def file_hash(path, storage_format=None):
+    """
+    Hash of a table's contents (every file of a partitioned Parquet table).
+    Reuses the stored hash while every file keeps its size and mtime, like
+    dataset1_incremental.scan_incoming.
+    """
+    target = storage_path(path, storage_format)
+    files = sorted(glob.glob(os.path.join(target, "**", "*"), recursive=True)) if os.path.isdir(target) else [target]
+    files = [name for name in files if os.path.isfile(name)]
+    stats = [[os.path.relpath(name, target), os.stat(name).st_size, os.stat(name).st_mtime_ns] for name in files]
+
+    index_file = os.path.join(feature_cache_dir(path, storage_format), HASH_INDEX_NAME)
+    index = {}
+    if os.path.exists(index_file):
+        try:
+            with open(index_file) as f:
+                index = json.load(f)
+        except ValueError:
+            index = {}  # unreadable index: hash again
+    entry = index.get(os.path.abspath(target))
+    if entry and entry['stats'] == stats:
+        return entry['hash']
+
+    digest = hashlib.sha1()
+    for name in files:
+        digest.update(os.path.relpath(name, target).encode())
+        with open(name, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                digest.update(block)
+
+    index[os.path.abspath(target)] = {'stats': stats, 'hash': digest.hexdigest()}
+    os.makedirs(os.path.dirname(index_file), exist_ok=True)
+    tmp_file = f"{index_file}.tmp{os.getpid()}"
+    with open(tmp_file, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_file, index_file)
+    return digest.hexdigest()
+
+
+def feature_cache_dir(path, storage_format=None):
+    """
+    Cache folder next to a table (also used for PCA projections of its matrices).
+    """
+    return os.path.join(os.path.dirname(storage_path(path, storage_format)), CACHE_DIR_NAME)
+
+
+def prune_cache(cache_dir, keep):
+    """
+    Delete all but the MAX_ENTRIES most recently used entries (matrices and projections).
+    """
+    entries = sorted(glob.glob(os.path.join(cache_dir, "*", "meta.json")), key=os.path.getmtime, reverse=True)
+    for meta_file in entries[MAX_ENTRIES:]:
+        entry = os.path.dirname(meta_file)
+        if os.path.basename(entry) != keep:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def publish_entry(tmp_entry, entry):
+    """
+    Move a completed temp folder to `entry`. Stages running in parallel
+    may build the same entry at once: the first rename wins and the other
+    copy (same contents) is dropped.
+    """
+    try:
+        os.replace(tmp_entry, entry)
+    except OSError:
+        if os.path.exists(os.path.join(entry, "meta.json")):
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        else:
+            # leftover without meta.json (interrupted write)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_entry, entry)
+
+
+# ===============================
+# CACHE
+# ===============================
+def scaled_features(path, features, fill_value=0, dtype='float32', order_by=None, frame=None,
+                    storage_format=None):
+    """
+    StandardScaler-scaled `features` of the table at `path`, with NaN
+    filled by `fill_value` (None = no fill).
+
+    Parameters:
+    - order_by (list, optional): row order of the matrix (read_table order_by)
+    - frame (DataFrame, optional): the table already read in that order;
+      used on a cache miss instead of reading it again
+
+    Returns:
+    - (X_scaled, scaler, cached): X_scaled is a read-only memory map
+    """
+    features = list(features)
+    spec = {
+        'file_hash': file_hash(path, storage_format),
+        'features': features,
+        'fill_value': fill_value,
+        'dtype': np.dtype(dtype).str,
+        'order_by': list(order_by or [])
+    }
+    key = hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+    cache_dir = feature_cache_dir(path, storage_format)
+    entry = os.path.join(cache_dir, key)
+    matrix_file = os.path.join(entry, "X.npy")
+
+    if os.path.exists(os.path.join(entry, "meta.json")):
+        os.utime(os.path.join(entry, "meta.json"))  # most recently used survives pruning
+        print(f"Feature matrix from cache: {entry}")
+        return np.load(matrix_file, mmap_mode='r'), joblib.load(os.path.join(entry, "scaler.joblib")), True
+
+    if frame is None:
+        frame = read_table(path, columns=features, order_by=order_by, storage_format=storage_format)
+    X = frame[features] if fill_value is None else frame[features].fillna(fill_value)
+    scaler = StandardScaler().fit(X)
+
+    # write into a temp folder and rename it, so readers never see a partial entry
+    tmp_entry = f"{entry}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_entry, ignore_errors=True)
+    os.makedirs(tmp_entry)
+    matrix = np.lib.format.open_memmap(os.path.join(tmp_entry, "X.npy"), mode='w+',
+                                       dtype=dtype, shape=(len(X), len(features)))
+    matrix[:] = scaler.transform(X)
+    matrix.flush()
+    del matrix
+    joblib.dump(scaler, os.path.join(tmp_entry, "scaler.joblib"))
+    with open(os.path.join(tmp_entry, "meta.json"), "w") as f:
+        json.dump({**spec, 'n_rows': len(X), 'input': path}, f, indent=2)
+    publish_entry(tmp_entry, entry)
+    prune_cache(cache_dir, keep=key)
+
+    print(f"Feature matrix cached: {entry}")
+    return np.load(matrix_file, mmap_mode='r'), scaler, False
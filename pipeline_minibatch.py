@@ -0,0 +1,188 @@
+# =========================================
+# pipeline_minibatch.py
+# Purpose:
+#   Out-of-core K-Means for feature tables larger than memory (Model 1
+#   client-month summaries, Model 5 expense table). The table is streamed
+#   from disk in chunks (pipeline_storage.iter_table) and never loaded whole:
+#     1. scan:   StandardScaler.partial_fit on every row, plus a fixed-size
+#                uniform sample kept in memory (k selection, plots, medians)
+#     2. fit:    k-means++ centers on the sample, then MiniBatchKMeans
+#                partial_fit over shuffled mini-batches, N_EPOCHS passes
+#     3. stats:  labels chunk by chunk; per-cluster counts, means, std and
+#                inertia (used to order clusters, e.g. Low/Medium/High)
+#     4. write:  labels again and write the labelled chunks
+#   Memory is bounded by CHUNK_ROWS + SAMPLE_ROWS, not by the table size.
+# =========================================
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+from pipeline_storage import iter_table, write_table
+
+# ===============================
+# CONFIGURATION
+# ===============================
+CHUNK_ROWS = 250_000     # rows read from disk at a time
+SAMPLE_ROWS = 50_000     # uniform sample kept in memory
+BATCH_SIZE = 4_096       # rows per MiniBatchKMeans update
+N_EPOCHS = 3             # passes over the table while fitting
+
+
+# ===============================
+# STREAMING
+# ===============================
+def iter_features(path, features, fill_value=0, columns=None, chunk_rows=CHUNK_ROWS, storage_format=None):
+    """
+    (chunk, X) pairs: the chunk's rows (`columns`, None = all) and its
+    `features` as a float array with NaN filled by `fill_value`.
+    """
+    read_columns = None if columns is None else list(dict.fromkeys(list(columns) + list(features)))
+    for chunk in iter_table(path, columns=read_columns, chunk_rows=chunk_rows, storage_format=storage_format):
+        X = chunk[features] if fill_value is None else chunk[features].fillna(fill_value)
+        yield chunk, X.to_numpy(dtype=np.float64)
+
+
+def scan_table(path, features, fill_value=0, sample_rows=SAMPLE_ROWS, random_state=42,
+               chunk_rows=CHUNK_ROWS, storage_format=None):
+    """
+    One pass over the table: scaler fitted on every row and a uniform
+    random sample of `sample_rows` rows (all columns, table order).
+
+    Returns:
+    - (scaler, sample, n_rows)
+    """
+    rng = np.random.default_rng(random_state)
+    scaler = StandardScaler()
+    sample, sample_keys, n_rows = None, np.empty(0), 0
+
+    for chunk, X in iter_features(path, features, fill_value, chunk_rows=chunk_rows, storage_format=storage_format):
+        scaler.partial_fit(X)
+        chunk = chunk.set_index(np.arange(n_rows, n_rows + len(chunk)))
+        n_rows += len(chunk)
+
+        # keep the rows with the smallest random keys (a uniform sample of any size table)
+        keys = rng.random(len(chunk))
+        if len(sample_keys) >= sample_rows:
+            candidates = keys < sample_keys.max()
+            chunk, keys = chunk[candidates], keys[candidates]
+        sample = chunk if sample is None else pd.concat([sample, chunk])
+        sample_keys = np.concatenate([sample_keys, keys])
+        if len(sample_keys) > sample_rows:
+            keep = np.argpartition(sample_keys, sample_rows)[:sample_rows]
+            sample, sample_keys = sample.iloc[keep], sample_keys[keep]
+
+    if sample is None:
+        raise ValueError(f"No rows in {path}")
+    order = np.argsort(sample.index.to_numpy())
+    return scaler, sample.iloc[order].reset_index(drop=True), n_rows
+
+
+# ===============================
+# FIT
+# ===============================
+def fit_minibatch_kmeans(path, features, k, scaler, sample, fill_value=0, n_epochs=N_EPOCHS,
+                         batch_size=BATCH_SIZE, random_state=42, chunk_rows=CHUNK_ROWS, storage_format=None):
+    """
+    MiniBatchKMeans fitted by partial_fit over the streamed table,
+    starting from KMeans centers of the in-memory sample.
+    """
+    X_sample = sample[features] if fill_value is None else sample[features].fillna(fill_value)
+    init = KMeans(n_clusters=k, random_state=random_state).fit(
+        scaler.transform(X_sample.to_numpy(dtype=np.float64))).cluster_centers_
+    model = MiniBatchKMeans(n_clusters=k, init=init, n_init=1, batch_size=batch_size, random_state=random_state)
+
+    rng = np.random.default_rng(random_state)
+    for _ in range(n_epochs):
+        for _, X in iter_features(path, features, fill_value, columns=features, chunk_rows=chunk_rows,
+                                  storage_format=storage_format):
+            # shuffle within the chunk: tables are sorted by client/month
+            X = scaler.transform(X)[rng.permutation(len(X))]
+            for batch in np.array_split(X, max(1, len(X) // batch_size)):
+                model.partial_fit(batch)
+    return model
+
+
+# ===============================
+# ASSIGN / WRITE
+# ===============================
+def cluster_stats(path, features, scaler, model, stat_columns=None, fill_value=0,
+                  chunk_rows=CHUNK_ROWS, storage_format=None):
+    """
+    Label every row and aggregate per cluster without keeping the labels.
+
+    Returns:
+    - (stats, inertia): stats is indexed by cluster with one
+      (column, 'count'/'mean'/'std') pair per stat column plus 'size';
+      NaN is skipped like DataFrame.groupby().agg()
+    """
+    stat_columns = list(stat_columns or features)
+    count = mean = m2 = size = None
+    inertia = 0.0
+    for chunk, X in iter_features(path, features, fill_value, columns=stat_columns, chunk_rows=chunk_rows,
+                                  storage_format=storage_format):
+        X_scaled = scaler.transform(X)
+        labels = model.predict(X_scaled)
+        inertia += float(((X_scaled - model.cluster_centers_[labels]) ** 2).sum())
+
+        # per-chunk (count, mean, m2), merged with the parallel-variance
+        # formula (Chan et al.) like dataset1_features.merge_partials: no
+        # sum of squares, so large spending values keep their precision
+        grouped = chunk[stat_columns].astype(float).groupby(labels)
+        n_b = grouped.count()
+        mean_b = grouped.mean().fillna(0.0)
+        m2_b = (grouped.var(ddof=0) * n_b).fillna(0.0)
+        size_b = grouped.size()
+        if count is None:
+            count, mean, m2, size = n_b, mean_b, m2_b, size_b
+            continue
+
+        clusters = count.index.union(n_b.index)
+        n_a, mean_a, m2_a = (frame.reindex(clusters, fill_value=0.0) for frame in (count, mean, m2))
+        n_b, mean_b, m2_b = (frame.reindex(clusters, fill_value=0.0) for frame in (n_b, mean_b, m2_b))
+        n = n_a + n_b
+        weight = (n_b / n).fillna(0.0)
+        delta = mean_b - mean_a
+        mean = mean_a + delta * weight
+        m2 = m2_a + m2_b + delta ** 2 * n_a * weight
+        count = n
+        size = size.reindex(clusters, fill_value=0) + size_b.reindex(clusters, fill_value=0)
+
+    rows = {}
+    for col in stat_columns:
+        rows[(col, 'count')] = count[col].astype(int)
+        rows[(col, 'mean')] = mean[col].where(count[col] > 0)
+        rows[(col, 'std')] = np.sqrt(m2[col] / (count[col] - 1)).where(count[col] > 1)
+    stats = pd.DataFrame(rows)
+    stats['size'] = size.astype(int)
+    stats.index.name = 'cluster'
+    return stats.sort_index(), inertia
+
+
+def write_clusters(path, output_path, features, scaler, model, label_map=None, pca=None,
+                   pca_columns=('pca1', 'pca2'), partition_by=None, fill_value=0,
+                   chunk_rows=CHUNK_ROWS, storage_format=None):
+    """
+    Stream the table to `output_path` with a 'cluster' column (and
+    'cluster_label' from `label_map`, and PCA coordinates from `pca`).
+
+    Returns:
+    - rows written
+    """
+    n_rows = 0
+    for part, (chunk, X) in enumerate(iter_features(path, features, fill_value, chunk_rows=chunk_rows,
+                                                    storage_format=storage_format)):
+        X_scaled = scaler.transform(X)
+        chunk = chunk.copy()
+        chunk['cluster'] = model.predict(X_scaled)
+        if label_map is not None:
+            chunk['cluster_label'] = chunk['cluster'].map(label_map)
+        if pca is not None:
+            X_pca = pca.transform(X_scaled)
+            for i, col in enumerate(pca_columns):
+                chunk[col] = X_pca[:, i]
+        write_table(chunk, output_path, partition_by=partition_by, append=part > 0, part=part,
+                    storage_format=storage_format)
+        n_rows += len(chunk)
+    return n_rows
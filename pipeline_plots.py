@@ -0,0 +1,170 @@
+# =========================================
+# pipeline_plots.py
+# Purpose:
+#   Plot jobs for the EDA and model scripts. Instead of drawing each
+#   seaborn figure inline, scripts describe it (output path, seaborn
+#   function, data, labels) with PlotJobs.add() and call render() once:
+#     - 'parallel': figures are drawn in a process pool
+#     - 'serial':   figures are drawn one after another (original behavior)
+#     - 'none':     nothing is drawn (headless batch runs)
+#   A figure whose data hash and spec match the last run, and whose PNG
+#   still exists, is skipped. Keys are kept in .plot_cache.json next to
+#   the images.
+# =========================================
+
+import os
+import json
+import hashlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# ===============================
+# CONFIGURATION
+# ===============================
+# set PIPELINE_PLOT_MODE to switch every script at once
+PLOT_MODE = os.environ.get("PIPELINE_PLOT_MODE", "parallel").lower()
+PLOT_WORKERS = os.cpu_count()
+CACHE_NAME = ".plot_cache.json"
+PLOT_MODES = ('parallel', 'serial', 'none')
+
+
+# ===============================
+# CACHE
+# ===============================
+def _job_key(job):
+    """
+    Hash of the plotted data (values, index, column names and dtypes) and
+    of everything else that shapes the figure.
+    """
+    digest = hashlib.sha1()
+    data = job['data']
+    digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in data.dtypes.items()]).encode())
+    spec = {key: value for key, value in job.items() if key not in ('data', 'path')}
+    digest.update(repr(sorted(spec.items())).encode())
+    return digest.hexdigest()
+
+
+def _load_cache(folder):
+    cache_file = os.path.join(folder, CACHE_NAME)
+    if not os.path.exists(cache_file):
+        return {}
+    with open(cache_file) as f:
+        return json.load(f)
+
+
+def _save_cache(folder, cache):
+    # write then rename, so an interrupted run never leaves a half-written cache
+    cache_file = os.path.join(folder, CACHE_NAME)
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, cache_file)
+
+
+# ===============================
+# RENDER
+# ===============================
+def _draw(job):
+    """
+    Draw and save one figure (runs in the main process or a pool worker).
+    """
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=job['figsize'])
+    getattr(sns, job['plot'])(data=job['data'], **dict(job['plot_kwargs']))
+    if job['title'] is not None:
+        plt.title(job['title'])
+    if job['xlabel'] is not None:
+        plt.xlabel(job['xlabel'])
+    if job['ylabel'] is not None:
+        plt.ylabel(job['ylabel'])
+    if job['grid']:
+        plt.grid(True)
+    if job['tight_layout']:
+        plt.tight_layout()
+    plt.savefig(job['path'])
+    plt.close()
+    return job['path']
+
+
+class PlotJobs:
+    """
+    Collects figures and renders them together.
+
+    Parameters:
+    - mode (str, optional): 'parallel', 'serial' or 'none'; PLOT_MODE by default
+    - n_workers (int, optional): pool size in parallel mode
+    """
+
+    def __init__(self, mode=None, n_workers=None):
+        self.mode = (mode or PLOT_MODE).lower()
+        if self.mode not in PLOT_MODES:
+            raise ValueError(f"Unknown plot mode {self.mode!r}, expected one of {PLOT_MODES}")
+        self.n_workers = n_workers or PLOT_WORKERS or 1
+        self.jobs = []
+
+    def add(self, path, plot, data, figsize, title=None, xlabel=None, ylabel=None,
+            grid=False, tight_layout=False, **plot_kwargs):
+        """
+        Queue `sns.<plot>(data=data, **plot_kwargs)` saved to `path`.
+        Pass only the columns the figure uses, so unrelated changes to the
+        frame do not invalidate the cached image.
+        """
+        if self.mode == 'none':
+            return
+        self.jobs.append({
+            'path': path,
+            'plot': plot,
+            'data': data,
+            'figsize': tuple(figsize),
+            'title': title,
+            'xlabel': xlabel,
+            'ylabel': ylabel,
+            'grid': grid,
+            'tight_layout': tight_layout,
+            'plot_kwargs': tuple(sorted(plot_kwargs.items()))
+        })
+
+    def render(self):
+        """
+        Draw every queued figure whose data or spec changed since the last
+        run; returns {'rendered': n, 'cached': n}.
+        """
+        jobs, self.jobs = self.jobs, []
+        if self.mode == 'none':
+            print("Plots disabled (plot mode 'none')")
+            return {'rendered': 0, 'cached': 0}
+
+        caches, todo = {}, []
+        for job in jobs:
+            folder, name = os.path.split(job['path'])
+            cache = caches.setdefault(folder, _load_cache(folder))
+            key = _job_key(job)
+            if cache.get(name) == key and os.path.exists(job['path']):
+                continue
+            cache.pop(name, None)  # re-added once the figure is saved
+            todo.append((job, key))
+
+        if self.mode == 'parallel' and len(todo) > 1 and 'fork' in mp.get_all_start_methods():
+            # fork: the scripts have no __main__ guard, so spawned workers would re-run them
+            n_workers = min(self.n_workers, len(todo))
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context('fork')) as pool:
+                list(pool.map(_draw, [job for job, _ in todo]))
+        else:
+            for job, _ in todo:
+                _draw(job)
+
+        for job, key in todo:
+            folder, name = os.path.split(job['path'])
+            caches[folder][name] = key
+        for folder, cache in caches.items():
+            _save_cache(folder, cache)
+
+        print(f"Plots: {len(todo)} rendered, {len(jobs) - len(todo)} unchanged (plot mode '{self.mode}')")
+        return {'rendered': len(todo), 'cached': len(jobs) - len(todo)}
@@ -0,0 +1,124 @@
+# =========================================
+# pipeline_projection.py
+# Purpose:
+#   2D PCA projections for the cluster and anomaly plots, fitted once per
+#   feature matrix and reused by every figure and stage that draws it:
+#     - in the same process: memoized by matrix hash
+#     - across stages: saved as <cache_dir>/pca_<key>/ (projection.npy,
+#       pca.joblib, meta.json) when a cache folder is given
+#   Solvers:
+#     - 'full':        sklearn PCA (default solver, the original behavior)
+#     - 'randomized':  randomized SVD, for wide matrices
+#     - 'incremental': IncrementalPCA over row batches, so memory-mapped
+#                      matrices are never centered as one in-memory copy
+#     - 'auto':        'incremental' from INCREMENTAL_ROWS rows, else 'full'
+# =========================================
+
+import os
+import json
+import shutil
+import hashlib
+
+import joblib
+import numpy as np
+from sklearn.decomposition import PCA, IncrementalPCA
+
+from pipeline_feature_cache import prune_cache, publish_entry
+from pipeline_registry import data_hash
+
+# ===============================
+# CONFIGURATION
+# ===============================
+PROJECTION_METHODS = ('auto', 'full', 'randomized', 'incremental')
+INCREMENTAL_ROWS = 2_000_000
+BATCH_ROWS = 200_000
+
+_MEMO = {}
+
+
+# ===============================
+# FIT / TRANSFORM
+# ===============================
+def _batches(n_rows, batch_rows, min_rows):
+    """
+    Row ranges of at most `batch_rows`; a short tail is merged into the
+    previous batch (IncrementalPCA needs >= n_components rows per batch).
+    """
+    bounds = list(range(0, n_rows, batch_rows)) + [n_rows]
+    if len(bounds) > 2 and bounds[-1] - bounds[-2] < min_rows:
+        del bounds[-2]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _fit(X, n_components, method, random_state, batch_rows):
+    if method == 'incremental':
+        pca = IncrementalPCA(n_components=n_components)
+        for start, stop in _batches(len(X), batch_rows, n_components):
+            pca.partial_fit(X[start:stop])
+        return pca
+    svd_solver = 'randomized' if method == 'randomized' else 'auto'
+    return PCA(n_components=n_components, svd_solver=svd_solver, random_state=random_state).fit(X)
+
+
+def _transform(pca, X, batch_rows):
+    if len(X) <= batch_rows:
+        return pca.transform(X)
+    return np.vstack([pca.transform(X[start:stop]) for start, stop in _batches(len(X), batch_rows, 1)])
+
+
+def _key(X, n_components, method, random_state):
+    spec = repr((data_hash(X), n_components, method, random_state))
+    return hashlib.sha1(spec.encode()).hexdigest()[:16]
+
+
+# ===============================
+# PROJECTION
+# ===============================
+def project(X, n_components=2, method='auto', random_state=None, cache_dir=None, batch_rows=BATCH_ROWS):
+    """
+    PCA projection of the rows of X (array or memory map).
+
+    Parameters:
+    - method (str): one of PROJECTION_METHODS
+    - cache_dir (str, optional): save/reuse the projection there, so
+      later stages drawing the same matrix skip the fit
+
+    Returns:
+    - (X_pca, pca): projected rows and the fitted PCA (for new rows)
+    """
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Unknown projection method {method!r}, expected one of {PROJECTION_METHODS}")
+    if method == 'auto':
+        method = 'incremental' if len(X) >= INCREMENTAL_ROWS else 'full'
+
+    key = _key(X, n_components, method, random_state)
+    if key in _MEMO:
+        return _MEMO[key]
+
+    entry = os.path.join(cache_dir, f"pca_{key}") if cache_dir else None
+    if entry and os.path.exists(os.path.join(entry, "meta.json")):
+        os.utime(os.path.join(entry, "meta.json"))
+        print(f"PCA projection from cache: {entry}")
+        result = np.load(os.path.join(entry, "projection.npy")), joblib.load(os.path.join(entry, "pca.joblib"))
+        _MEMO[key] = result
+        return result
+
+    pca = _fit(X, n_components, method, random_state, batch_rows)
+    X_pca = _transform(pca, X, batch_rows)
+    _MEMO[key] = X_pca, pca
+
+    if entry:
+        # temp folder + rename, like the feature cache
+        tmp_entry = f"{entry}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        os.makedirs(tmp_entry)
+        np.save(os.path.join(tmp_entry, "projection.npy"), X_pca)
+        joblib.dump(pca, os.path.join(tmp_entry, "pca.joblib"))
+        with open(os.path.join(tmp_entry, "meta.json"), "w") as f:
+            json.dump({'method': method, 'n_components': n_components, 'n_rows': len(X),
+                       'explained_variance_ratio': pca.explained_variance_ratio_.tolist()}, f, indent=2)
+        publish_entry(tmp_entry, entry)
+        prune_cache(cache_dir, keep=os.path.basename(entry))
+        print(f"PCA projection cached: {entry}")
+
+    return X_pca, pca
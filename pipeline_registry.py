@@ -0,0 +1,217 @@
+# =========================================
+# pipeline_registry.py
+# Purpose:
+#   Local registry of fitted models (scalers, KMeans, Isolation Forest,
+#   regressors) shared by the model and evaluation scripts. Every fit is
+#   saved as a numbered version:
+#     <registry>/<name>/v0001/artifacts.joblib   fitted objects (dict)
+#     <registry>/<name>/v0001/meta.json          features, training-data
+#                                                hash, params, metrics,
+#                                                fit time, tags
+#   fit_or_load() reuses the newest version fitted on the same data with
+#   the same params instead of refitting; load() gives scoring code the
+#   latest (or a given) version.
+# =========================================
+
+import os
+import json
+import time
+import glob
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# ===============================
+# CONFIGURATION
+# ===============================
+# set PIPELINE_REFIT=1 to ignore saved versions and fit everything again
+REFIT = os.environ.get("PIPELINE_REFIT", "0") == "1"
+ARTIFACTS_NAME = "artifacts.joblib"
+META_NAME = "meta.json"
+HASH_BLOCK_BYTES = 1 << 24  # bytes of an array hashed at a time (no full copy of memory maps)
+
+
+# ===============================
+# HASHING
+# ===============================
+def data_hash(data):
+    """
+    Hash of training data: values, index, column names and dtypes of a
+    DataFrame/Series, or the bytes, shape and dtype of an array.
+    """
+    digest = hashlib.sha1()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+        dtypes = data.dtypes.items() if isinstance(data, pd.DataFrame) else [(data.name, data.dtype)]
+        digest.update(repr([(str(col), str(dtype)) for col, dtype in dtypes]).encode())
+    else:
+        # row blocks: a memory-mapped matrix is hashed without copying it whole
+        # (same digest as hashing all bytes at once)
+        array = np.atleast_1d(np.asarray(data))
+        block_rows = max(1, HASH_BLOCK_BYTES // max(1, array[:1].nbytes))
+        for start in range(0, len(array), block_rows):
+            digest.update(np.ascontiguousarray(array[start:start + block_rows]))
+        digest.update(repr((array.shape, str(array.dtype))).encode())
+    return digest.hexdigest()
+
+
+def _jsonable(value):
+    # params/metrics as they read back from meta.json (numpy scalars, ranges, ...)
+    return json.loads(json.dumps(value, default=str))
+
+
+def _write_json(path, payload):
+    # write then rename, so a crashed fit never leaves a half-written version
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, path)
+
+
+# ===============================
+# REGISTRY
+# ===============================
+class ModelRegistry:
+    """
+    Versioned model store in a local folder.
+
+    Parameters:
+    - root (str): registry folder, created if missing
+    - refit (bool, optional): never reuse saved versions; REFIT by default
+    """
+
+    def __init__(self, root, refit=None):
+        self.root = root
+        self.refit = REFIT if refit is None else refit
+        os.makedirs(root, exist_ok=True)
+
+    def _version_dir(self, name, version):
+        return os.path.join(self.root, name, f"v{version:04d}")
+
+    def _versions(self, name):
+        # a version exists once its meta.json is written (artifacts go first)
+        metas = glob.glob(os.path.join(self.root, name, "v*", META_NAME))
+        return sorted(int(os.path.basename(os.path.dirname(m))[1:]) for m in metas)
+
+    def names(self, prefix=""):
+        """
+        Registered model names starting with `prefix`.
+        """
+        return sorted(
+            name for name in os.listdir(self.root)
+            if name.startswith(prefix) and self._versions(name)
+        )
+
+    def meta(self, name, version=None):
+        versions = self._versions(name)
+        if not versions:
+            raise FileNotFoundError(f"No registered versions of {name!r} in {self.root}")
+        version = versions[-1] if version is None else version
+        with open(os.path.join(self._version_dir(name, version), META_NAME)) as f:
+            return json.load(f)
+
+    def versions(self, name):
+        """
+        One row per version: fit time, training-data hash and metrics.
+        """
+        rows = []
+        for version in self._versions(name):
+            meta = self.meta(name, version)
+            rows.append({
+                'version': version,
+                'created': meta['created'],
+                'data_hash': meta['data_hash'],
+                'n_rows': meta['n_rows'],
+                'fit_seconds': meta['fit_seconds'],
+                **{f"metric_{key}": value for key, value in meta['metrics'].items()}
+            })
+        return pd.DataFrame(rows)
+
+    def register(self, name, artifacts, features, train_data, metrics=None, params=None,
+                 fit_seconds=None, tags=None):
+        """
+        Save `artifacts` (dict of fitted objects) as the next version of `name`.
+        Returns its meta dict.
+        """
+        versions = self._versions(name)
+        version = versions[-1] + 1 if versions else 1
+        version_dir = self._version_dir(name, version)
+        os.makedirs(version_dir, exist_ok=True)
+
+        # artifacts: temp file + rename, then meta.json marks the version complete
+        with tempfile.NamedTemporaryFile(dir=version_dir, suffix=".tmp", delete=False) as f:
+            tmp_file = f.name
+        joblib.dump(artifacts, tmp_file)
+        os.replace(tmp_file, os.path.join(version_dir, ARTIFACTS_NAME))
+
+        meta = {
+            'name': name,
+            'version': version,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'features': list(features),
+            'data_hash': data_hash(train_data),
+            'n_rows': int(len(train_data)),
+            'params': _jsonable(params or {}),
+            'metrics': _jsonable(metrics or {}),
+            'fit_seconds': fit_seconds,
+            'tags': _jsonable(tags or {})
+        }
+        _write_json(os.path.join(version_dir, META_NAME), meta)
+        print(f"Registered {name} v{version} ({meta['n_rows']} rows) in {self.root}")
+        return meta
+
+    def add_metrics(self, name, version, metrics):
+        """
+        Merge metrics computed after the fit (e.g. by an evaluation stage)
+        into a version's meta.
+        """
+        meta = self.meta(name, version)
+        meta['metrics'].update(_jsonable(metrics))
+        _write_json(os.path.join(self._version_dir(name, version), META_NAME), meta)
+        return meta
+
+    def load(self, name, version=None):
+        """
+        (artifacts, meta) of `version`, or of the latest version.
+        """
+        meta = self.meta(name, version)
+        artifacts = joblib.load(os.path.join(self._version_dir(name, meta['version']), ARTIFACTS_NAME))
+        return artifacts, meta
+
+    def find(self, name, train_data, params=None, features=None):
+        """
+        Meta of the newest version fitted on the same data (hash), params
+        and features, or None.
+        """
+        digest = data_hash(train_data)
+        params = _jsonable(params or {})
+        for version in reversed(self._versions(name)):
+            meta = self.meta(name, version)
+            if (meta['data_hash'] == digest and meta['params'] == params
+                    and (features is None or meta['features'] == list(features))):
+                return meta
+        return None
+
+    def fit_or_load(self, name, fit, train_data, features, params=None, tags=None):
+        """
+        Reuse the newest matching version of `name`, or call fit() and
+        register the result. fit() returns (artifacts, metrics).
+
+        Returns (artifacts, meta, reused).
+        """
+        meta = None if self.refit else self.find(name, train_data, params, features)
+        if meta is not None:
+            artifacts, meta = self.load(name, meta['version'])
+            print(f"Reusing {name} v{meta['version']} (same data and params, fitted {meta['created']})")
+            return artifacts, meta, True
+
+        start = time.perf_counter()
+        artifacts, metrics = fit()
+        fit_seconds = time.perf_counter() - start
+        meta = self.register(name, artifacts, features, train_data, metrics=metrics, params=params,
+                             fit_seconds=fit_seconds, tags=tags)
+        return artifacts, meta, False
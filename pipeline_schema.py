@@ -0,0 +1,232 @@
+# =========================================
+# pipeline_schema.py
+# Purpose:
+#   Explicit column types for the raw Dataset 1 and Dataset 2 files,
+#   applied while reading (chunk by chunk) instead of letting pandas
+#   infer object/int64/float64 for everything:
+#     - low-cardinality text      -> category
+#     - IDs and small integers    -> int32 / int16 (only when lossless)
+#     - Dataset 1 amount and date -> parsed to float64 / datetime64 per chunk
+#                                    (pipeline_parsing fast paths), so the raw
+#                                    text column never exists in full
+#   Values used in computations (amounts, incomes, expenses) keep their
+#   precision, so every result stays numerically equivalent.
+#   Numeric columns are written into arrays sized from the file's line
+#   count as chunks arrive, so a chunk is freed as soon as it is copied
+#   and the full frame never exists twice.
+# =========================================
+
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from pipeline_parsing import parse_amount, parse_date
+
+READ_CHUNK_ROWS = 100_000
+COUNT_BLOCK = 1 << 24  # bytes read at a time while counting lines
+
+
+# ===============================
+# SCHEMAS
+# ===============================
+# dtype name, or a parser applied to the raw text of each chunk
+DATASET1_RAW_SCHEMA = {
+    'id': 'int32',
+    'date': parse_date,
+    'client_id': 'int32',
+    'card_id': 'int32',
+    'amount': parse_amount,
+    'use_chip': 'category',
+    'merchant_id': 'int32',
+    'merchant_city': 'category',
+    'merchant_state': 'category',
+    'zip': 'float32',  # 5-digit codes are exact in float32; NaN when missing
+    'mcc': 'int16',
+    'errors': 'category'
+}
+
+DATASET2_MONEY_COLS = [
+    'Income (USD)', 'Rent (USD)', 'Groceries (USD)', 'Eating Out (USD)',
+    'Entertainment (USD)', 'Subscription Services (USD)', 'Education (USD)',
+    'Online Shopping (USD)', 'Savings (USD)', 'Investments (USD)',
+    'Travel (USD)', 'Fitness (USD)', 'Miscellaneous (USD)'
+]
+DATASET2_RAW_SCHEMA = {
+    'ID': 'int32',
+    'Age': 'int16',
+    **{col: 'int32' for col in DATASET2_MONEY_COLS}
+}
+
+
+# ===============================
+# READ
+# ===============================
+def _downcast(values, dtype):
+    """
+    Cast to a compact integer/float dtype only when no value changes
+    (missing or out-of-range values keep the inferred dtype).
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind in 'iu':
+        if values.isna().any():
+            return values
+        info = np.iinfo(dtype)
+        if len(values) and (values.min() < info.min or values.max() > info.max):
+            return values
+        if values.dtype.kind == 'f' and not (values % 1 == 0).all():
+            return values
+    return values.astype(dtype)
+
+
+def apply_schema(chunk, schema):
+    """
+    Apply a schema to a chunk read with read_dtypes(schema).
+    """
+    for col, spec in schema.items():
+        if col not in chunk.columns:
+            continue
+        if callable(spec):
+            chunk[col] = spec(chunk[col])
+        elif spec != 'category':
+            chunk[col] = _downcast(chunk[col], spec)
+    return chunk
+
+
+def read_dtypes(schema, columns):
+    """
+    dtype= argument for read_csv: categories are built by the parser,
+    parsed columns are read as text, numeric columns are inferred and
+    downcast afterwards.
+    """
+    dtypes = {}
+    for col, spec in schema.items():
+        if col not in columns:
+            continue
+        if spec == 'category':
+            dtypes[col] = 'category'
+        elif callable(spec):
+            dtypes[col] = str
+    return dtypes
+
+
+def iter_csv_with_schema(path, schema, chunk_size=READ_CHUNK_ROWS, **read_kwargs):
+    """
+    Typed chunks of a CSV (only one chunk of raw text in memory at a time).
+    """
+    header = pd.read_csv(path, nrows=0, **read_kwargs).columns
+    reader = pd.read_csv(path, dtype=read_dtypes(schema, header), chunksize=chunk_size, **read_kwargs)
+    for chunk in reader:
+        yield apply_schema(chunk, schema)
+
+
+def line_count(path):
+    """
+    Newlines in a file plus one: an upper bound on its CSV rows.
+    """
+    count = 1
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(COUNT_BLOCK), b""):
+            count += block.count(b"\n")
+    return count
+
+
+def _same_kind(a, b):
+    # numpy dtypes pd.concat would combine into a numpy dtype
+    return a == b or (a.kind in 'iuf' and b.kind in 'iuf')
+
+
+def concat_typed(chunks, n_rows=None):
+    """
+    Concatenate typed chunks, keeping categorical columns categorical
+    (categories are unioned and sorted, so codes agree across chunks).
+
+    Numeric and datetime columns are copied into one array per column as
+    chunks arrive (sized `n_rows`, grown if more rows come), so each chunk
+    is released right away and the peak stays close to one copy of the
+    data. Other columns are concatenated at the end, as pd.concat would.
+    """
+    columns = None
+    arrays, pieces = {}, {}
+    filled = 0
+    for chunk in chunks:
+        columns = chunk.columns
+        end = filled + len(chunk)
+        for col in columns:
+            values = chunk[col]
+            arr = arrays.get(col)
+            if arr is not None and not (isinstance(values.dtype, np.dtype) and _same_kind(arr.dtype, values.dtype)):
+                # dtype pd.concat would not keep as numpy: concatenate this column at the end
+                pieces[col] = [pd.Series(arr[:filled])]
+                del arrays[col]
+                arr = None
+            if col in pieces or not isinstance(values.dtype, np.dtype) or (filled and arr is None):
+                pieces.setdefault(col, []).append(values)
+                continue
+            dtype = values.dtype if arr is None else np.result_type(arr.dtype, values.dtype)
+            if arr is None or arr.dtype != dtype or len(arr) < end:
+                grown = np.empty(max(end, n_rows or 0, 2 * filled), dtype=dtype)
+                if arr is not None:
+                    grown[:filled] = arr[:filled]
+                arrays[col] = arr = grown
+            arr[filled:end] = values.to_numpy()
+        filled = end
+        del chunk
+    if columns is None:
+        raise ValueError("No rows to concatenate")
+
+    combined = {}
+    for col in columns:
+        if col in arrays:
+            combined[col] = pd.Series(arrays.pop(col)[:filled], copy=False)
+            continue
+        parts = pieces.pop(col)
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            # a chunk with no value in the column has empty object categories
+            empty = pd.Index([], dtype=next((p.cat.categories.dtype for p in parts if len(p.cat.categories)), object))
+            parts = [p if len(p.cat.categories) else p.cat.set_categories(empty) for p in parts]
+            combined[col] = pd.Series(union_categoricals(parts, sort_categories=True))
+        else:
+            combined[col] = pd.concat(parts, ignore_index=True)
+        del parts
+    return pd.DataFrame(combined, copy=False)
+
+
+def filter_rows(df, keep):
+    """
+    df[keep], built one column at a time: each column of `df` is released
+    once its rows are copied, so the frame never exists twice. `df` is
+    left empty.
+    """
+    keep = np.asarray(keep)
+    index = df.index[keep]
+    filtered = {col: df.pop(col).array[keep] for col in list(df.columns)}
+    return pd.DataFrame(filtered, index=index, copy=False)
+
+
+def read_csv_with_schema(path, schema, chunk_size=READ_CHUNK_ROWS, **read_kwargs):
+    """
+    pd.read_csv with `schema` applied at read time.
+    """
+    n_rows = line_count(path) if isinstance(path, (str, os.PathLike)) and os.path.isfile(path) else None
+    return concat_typed(iter_csv_with_schema(path, schema, chunk_size, **read_kwargs), n_rows)
+
+
+# ===============================
+# MEMORY REPORT
+# ===============================
+def memory_report(df, title="MEMORY USAGE"):
+    """
+    Print dtype and deep memory size per column; returns total bytes.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'MB': (usage / 1e6).round(2),
+        'bytes/row': (usage / max(len(df), 1)).round(1)
+    })
+    print(f"\n===== {title} ({len(df)} rows) =====")
+    print(report.to_string())
+    print(f"Total: {usage.sum() / 1e6:,.1f} MB")
+    return int(usage.sum())
@@ -0,0 +1,253 @@
+# =========================================
+# pipeline_storage.py
+# Purpose:
+#   Read/write the intermediate tables handed between pipeline stages
+#   (dataset1_transactions, dataset1_summary, dataset1_kmeans, ...)
+#   either as CSV (original behavior) or as compressed Parquet:
+#     - column pruning: stages load only the columns they use
+#     - partitioning: tables can be split by a column (e.g. time_window)
+#       into <name>.parquet/<col>=<value>/part-00000.parquet (value
+#       percent-encoded, e.g. weekly "a/b" labels) so stages
+#       load only the partitions they need
+#
+#   Callers keep their existing ".csv" paths; in Parquet mode the
+#   extension is swapped to ".parquet".
+# =========================================
+
+import os
+import glob
+import shutil
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+# ===============================
+# CONFIGURATION
+# ===============================
+# 'csv' (default) or 'parquet'; set PIPELINE_STORAGE_FORMAT to switch every stage at once
+STORAGE_FORMAT = os.environ.get("PIPELINE_STORAGE_FORMAT", "csv").lower()
+PARQUET_COMPRESSION = "zstd"
+
+# Partition layout of the shared intermediates
+TRANSACTIONS_PARTITION = "time_window"
+SUMMARY_PARTITION = "time_window"  # client-month summaries: one partition per month
+ROLLUP_PARTITION = "granularity"  # rollup cube: one partition per level (D/W/M/Q)
+
+
+def _require_parquet():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Parquet storage needs pyarrow (pip install pyarrow), "
+            "or set PIPELINE_STORAGE_FORMAT=csv"
+        ) from e
+
+
+def storage_path(path, storage_format=None):
+    """
+    Physical location of a table for the active storage format.
+    """
+    storage_format = storage_format or STORAGE_FORMAT
+    root, ext = os.path.splitext(path)
+    if storage_format == "parquet":
+        return root + ".parquet"
+    return root + (ext or ".csv")
+
+
+def table_exists(path, storage_format=None):
+    return os.path.exists(storage_path(path, storage_format))
+
+
+def _partition_dir(target, partition_by, value):
+    # values are percent-encoded: weekly labels like "2009-12-28/2010-01-03"
+    # must stay one directory level
+    return os.path.join(target, f"{partition_by}={quote(str(value), safe='')}")
+
+
+# ===============================
+# WRITE
+# ===============================
+def write_table(df, path, partition_by=None, append=False, part=0, storage_format=None):
+    """
+    Write `df` to `path` in the active format.
+
+    Parameters:
+    - partition_by (str, optional): Parquet only, one directory per value
+    - append (bool): add to an existing table (chunked writers); `part`
+      numbers the Parquet files so appended chunks never overwrite each other
+    """
+    storage_format = storage_format or STORAGE_FORMAT
+    target = storage_path(path, storage_format)
+
+    if storage_format != "parquet":
+        df.to_csv(target, mode="a" if append else "w", header=not append, index=False)
+        return target
+
+    _require_parquet()
+    if not append:
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        elif os.path.exists(target):
+            os.remove(target)
+
+    if partition_by is None:
+        if append:
+            raise ValueError("Appending to Parquet needs partition_by (one file per chunk)")
+        df.to_parquet(target, index=False, compression=PARQUET_COMPRESSION)
+        return target
+
+    # Partition values stay inside the files too, so dtypes and column
+    # order round-trip exactly; the directory name is only used for pruning.
+    for value, group in df.groupby(partition_by, sort=False, observed=True):
+        part_dir = _partition_dir(target, partition_by, value)
+        os.makedirs(part_dir, exist_ok=True)
+        group.to_parquet(
+            os.path.join(part_dir, f"part-{part:05d}.parquet"),
+            index=False,
+            compression=PARQUET_COMPRESSION
+        )
+    return target
+
+
+def replace_partitions(df, path, partition_by, values, order_by=None, storage_format=None):
+    """
+    Replace every row whose `partition_by` value is in `values` with `df`,
+    keeping the rest of the table (incremental refreshes).
+
+    Parquet deletes and rewrites only the affected partition directories.
+    CSV has no partitions, so the file is read, filtered and rewritten;
+    `order_by` restores the row order a full rebuild would produce.
+    """
+    storage_format = storage_format or STORAGE_FORMAT
+    target = storage_path(path, storage_format)
+    values = {str(v) for v in values}
+    if not df[partition_by].astype(str).isin(values).all():
+        raise ValueError(f"Rows outside the replaced {partition_by} values {sorted(values)}")
+
+    if not os.path.exists(target):
+        return write_table(df, path, partition_by=partition_by, storage_format=storage_format)
+
+    if storage_format == "parquet" and os.path.isdir(target):
+        for value in values:
+            part_dir = _partition_dir(target, partition_by, value)
+            if os.path.isdir(part_dir):
+                shutil.rmtree(part_dir)
+        if len(df):
+            write_table(df, path, partition_by=partition_by, append=True, storage_format=storage_format)
+        return target
+
+    existing = read_table(path, storage_format=storage_format)
+    kept = existing[~existing[partition_by].astype(str).isin(values)]
+    combined = pd.concat([kept, df], ignore_index=True)
+    if order_by:
+        combined = combined.sort_values(order_by, kind="stable", ignore_index=True)
+    return write_table(combined, path, partition_by=partition_by, storage_format=storage_format)
+
+
+# ===============================
+# READ
+# ===============================
+def _partition_files(target, where):
+    """
+    Parquet files of a partitioned table, skipping partitions excluded by `where`.
+    """
+    files = []
+    for part_dir in sorted(glob.glob(os.path.join(target, "*=*"))):
+        col, value = os.path.basename(part_dir).split("=", 1)
+        value = unquote(value)
+        if col in where and value not in {str(v) for v in where[col]}:
+            continue
+        files.extend(sorted(glob.glob(os.path.join(part_dir, "*.parquet"))))
+    return files
+
+
+def read_table(path, columns=None, where=None, order_by=None, storage_format=None):
+    """
+    Read a table written by write_table.
+
+    Parameters:
+    - columns (list, optional): load only these columns
+    - where (dict, optional): {column: allowed values}; prunes partitions
+      and pushes the filter down into the Parquet reader
+    - order_by (list, optional): partitioned tables come back grouped by
+      partition; sort by these columns to restore the original row order
+
+    Returns:
+    - DataFrame
+    """
+    storage_format = storage_format or STORAGE_FORMAT
+    target = storage_path(path, storage_format)
+    where = where or {}
+
+    if storage_format != "parquet":
+        usecols = None
+        if columns is not None:
+            usecols = list(dict.fromkeys(list(columns) + list(where)))
+        df = pd.read_csv(target, usecols=usecols)
+        for col, values in where.items():
+            df = df[df[col].isin(values)].reset_index(drop=True)
+        return df if columns is None else df[list(columns)]
+
+    _require_parquet()
+    filters = [(col, "in", list(values)) for col, values in where.items()] or None
+    read_columns = None
+    if columns is not None:
+        read_columns = list(dict.fromkeys(list(columns) + list(where) + list(order_by or [])))
+
+    if not os.path.isdir(target):
+        df = pd.read_parquet(target, columns=read_columns, filters=filters)
+    else:
+        frames = [
+            pd.read_parquet(f, columns=read_columns, filters=filters)
+            for f in _partition_files(target, where)
+        ]
+        if not frames:
+            # nothing matches: an empty frame with the table's schema, like the CSV path
+            all_files = _partition_files(target, {})
+            if not all_files:
+                raise FileNotFoundError(f"No partitions in {target}")
+            frames = [pd.read_parquet(all_files[0], columns=read_columns).iloc[:0]]
+        df = pd.concat(frames, ignore_index=True)
+        if order_by:
+            df = df.sort_values(order_by, kind="stable", ignore_index=True)
+
+    return df if columns is None else df[list(columns)].reset_index(drop=True)
+
+
+def iter_table(path, columns=None, chunk_rows=1_000_000, storage_format=None):
+    """
+    Read a table written by write_table in chunks of at most `chunk_rows`
+    rows, for stages that must not hold the whole table in memory.
+    Partitioned Parquet tables come partition by partition.
+
+    Yields:
+    - DataFrame chunks
+    """
+    storage_format = storage_format or STORAGE_FORMAT
+    target = storage_path(path, storage_format)
+
+    if storage_format != "parquet":
+        for chunk in pd.read_csv(target, usecols=columns, chunksize=chunk_rows):
+            yield chunk if columns is None else chunk[list(columns)]
+        return
+
+    _require_parquet()
+    import pyarrow.parquet as pq
+    files = _partition_files(target, {}) if os.path.isdir(target) else [target]
+    for name in files:
+        for batch in pq.ParquetFile(name).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+
+
+def disk_usage(path, storage_format=None):
+    """
+    Bytes used by a table (file or partitioned directory).
+    """
+    target = storage_path(path, storage_format)
+    if os.path.isdir(target):
+        return sum(
+            os.path.getsize(os.path.join(root, f))
+            for root, _, names in os.walk(target) for f in names
+        )
+    return os.path.getsize(target)
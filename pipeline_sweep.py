@@ -0,0 +1,313 @@
+# =========================================
+# pipeline_sweep.py
+# Purpose:
+#   Hyperparameter sweeps for the model stages without editing and
+#   rerunning the scripts one by one. A sweep is a grid of parameters
+#   (sklearn ParameterGrid: dict of lists, or a list of them) for one
+#   model kind:
+#     - 'kmeans':           Model 1 / Model 5 clustering
+#     - 'isolation_forest': Model 2 anomaly detection
+#     - 'random_forest':    Model 3 budget forecasting
+#   Every configuration is fitted in a process pool and its result (quality
+#   metrics, fit and predict seconds) saved as
+#     <cache_dir>/<sweep>/<key>.json   key = hash(kind, params, data hash,
+#                                          SWEEP_VERSION, module settings)
+#   as soon as it finishes, so a rerun (even after an interrupted sweep)
+#   only fits configurations it has not seen on the same data. A
+#   configuration that raises is reported with its error, not cached.
+#   The result is one comparison table per sweep, one row per configuration.
+# =========================================
+
+import os
+import json
+import time
+import hashlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import silhouette_score, davies_bouldin_score, mean_squared_error, r2_score
+from sklearn.model_selection import ParameterGrid, train_test_split
+from threadpoolctl import threadpool_limits
+
+from pipeline_anomaly import make_isolation_forest, anomaly_scores
+from pipeline_registry import REFIT, data_hash
+
+# ===============================
+# CONFIGURATION
+# ===============================
+SWEEP_WORKERS = os.cpu_count()   # processes, one configuration per task
+SILHOUETTE_SAMPLE_SIZE = 20_000  # rows per silhouette (None = all rows, O(n^2))
+RULE_SIGMA = 3                   # isolation_forest: reference flags = y > mean + RULE_SIGMA * std
+TEST_SIZE = 0.2                  # random_forest: held-out share, split as in Dataset2_MODEL3.py
+MINIBATCH_BATCH_SIZE = 4_096     # kmeans algorithm='minibatch'
+RANDOM_STATE = 42
+SWEEP_VERSION = 2                # bump when a model kind's fitting or metrics change
+
+# metric each kind is ranked by (all higher = better)
+PRIMARY_METRIC = {
+    'kmeans': 'silhouette',
+    'isolation_forest': 'rule_f1',
+    'random_forest': 'r2'
+}
+
+_SWEEP_DATA = None  # (X, y) inherited by forked workers instead of pickled per task
+
+
+# ===============================
+# MODEL KINDS
+# ===============================
+def _fit_kmeans(X, y, params):
+    """
+    params: n_clusters, algorithm ('kmeans'/'minibatch'), random_state.
+    Metrics: inertia, silhouette (sampled), Davies-Bouldin.
+    """
+    params = {'algorithm': 'kmeans', 'random_state': RANDOM_STATE, **params}
+    if params['algorithm'] == 'minibatch':
+        model = MiniBatchKMeans(n_clusters=params['n_clusters'], random_state=params['random_state'],
+                                batch_size=MINIBATCH_BATCH_SIZE)
+    else:
+        model = KMeans(n_clusters=params['n_clusters'], random_state=params['random_state'])
+
+    start = time.perf_counter()
+    model.fit(X)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    labels = model.predict(X)
+    predict_seconds = time.perf_counter() - start
+
+    sample_size = SILHOUETTE_SAMPLE_SIZE if SILHOUETTE_SAMPLE_SIZE and SILHOUETTE_SAMPLE_SIZE < len(X) else None
+    metrics = {
+        'inertia': float(model.inertia_),
+        'silhouette': float(silhouette_score(X, labels, sample_size=sample_size, random_state=RANDOM_STATE)),
+        'davies_bouldin': float(davies_bouldin_score(X, labels))
+    }
+    return metrics, fit_seconds, predict_seconds
+
+
+def _fit_isolation_forest(X, y, params):
+    """
+    params: contamination (float or 'auto') or n_sigma (contamination =
+    share of y above mean + n_sigma * std, as Dataset1_MODEL2.py does with
+    n_sigma=3; clipped to IsolationForest's (0, 0.5], at least one row),
+    n_estimators, max_samples, random_state.
+    Metrics: anomaly rate, and precision/recall/F1 of the flags against
+    the y > mean + RULE_SIGMA * std reference (y = total_spending).
+    """
+    params = {'contamination': 'auto', 'n_estimators': 100, 'max_samples': 'auto',
+              'random_state': RANDOM_STATE, **params}
+    y = None if y is None else np.asarray(y, dtype=np.float64)
+    contamination = params['contamination']
+    if params.get('n_sigma') is not None:
+        if y is None:
+            raise ValueError("n_sigma needs y (the spending column)")
+        contamination = float(np.mean(y > y.mean() + params['n_sigma'] * y.std(ddof=1)))
+        # a large n_sigma can leave no row above the threshold
+        contamination = min(max(contamination, 1 / len(y)), 0.5)
+
+    iso = make_isolation_forest(contamination, params['random_state'], max_samples=params['max_samples'])
+    iso.set_params(n_estimators=params['n_estimators'])
+    start = time.perf_counter()
+    iso.fit(X)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    _, labels = anomaly_scores(iso, X, n_workers=1)
+    predict_seconds = time.perf_counter() - start
+
+    flagged = labels == -1
+    metrics = {
+        'contamination': float(contamination) if contamination != 'auto' else np.nan,
+        'anomaly_rate': float(flagged.mean()),
+        'n_anomalies': int(flagged.sum())
+    }
+    if y is not None:
+        reference = y > y.mean() + RULE_SIGMA * y.std(ddof=1)
+        hits = int((flagged & reference).sum())
+        precision = hits / flagged.sum() if flagged.any() else 0.0
+        recall = hits / reference.sum() if reference.any() else 0.0
+        metrics.update({
+            'rule_precision': float(precision),
+            'rule_recall': float(recall),
+            'rule_f1': float(2 * precision * recall / (precision + recall)) if precision + recall else 0.0
+        })
+    return metrics, fit_seconds, predict_seconds
+
+
+def _fit_random_forest(X, y, params):
+    """
+    params: any RandomForestRegressor parameter (n_estimators, max_depth,
+    min_samples_leaf, ...). Metrics: MSE and R2 on the held-out split.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    model = RandomForestRegressor(**{'random_state': RANDOM_STATE, **params})
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+    metrics = {'mse': float(mean_squared_error(y_test, y_pred)), 'r2': float(r2_score(y_test, y_pred))}
+    return metrics, fit_seconds, predict_seconds
+
+
+MODEL_KINDS = {
+    'kmeans': _fit_kmeans,
+    'isolation_forest': _fit_isolation_forest,
+    'random_forest': _fit_random_forest
+}
+
+
+# ===============================
+# CACHE
+# ===============================
+def _jsonable(params):
+    return json.loads(json.dumps(params, sort_keys=True, default=str))
+
+
+def _config_key(kind, params, digest):
+    # module settings change the metrics too, so they are part of the key
+    settings = {
+        'version': SWEEP_VERSION,
+        'random_state': RANDOM_STATE,
+        'silhouette_sample_size': SILHOUETTE_SAMPLE_SIZE,
+        'rule_sigma': RULE_SIGMA,
+        'test_size': TEST_SIZE,
+        'minibatch_batch_size': MINIBATCH_BATCH_SIZE
+    }
+    spec = json.dumps([kind, _jsonable(params), digest, settings], sort_keys=True)
+    return hashlib.sha1(spec.encode()).hexdigest()[:16]
+
+
+def _write_json(path, payload):
+    # write then rename, so an interrupted sweep never leaves a half-written result
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, path)
+
+
+# ===============================
+# SWEEP
+# ===============================
+def _run_config(kind, params):
+    X, y = _SWEEP_DATA
+    try:
+        metrics, fit_seconds, predict_seconds = MODEL_KINDS[kind](X, y, params)
+    except Exception as e:
+        # one invalid configuration must not lose the rest of the sweep
+        return {'metrics': {}, 'fit_seconds': np.nan, 'predict_seconds': np.nan,
+                'error': f"{type(e).__name__}: {e}"}
+    return {'metrics': metrics, 'fit_seconds': fit_seconds, 'predict_seconds': predict_seconds}
+
+
+def _run_config_worker(args):
+    # one thread per process: the workers already fill the cores
+    with threadpool_limits(1):
+        return _run_config(*args)
+
+
+def run_sweep(name, kind, grid, X, y=None, cache_dir=None, n_workers=SWEEP_WORKERS, refit=None):
+    """
+    Fit every configuration of `grid` on (X, y) and compare them.
+
+    Parameters:
+    - name (str): sweep name (cache subfolder and 'sweep' column)
+    - kind (str): one of MODEL_KINDS
+    - grid (dict or list of dicts): parameter grid (ParameterGrid)
+    - y (array, optional): target (random_forest) or spending column
+      (isolation_forest n_sigma and rule metrics)
+    - cache_dir (str, optional): keep results there and reuse them
+    - n_workers (int): processes for the configurations not in the cache
+    - refit (bool, optional): ignore cached results; REFIT by default
+
+    Returns:
+    - DataFrame, one row per configuration in grid order: params (JSON
+      and one param_<name> column each), metrics, fit_seconds,
+      predict_seconds, cached, error ("" or the exception), rank
+      (1 = best PRIMARY_METRIC)
+    """
+    global _SWEEP_DATA
+    if kind not in MODEL_KINDS:
+        raise ValueError(f"Unknown model kind {kind!r}, expected one of {tuple(MODEL_KINDS)}")
+    refit = REFIT if refit is None else refit
+    configs = list(ParameterGrid(grid))
+    digest = data_hash(X) + ("" if y is None else data_hash(y))
+
+    sweep_dir = os.path.join(cache_dir, name) if cache_dir else None
+    if sweep_dir:
+        os.makedirs(sweep_dir, exist_ok=True)
+    results, todo = {}, []
+    for i, params in enumerate(configs):
+        path = os.path.join(sweep_dir, f"{_config_key(kind, params, digest)}.json") if sweep_dir else None
+        if path and not refit and os.path.exists(path):
+            with open(path) as f:
+                results[i] = {**json.load(f), 'cached': True}
+        else:
+            todo.append((i, params, path))
+
+    def finish(i, params, path, result):
+        # cached as soon as it is done: an interrupted sweep keeps its finished configurations
+        result = {'kind': kind, 'params': _jsonable(params), 'data_hash': digest, **result}
+        if path and 'error' not in result:
+            _write_json(path, result)
+        results[i] = {**result, 'cached': False}
+
+    _SWEEP_DATA = (X, y)
+    try:
+        if n_workers > 1 and len(todo) > 1 and 'fork' in mp.get_all_start_methods():
+            # fork: workers inherit X and y, and the pipeline scripts have no __main__ guard
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(todo)),
+                                     mp_context=mp.get_context('fork')) as pool:
+                futures = {pool.submit(_run_config_worker, (kind, params)): (i, params, path)
+                           for i, params, path in todo}
+                for future in as_completed(futures):
+                    finish(*futures[future], future.result())
+        else:
+            for i, params, path in todo:
+                finish(i, params, path, _run_config(kind, params))
+    finally:
+        _SWEEP_DATA = None
+
+    rows = []
+    for i, params in enumerate(configs):
+        result = results[i]
+        rows.append({
+            'sweep': name,
+            'kind': kind,
+            'params': json.dumps(_jsonable(params), sort_keys=True),
+            **{f"param_{key}": value for key, value in params.items()},
+            **result['metrics'],
+            'fit_seconds': result['fit_seconds'],
+            'predict_seconds': result['predict_seconds'],
+            'cached': result['cached'],
+            'error': result.get('error', "")
+        })
+    report = pd.DataFrame(rows)
+    # configurations with different keys (or cached vs fresh) list their columns in different orders
+    param_cols = sorted(col for col in report if col.startswith('param_'))
+    timing_cols = ['fit_seconds', 'predict_seconds', 'cached', 'error']
+    metric_cols = [col for col in report if col not in param_cols + timing_cols + ['sweep', 'kind', 'params']]
+    report = report[['sweep', 'kind', 'params'] + param_cols + metric_cols + timing_cols]
+    metric = PRIMARY_METRIC[kind]
+    if metric not in report:
+        report[metric] = np.nan  # e.g. isolation_forest without y
+    report['rank'] = report[metric].rank(ascending=False, method='min').astype('Int64')
+    n_failed = int((report['error'] != "").sum())
+    print(f"Sweep {name}: {len(configs)} configurations, {len(todo)} fitted, {len(configs) - len(todo)} from cache"
+          + (f", {n_failed} failed" if n_failed else ""))
+    return report
+
+
+def print_sweep_report(report):
+    kind = report['kind'].iloc[0]
+    metric = PRIMARY_METRIC[kind]
+    print(f"\n===== SWEEP {report['sweep'].iloc[0]} ({kind}, ranked by {metric}) =====")
+    for row in report.sort_values('rank', na_position='last').itertuples():
+        if row.error:
+            print(f"-- {row.params}: failed ({row.error})")
+            continue
+        print(f"#{row.rank} {row.params}: {metric}={getattr(row, metric):.4f}, "
+              f"fit {row.fit_seconds:.2f}s, predict {row.predict_seconds:.2f}s" + ("  (cached)" if row.cached else ""))
@@ -164,6 +164,18 @@ import numpy as np
 DATASET2_FILE = "/Users/anandhytapratamaputrisutisna/FYP2/Data/dataset2_anomaly_results/Sample_Anomalous_Transactions.csv"
 MAX_CHANGE_PERCENT = 0.25  # maximum 25% change per category
 
+EXPENSE_COLS = [
+    "Rent (USD)", "Groceries (USD)", "Eating Out (USD)", "Entertainment (USD)",
+    "Subscription Services (USD)", "Education (USD)", "Online Shopping (USD)",
+    "Savings (USD)", "Investments (USD)", "Travel (USD)", "Fitness (USD)", "Miscellaneous (USD)"
+]
+
+# 50/30/20 groups
+NEEDS_COLS = ["Rent (USD)", "Groceries (USD)", "Education (USD)"]
+WANTS_COLS = ["Eating Out (USD)", "Entertainment (USD)", "Online Shopping (USD)",
+              "Travel (USD)", "Subscription Services (USD)", "Fitness (USD)", "Miscellaneous (USD)"]
+SAVINGS_INVESTMENT_COLS = ["Savings (USD)", "Investments (USD)"]
+
 # ===============================
 # LOAD DATA
 # ===============================
@@ -187,11 +199,7 @@ def generate_financial_recommendation(user_id, behavior_row=None, financial_row=
             "insight_text": "No expense data available for this user."
         }
 
-    expense_cols = [
-        "Rent (USD)", "Groceries (USD)", "Eating Out (USD)", "Entertainment (USD)",
-        "Subscription Services (USD)", "Education (USD)", "Online Shopping (USD)",
-        "Savings (USD)", "Investments (USD)", "Travel (USD)", "Fitness (USD)", "Miscellaneous (USD)"
-    ]
+    expense_cols = EXPENSE_COLS
 
     current_expenses = user_exp[expense_cols].iloc[0].to_dict()
     total_expenses = sum(current_expenses.values())
@@ -221,10 +229,9 @@ def generate_financial_recommendation(user_id, behavior_row=None, financial_row=
     # -------------------------------
     # 50/30/20 allocation
     # -------------------------------
-    needs = ["Rent (USD)", "Groceries (USD)", "Education (USD)"]
-    wants = ["Eating Out (USD)", "Entertainment (USD)", "Online Shopping (USD)",
-             "Travel (USD)", "Subscription Services (USD)", "Fitness (USD)", "Miscellaneous (USD)"]
-    savings_investments = ["Savings (USD)", "Investments (USD)"]
+    needs = NEEDS_COLS
+    wants = WANTS_COLS
+    savings_investments = SAVINGS_INVESTMENT_COLS
 
     needs_target = 0.5 * total_income
     wants_target = 0.3 * total_income
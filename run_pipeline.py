@@ -0,0 +1,104 @@
+# =========================================
+# run_pipeline.py
+# Purpose:
+#   Run the whole analytics pipeline in dependency order:
+#     Dataset 1: PREPROCESSING -> MODEL1 + MODEL2 -> BEHAVIOR_INSIGHT
+#     Dataset 2: PREPROCESSING -> MODEL3 + MODEL4 + MODEL5 -> FINANCIAL_HEALTH
+#     both      -> combine_behavior_financial
+#   Independent stages (Dataset 1 vs Dataset 2, Models 3/4/5) run in
+#   parallel; a stage whose inputs and code are unchanged since its last
+#   run is skipped (pipeline_dag.run_pipeline). Each stage is the
+#   unchanged script, run in its own process.
+#   Writes <STATE_DIR>/pipeline_timings.csv and one log per stage.
+# =========================================
+
+import time
+
+from pipeline_dag import run_pipeline, print_timing_report, MAX_WORKERS
+
+# =========================
+# CONFIG
+# =========================
+BASE_DIR = "/Users/anandhytapratamaputrisutisna/FYP2"  # working directory of the stages
+STATE_DIR = "/Users/anandhytapratamaputrisutisna/FYP2/Data/pipeline_runs"
+TARGETS = None   # e.g. ['dataset2_financial_health']: only these and their upstream stages
+FORCE = []       # stages run even when unchanged
+DRY_RUN = False  # True = report what would run
+
+# stage -> script (relative to the repo), inputs and outputs (relative to BASE_DIR),
+# spelled as in the scripts; a stage runs after the stages whose outputs it reads
+STAGES = {
+    # the monthly drop folder covers INGESTION_MODE = 'incremental' (the
+    # manifest next to it is the stage's own record of what it processed)
+    'dataset1_preprocessing': {
+        'script': "Dataset1/Dataset1_PREPROCESSING.py",
+        'inputs': ["Data/Dataset 1.csv", "Data/dataset1_monthly"],
+        'outputs': ["data/dataset1_transactions.csv", "data/dataset1_summary.csv"]
+    },
+    'dataset1_model1': {
+        'script': "Dataset1/Dataset1_MODEL1.py",
+        'inputs': ["Data/dataset1_summary.csv"],
+        'outputs': ["data/dataset1_model1_results/k3_interpretability/dataset1_kmeans.csv"]
+    },
+    'dataset1_model2': {
+        'script': "Dataset1/Dataset1_MODEL2.py",
+        'inputs': ["Data/dataset1_summary.csv"],
+        'outputs': ["data/dataset1_model2_results/automatic_contamination/dataset1_isolation_forest.csv"]
+    },
+    'dataset1_behavior_insight': {
+        'script': "Dataset1/Dataset1_BEHAVIOR_INSIGHT.py",
+        'inputs': ["data/dataset1_model1_results/k3_interpretability/dataset1_kmeans.csv",
+                   "data/dataset1_model2_results/automatic_contamination/dataset1_isolation_forest.csv"],
+        'outputs': ["data/behavior_insight/behavior_insight.csv"]
+    },
+    # Models 3/4/5 read "Dataset 2.csv" through the feature store that
+    # preprocessing builds, so they also list its processed table
+    'dataset2_preprocessing': {
+        'script': "Dataset2/Dataset2_PREPROCESSING.py",
+        'inputs': ["Data/Dataset 2.csv"],
+        'outputs': ["Data/dataset2_processed.csv", "Data/dataset2_scaled.csv"]
+    },
+    'dataset2_model3': {
+        'script': "Dataset2/Dataset2_MODEL3.py",
+        'inputs': ["Data/Dataset 2.csv", "Data/dataset2_processed.csv"],
+        'outputs': ["Data/dataset2_model3_results/Budget_Forecasting_Predictions.csv"]
+    },
+    'dataset2_model4': {
+        'script': "Dataset2/Dataset2_MODEL4.py",
+        'inputs': ["Data/Dataset 2.csv", "Data/dataset2_processed.csv"],
+        'outputs': ["Data/dataset2_model4_results/Dataset2_Anomalies.csv",
+                    "Data/dataset2_model4_results/Dataset2_Anomaly_Scores.csv"]
+    },
+    'dataset2_model5': {
+        'script': "Dataset2/Dataset2_MODEL5.py",
+        'inputs': ["Data/Dataset 2.csv", "Data/dataset2_processed.csv"],
+        'outputs': ["Data/dataset2_model5_results/dataset2_clustered.csv"]
+    },
+    'dataset2_financial_health': {
+        'script': "Dataset2/Dataset2_FINANCIAL_HEALTH.py",
+        'inputs': ["Data/Dataset 2.csv",
+                   "Data/dataset2_model3_results/Budget_Forecasting_Predictions.csv",
+                   "Data/dataset2_model4_results/Dataset2_Anomalies.csv",
+                   "Data/dataset2_model4_results/Dataset2_Anomaly_Scores.csv",
+                   "Data/dataset2_model5_results/dataset2_clustered.csv"],
+        'outputs': ["Dataset2/dataset2_financial_health/financial_health.csv"]
+    },
+    'combine_behavior_financial': {
+        'script': "combine_behavior_financial.py",
+        'inputs': ["data/behavior_insight/behavior_insight.csv",
+                   "Dataset2/dataset2_financial_health/financial_health.csv"],
+        'outputs': ["Dataset2/dataset2_combined_insight/combined_insight.csv"]
+    }
+}
+
+# =========================
+# RUN
+# =========================
+start = time.perf_counter()
+report = run_pipeline(STAGES, BASE_DIR, STATE_DIR, targets=TARGETS, force=FORCE,
+                      max_workers=MAX_WORKERS, dry_run=DRY_RUN)
+print_timing_report(report, time.perf_counter() - start)
+print(f"\nTiming report saved to: {STATE_DIR}/pipeline_timings.csv")
+
+if (report['status'].isin(["failed", "blocked"])).any():
+    raise SystemExit(1)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Make the pipeline modules importable from the tests, like the benchmarks
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in (REPO_DIR, os.path.join(REPO_DIR, "Dataset1"), os.path.join(REPO_DIR, "Dataset2")):
+    if folder not in sys.path:
+        sys.path.append(folder)
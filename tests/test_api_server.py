@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+
+try:
+    import api_server
+    import budget_projection
+except FileNotFoundError as e:  # the modules load the pipeline outputs at import
+    pytest.skip(f"pipeline outputs not available: {e}", allow_module_level=True)
+
+NO_INCOME_ID = -1
+
+
+@pytest.fixture
+def no_income_user(monkeypatch):
+    user = {col: [100.0] for col in budget_projection.EXPENSE_COLS}
+    user.update({'ID': [NO_INCOME_ID], 'Income (USD)': [0.0]})
+    monkeypatch.setattr(budget_projection, "df_expenses", pd.DataFrame(user))
+
+
+def test_projection_without_income_has_no_nan(no_income_user):
+    # NaN is not valid JSON (older FastAPI/pydantic answer 500), so ratios must be None
+    projection = budget_projection.project_user_trajectory(NO_INCOME_ID, 12)
+    for month in projection['trajectory']:
+        assert month['expense_to_income_ratio'] is None
+        assert month['savings_rate'] is None
+
+
+def test_budget_projection_without_income(no_income_user):
+    response = TestClient(api_server.app).get(f"/budget_projection/{NO_INCOME_ID}?months=12")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['income'] == 0.0
+    first = body['trajectory'][0]
+    assert first['expense_to_income_ratio'] is None
+    assert first['savings_rate'] is None
+    assert first['financial_health'] == str(budget_projection.HEALTH_LABELS[budget_projection.UNKNOWN])
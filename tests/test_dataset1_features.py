@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+import dataset1_features
+from dataset1_features import time_window_labels, iso_weeks
+
+
+def random_dates(n_rows=50, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Series(pd.to_datetime(rng.integers(1_200_000_000, 1_700_000_000, n_rows), unit='s'))
+    dates.index = dates.index * 3 + 5
+    return dates
+
+
+def test_time_window_labels_match_factorized_periods(monkeypatch):
+    monkeypatch.setattr(dataset1_features, 'DATE_BLOCK_ROWS', 7)
+    dates = random_dates()
+    dates.iloc[[3, 10]] = pd.NaT
+    for time_window in ('M', 'W', 'D'):
+        codes, periods = pd.factorize(dates.dt.to_period(time_window), sort=True)
+        expected = pd.Series(pd.Categorical.from_codes(codes, categories=periods.astype(str)), index=dates.index)
+        pd.testing.assert_series_equal(time_window_labels(dates, time_window), expected)
+
+
+def test_iso_weeks_match_isocalendar(monkeypatch):
+    monkeypatch.setattr(dataset1_features, 'DATE_BLOCK_ROWS', 7)
+    dates = random_dates()
+    expected = dates.dt.isocalendar().week.astype('UInt8').rename(None)
+    pd.testing.assert_series_equal(iso_weeks(dates), expected)
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from dataset1_interactive import cluster_anomaly_figure
+
+
+def scored_summary(n_rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    anomaly = np.where(rng.random(n_rows) < 0.1, -1, 1)
+    return pd.DataFrame({
+        'client_id': rng.integers(0, 50_000, n_rows),
+        'cluster': rng.integers(0, 3, n_rows),
+        'anomaly': anomaly,
+        'anomaly_label': np.where(anomaly == -1, 'Anomaly', 'Normal'),
+        'anomaly_score': rng.normal(-0.1, 0.05, n_rows),
+        'total_spending': rng.lognormal(6, 1, n_rows),
+        'PCA1': rng.normal(0, 1, n_rows),
+        'PCA2': rng.normal(0, 1, n_rows)
+    })
+
+
+def test_hover_text_matches_row_wise_apply():
+    df = scored_summary()
+    # the strings Dataset1_EVALUATION.py built before, one row at a time
+    expected = df.apply(
+        lambda row: f"Client ID: {row['client_id']}<br>"
+                    f"Cluster: {row['cluster']}<br>"
+                    f"Anomaly: {row['anomaly_label']} (score {row['anomaly_score']:.3f})<br>"
+                    f"Total Spending: {row['total_spending']:.2f}",
+        axis=1
+    )
+    fig, n_drawn = cluster_anomaly_figure(df, "test", max_points=None)
+
+    assert n_drawn == len(df)
+    drawn = [text for trace in fig.data for text in trace.hovertext]
+    assert sorted(drawn) == sorted(expected)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from pipeline_schema import DATASET1_RAW_SCHEMA, concat_typed, filter_rows, read_csv_with_schema
+
+
+def typed_chunks():
+    return [
+        pd.DataFrame({'id': np.array([1, 2], dtype='int32'), 'zip': [1.0, 2.0],
+                      'city': pd.Categorical(['b', 'a']), 'date': pd.to_datetime(['2020-01-01', '2020-01-02'])}),
+        # a chunk whose id column kept the inferred dtype (missing value)
+        pd.DataFrame({'id': [3.0, np.nan], 'zip': [3.0, 4.0],
+                      'city': pd.Categorical(['c', 'a']), 'date': pd.to_datetime(['2020-01-03', None])}),
+        pd.DataFrame({'id': np.array([5], dtype='int32'), 'zip': [5.0],
+                      'city': pd.Categorical(['b']), 'date': pd.to_datetime(['2020-01-05'])})
+    ]
+
+
+def test_concat_typed_matches_pd_concat():
+    expected = pd.concat(typed_chunks(), ignore_index=True)
+    expected['city'] = expected['city'].astype(pd.CategoricalDtype(['a', 'b', 'c']))
+    # row count hint too small, right and too large
+    for n_rows in (None, 2, 5, 100):
+        pd.testing.assert_frame_equal(concat_typed(typed_chunks(), n_rows), expected)
+
+
+def test_filter_rows_matches_boolean_indexing():
+    df = pd.concat(typed_chunks(), ignore_index=True)
+    keep = df['zip'] > 1.5
+    expected = df[keep]
+    pd.testing.assert_frame_equal(filter_rows(df.copy(), keep), expected)
+
+
+def test_read_csv_with_schema_matches_one_chunk(tmp_path):
+    path = tmp_path / "raw.csv"
+    path.write_text(
+        "id,date,client_id,card_id,amount,use_chip,merchant_id,merchant_city,merchant_state,zip,mcc,errors\n"
+        "1,2010-01-01 00:01:00,7,70,$12.50,Chip Transaction,5,Austin,TX,78701.0,5411,\n"
+        "2,2010-01-02 00:02:00,8,80,$-3.00,Swipe Transaction,6,ONLINE,,,5812,Bad PIN\n"
+        "3,not a date,7,71,$1.25,Chip Transaction,5,Miami,FL,33101.0,5411,\n"
+    )
+    whole = read_csv_with_schema(str(path), DATASET1_RAW_SCHEMA, chunk_size=10)
+    pd.testing.assert_frame_equal(read_csv_with_schema(str(path), DATASET1_RAW_SCHEMA, chunk_size=1), whole)
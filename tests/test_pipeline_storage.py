@@ -0,0 +1,43 @@
+import os
+
+import pandas as pd
+import pytest
+
+from pipeline_storage import write_table, read_table, replace_partitions
+
+pytest.importorskip("pyarrow")
+
+WEEKS = ["2009-12-28/2010-01-03", "2010-01-04/2010-01-10"]
+
+
+def weekly_table():
+    return pd.DataFrame({
+        'client_id': [1, 2, 1, 2],
+        'time_window': [WEEKS[0], WEEKS[0], WEEKS[1], WEEKS[1]],
+        'total_spending': [10.0, 20.0, 30.0, 40.0]
+    })
+
+
+def test_weekly_partitions_round_trip(tmp_path):
+    path = str(tmp_path / "summary.csv")
+    df = weekly_table()
+    target = write_table(df, path, partition_by='time_window', storage_format="parquet")
+
+    # one directory level per week, not nested folders from the "/"
+    assert len(os.listdir(target)) == len(WEEKS)
+    back = read_table(path, order_by=['time_window', 'client_id'], storage_format="parquet")
+    pd.testing.assert_frame_equal(back, df)
+
+    one_week = read_table(path, where={'time_window': [WEEKS[1]]}, storage_format="parquet")
+    assert one_week['total_spending'].tolist() == [30.0, 40.0]
+
+
+def test_weekly_partitions_replace(tmp_path):
+    path = str(tmp_path / "summary.csv")
+    write_table(weekly_table(), path, partition_by='time_window', storage_format="parquet")
+
+    refreshed = pd.DataFrame({'client_id': [3], 'time_window': [WEEKS[0]], 'total_spending': [5.0]})
+    replace_partitions(refreshed, path, 'time_window', [WEEKS[0]], storage_format="parquet")
+    back = read_table(path, order_by=['time_window', 'client_id'], storage_format="parquet")
+    assert back['client_id'].tolist() == [3, 1, 2]
+    assert back['total_spending'].tolist() == [5.0, 30.0, 40.0]